@@ -31,11 +31,77 @@
 This module provides collation support for matholymp use.
 """
 
+import threading
+
 import icu
 
-__all__ = ['coll_get_sort_key']
+from matholymp.fileutil import read_cache_file, write_cache_file
+
+__all__ = ['coll_get_sort_key', 'coll_read_sort_key_cache',
+           'coll_write_sort_key_cache']
+
+_locale = 'en_GB'
+
+# ICU collators are not safe for concurrent use from multiple
+# threads, so each thread has its own collator.
+_thread_data = threading.local()
+
+# Sort keys are cached, since the same names, countries and roles are
+# sorted many times.  Lookups do not need a lock; when the cache is
+# full, the oldest entries are discarded.
+_sort_key_cache = {}
+_sort_key_cache_lock = threading.Lock()
+_sort_key_cache_max = 65536
+
+# Sort keys depend on the version of ICU, so a saved cache is only
+# used with the same version.
+_sort_key_cache_version = (1, _locale, icu.ICU_VERSION)
+
+
+def _get_collator():
+    """Return the collator for the current thread."""
+    try:
+        return _thread_data.collator
+    except AttributeError:
+        _thread_data.collator = icu.Collator.createInstance(
+            icu.Locale(_locale))
+        return _thread_data.collator
+
+
+def coll_get_sort_key(text):
+    """Get a collation sort key for some Unicode text."""
+    try:
+        return _sort_key_cache[text]
+    except KeyError:
+        pass
+    key = _get_collator().getSortKey(text)
+    with _sort_key_cache_lock:
+        while len(_sort_key_cache) >= _sort_key_cache_max:
+            del _sort_key_cache[next(iter(_sort_key_cache))]
+        _sort_key_cache[text] = key
+    return key
+
+
+def coll_read_sort_key_cache(cache_file_name):
+    """
+    Add to the cache of sort keys those saved in the given file by
+    coll_write_sort_key_cache, if it exists and was written with the
+    same version of ICU.  The file should not be writable by anyone
+    not trusted to run code as the user reading it.
+    """
+    cache = read_cache_file(cache_file_name, _sort_key_cache_version)
+    if cache is None:
+        return
+    with _sort_key_cache_lock:
+        for text, key in cache['keys'].items():
+            if len(_sort_key_cache) >= _sort_key_cache_max:
+                break
+            _sort_key_cache.setdefault(text, key)
 
-_collator = icu.Collator.createInstance(icu.Locale('en_GB'))
 
-coll_get_sort_key = _collator.getSortKey
-"""Get a collation sort key for some Unicode text."""
+def coll_write_sort_key_cache(cache_file_name):
+    """Save the cache of sort keys in the given file."""
+    with _sort_key_cache_lock:
+        keys = dict(_sort_key_cache)
+    write_cache_file(cache_file_name, {'version': _sort_key_cache_version,
+                                       'keys': keys})
@@ -44,6 +44,140 @@ from matholymp.regdata import file_url_to_local
 __all__ = ['CSVDataSource']
 
 
+# Conversions from the string contents of a CSV field (with the given
+# column heading, used in error messages) to the value of the
+# corresponding attribute.
+
+
+def _csv_to_str(key, s):
+    """Convert a CSV string field, empty meaning None."""
+    if s == '':
+        return None
+    return s
+
+
+def _csv_to_int(key, s):
+    """Convert a CSV integer field, empty meaning None."""
+    if s == '':
+        return None
+    return int(s)
+
+
+def _csv_to_date(key, s):
+    """Convert a CSV date field, empty meaning None."""
+    if s == '':
+        return None
+    return date_from_ymd_iso(key, s)
+
+
+def _csv_to_time(key, s):
+    """Convert a CSV time field, empty meaning None."""
+    if s == '':
+        return None
+    return time_from_hhmm_iso(key, s)
+
+
+def _csv_to_bool(key, s):
+    """Convert a CSV boolean field."""
+    return boolean_states[s.lower()]
+
+
+def _csv_to_bool_none(key, s):
+    """Convert a CSV boolean field, empty meaning None."""
+    if s == '':
+        return None
+    return boolean_states[s.lower()]
+
+
+def _csv_to_list(key, s):
+    """Convert a CSV comma-separated list field."""
+    return comma_split(s)
+
+
+class _ConversionError:
+
+    """
+    A _ConversionError stands in a column for a value that could not
+    be converted from a CSV field; some fields are only meaningful
+    (and only valid) for some rows, so the error is only raised if
+    the value is used.
+    """
+
+    __slots__ = ('exc',)
+
+    def __init__(self, exc):
+        """Initialise a _ConversionError for the given exception."""
+        self.exc = exc
+
+
+class _ConstantColumn:
+
+    """
+    A _ConstantColumn stands for a column with the same value in
+    every row, such as a column that is empty in every row or is
+    missing from a CSV file, without storing that value for each row.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        """Initialise a _ConstantColumn with the given value."""
+        self.value = value
+
+
+def _convert_column(rows, keys, conv_row):
+    """
+    Return a column of values converted from all rows of a CSV file,
+    given the column headings used and a function to convert the
+    value from one row, given the index and contents of the row.
+    Equal values (other than lists) are shared between rows.
+    """
+    for k in keys:
+        if rows and k not in rows[0]:
+            return _ConstantColumn(_ConversionError(KeyError(k)))
+    col = []
+    shared = {}
+    for idx, row in enumerate(rows):
+        try:
+            v = conv_row(idx, row)
+        except (KeyError, ValueError) as exc:
+            v = _ConversionError(exc)
+        if not isinstance(v, (list, _ConversionError)):
+            v = shared.setdefault(v, v)
+        col.append(v)
+    if col and col[0] in (None, []) and all(v == col[0] for v in col):
+        return _ConstantColumn(col[0])
+    return col
+
+
+def _column_value(col, idx):
+    """Return the value from a column for the row with the given index."""
+    if isinstance(col, _ConstantColumn):
+        v = col.value
+    else:
+        v = col[idx]
+    if isinstance(v, _ConversionError):
+        raise v.exc.with_traceback(None)
+    if isinstance(v, (list, tuple)):
+        # Return a new list each time, as the caller may modify it.
+        v = list(v)
+    return v
+
+
+def _attr_conv(*maps):
+    """
+    Return a dict mapping attribute names to pairs of CSV column
+    heading and conversion function, given pairs of a dict mapping
+    attribute names to CSV column headings and the conversion
+    function for those attributes.
+    """
+    r = {}
+    for attr_map, conv in maps:
+        for name, key in attr_map.items():
+            r[name] = (key, conv)
+    return r
+
+
 class CSVDataSource(DataSource):
 
     """Subclass of DataSource providing information from CSV files."""
@@ -59,6 +193,16 @@ class CSVDataSource(DataSource):
         self._countries = {}
         self._people = {}
         self._local_dir = local_dir
+        # Each row of people.csv and countries.csv has an index, and
+        # the values of each attribute for all rows are converted
+        # from the strings once, when the data is loaded, and stored
+        # in a per-attribute column with the same indices; the rows
+        # themselves are not kept.
+        self._person_columns = {}
+        self._person_guide_for = None
+        self._country_columns = {}
+        self._event_columns = {}
+        self._country_name_ids = {}
         if events is None:
             # Data direct from registration system used for generating
             # documents; no CSV file of event data.
@@ -99,15 +243,16 @@ class CSVDataSource(DataSource):
             self._papers[eid].append(Paper(int(p['Day']), p['Language'],
                                            p['Description'], p['URL']))
         self._country_ids = set()
-        for c in countries:
+        for idx, c in enumerate(countries):
             eid = int(c[cfg['num_key']])
             cid = int(c['Country Number'])
             self._country_ids.add(cid)
             if cid in self._countries[eid]:
                 raise ValueError('duplicate event %d country %d' % (eid, cid))
-            self._countries[eid][cid] = c
+            self._countries[eid][cid] = idx
         self._person_ids = set()
-        for p in people:
+        person_events = []
+        for idx, p in enumerate(people):
             eid = int(p[cfg['num_key']])
             pid = int(p['Person Number'])
             cid = int(p['Country Number'])
@@ -117,7 +262,56 @@ class CSVDataSource(DataSource):
             if cid in self._people[eid][pid]:
                 raise ValueError('duplicate event %d country %d person %d'
                                  % (eid, cid, pid))
-            self._people[eid][pid][cid] = p
+            self._people[eid][pid][cid] = idx
+            person_events.append(eid)
+        for name, (k, conv) in CSVDataSource._person_event_attr_conv.items():
+            self._person_columns[name] = _convert_column(
+                people, [k], lambda n, p, k=k, conv=conv: conv(k, p[k]))
+        self._convert_person_list_columns(people, person_events)
+        for name, (k, conv) in CSVDataSource._country_event_attr_conv.items():
+            self._country_columns[name] = _convert_column(
+                countries, [k], lambda n, c, k=k, conv=conv: conv(k, c[k]))
+        # Whether countries are official is only available with the
+        # configuration for site generation.
+        official_key = cfg.get('official_desc')
+        if official_key is not None:
+            self._country_columns['is_official'] = _convert_column(
+                countries, [official_key],
+                lambda n, c: CSVDataSource._csv_to_official(c[official_key]))
+
+    def _num_problems(self, event_id):
+        """Return the number of problems at an event."""
+        return int(self._events[event_id]['Number of Problems'])
+
+    def _num_exams(self, event_id):
+        """Return the number of exams at an event."""
+        return int(self._events[event_id]['Number of Exams'])
+
+    def _convert_person_list_columns(self, people, person_events):
+        """
+        Convert the columns for attributes of people with one value
+        for each problem or exam, given the rows of people.csv and the
+        event id for each row.
+        """
+        num_problems = {eid: self._num_problems(eid) for eid in self._events}
+        num_exams = {eid: self._num_exams(eid) for eid in self._events}
+        max_problems = max(num_problems.values(), default=0)
+        max_exams = max(num_exams.values(), default=0)
+        for name, heading, conv, num_map, num_max in (
+                ('problem_scores', 'P%d', _csv_to_int, num_problems,
+                 max_problems),
+                ('script_scan_urls', 'Script Scan P%d URL', _csv_to_str,
+                 num_problems, max_problems),
+                ('scratch_scan_urls', 'Scratch Scan Day %d URL', _csv_to_str,
+                 num_exams, max_exams)):
+            keys = [heading % (n + 1) for n in range(num_max)]
+            self._person_columns[name] = _convert_column(
+                people, keys,
+                lambda n, p, keys=keys, conv=conv, num_map=num_map: tuple(
+                    conv(k, p[k]) for k in keys[:num_map[person_events[n]]]))
+        self._person_guide_for = _convert_column(
+            people, ['Guide For'],
+            lambda n, p: tuple(comma_split(p['Guide For'])))
 
     def event_group_get_attr(self, name):
         if name in ('short_name', 'short_name_plural', 'long_name',
@@ -171,29 +365,21 @@ class CSVDataSource(DataSource):
                                   'honourable_mentions_available':
                                   'Honourable Mentions Available'}
 
+    _event_attr_conv = _attr_conv((_event_attr_map_str, _csv_to_str),
+                                  (_event_attr_map_date, _csv_to_date),
+                                  (_event_attr_map_int, _csv_to_int),
+                                  (_event_attr_map_bool_maybe, _csv_to_bool))
+
     def event_get_attr(self, event_id, name):
-        if name in CSVDataSource._event_attr_map_str:
-            s = self._events[event_id][CSVDataSource._event_attr_map_str[name]]
-            if s == '':
-                s = None
-            return s
-        if name in CSVDataSource._event_attr_map_date:
-            k = CSVDataSource._event_attr_map_date[name]
-            s = self._events[event_id][k]
-            if s == '':
-                return None
-            else:
-                return date_from_ymd_iso(k, s)
-        if name in CSVDataSource._event_attr_map_int:
-            s = self._events[event_id][CSVDataSource._event_attr_map_int[name]]
-            if s == '':
-                return None
-            else:
-                return int(s)
-        if name in CSVDataSource._event_attr_map_bool_maybe:
-            k = CSVDataSource._event_attr_map_bool_maybe[name]
-            s = self._events[event_id][k]
-            return boolean_states[s.lower()]
+        if name in CSVDataSource._event_attr_conv:
+            # Events may lack some columns when the data comes from
+            # the registration system, so values are converted per
+            # event rather than per column.
+            col = self._event_columns.setdefault(name, {})
+            if event_id not in col:
+                k, conv = CSVDataSource._event_attr_conv[name]
+                col[event_id] = conv(k, self._events[event_id][k])
+            return col[event_id]
         if name == 'marks_per_problem':
             np = int(self._events[event_id]['Number of Problems'])
             return [int(self._events[event_id]['P%d Max' % (n + 1)])
@@ -268,63 +454,73 @@ class CSVDataSource(DataSource):
                                         'basic_data_missing':
                                         'Basic Data Missing'}
 
+    _person_event_attr_map_list = {'languages': 'Languages',
+                                   'other_roles': 'Other Roles',
+                                   'extra_awards': 'Extra Awards'}
+
+    _person_event_attr_conv = _attr_conv(
+        (_person_event_attr_map_str, _csv_to_str),
+        (_person_event_attr_map_date, _csv_to_date),
+        (_person_event_attr_map_time, _csv_to_time),
+        (_person_event_attr_map_int, _csv_to_int),
+        (_person_event_attr_map_bool_none, _csv_to_bool_none),
+        (_person_event_attr_map_list, _csv_to_list))
+
+    def _person_event_value(self, name, event_id, person_id, country_id):
+        """Return the value of a person attribute from people.csv."""
+        return _column_value(self._person_columns[name],
+                             self._people[event_id][person_id][country_id])
+
+    def _country_name_map(self, event_id):
+        """
+        Return a dict mapping country names at an event to the lists
+        of countries with those names.
+        """
+        r = self._country_name_ids.get(event_id)
+        if r is None:
+            r = {}
+            for cid in self._countries[event_id]:
+                name = self._country_event_value('name', event_id, cid)
+                r.setdefault(name, []).append(cid)
+            self._country_name_ids[event_id] = r
+        return r
+
+    def _local_filename(self, url, subdir, file_type, person_id):
+        """
+        Return the local file name for a URL for a file relating to a
+        person, or None if there is no such file.
+        """
+        if url is None:
+            return None
+        if self._reg_system:
+            return file_url_to_local(url, os.path.join(self._local_dir,
+                                                       subdir),
+                                     file_type, person_id)
+        else:
+            url_path = url[len(self._cfg['url_base']):]
+            url_dirs = url_path.split('/')
+            return os.path.join(self._local_dir, *url_dirs)
+
     def person_event_get_attr(self, person_id, country_id, event_id, name):
         if name == '_country_ids':
             assert country_id is None
             return list(self._people[event_id][person_id].keys())
         assert country_id is not None
-        if name in CSVDataSource._person_event_attr_map_str:
-            k = CSVDataSource._person_event_attr_map_str[name]
-            s = self._people[event_id][person_id][country_id][k]
-            if s == '':
-                s = None
-            return s
-        if name in CSVDataSource._person_event_attr_map_date:
-            k = CSVDataSource._person_event_attr_map_date[name]
-            s = self._people[event_id][person_id][country_id][k]
-            if s == '':
-                return None
-            else:
-                return date_from_ymd_iso(k, s)
-        if name in CSVDataSource._person_event_attr_map_time:
-            k = CSVDataSource._person_event_attr_map_time[name]
-            s = self._people[event_id][person_id][country_id][k]
-            if s == '':
-                return None
-            else:
-                return time_from_hhmm_iso(k, s)
-        if name in CSVDataSource._person_event_attr_map_int:
-            k = CSVDataSource._person_event_attr_map_int[name]
-            s = self._people[event_id][person_id][country_id][k]
-            if s == '':
-                return None
-            else:
-                return int(s)
-        if name in CSVDataSource._person_event_attr_map_bool_none:
-            k = CSVDataSource._person_event_attr_map_bool_none[name]
-            s = self._people[event_id][person_id][country_id][k]
-            if s == '':
-                return None
-            else:
-                return boolean_states[s.lower()]
+        if name in self._person_columns:
+            return self._person_event_value(name, event_id, person_id,
+                                            country_id)
         if name == 'photo_thumb_url':
-            url = self._people[event_id][person_id][country_id]['Photo URL']
-            if url == '' or '.' not in url:
+            url = self._person_event_value('photo_url', event_id, person_id,
+                                           country_id)
+            if url is None or '.' not in url:
                 return None
             url_split = url.rsplit('.', 1)
             return '%s-t%%(width)d.jpg' % url_split[0]
         if name == 'photo_filename':
-            url = self._people[event_id][person_id][country_id]['Photo URL']
-            if url == '':
-                return None
-            if self._reg_system:
-                return file_url_to_local(url, os.path.join(self._local_dir,
-                                                           'photos'),
-                                         'photo', person_id)
-            else:
-                url_path = url[len(self._cfg['url_base']):]
-                url_dirs = url_path.split('/')
-                return os.path.join(self._local_dir, *url_dirs)
+            return self._local_filename(
+                self._person_event_value('photo_url', event_id, person_id,
+                                         country_id),
+                'photos', 'photo', person_id)
         if name == 'photo_thumb_filename':
             filename = self.person_event_get_attr(person_id, country_id,
                                                   event_id, 'photo_filename')
@@ -333,104 +529,44 @@ class CSVDataSource(DataSource):
             filename_split = filename.rsplit('.', 1)
             return '%s-t%%(width)d.jpg' % filename_split[0]
         if name == 'badge_photo_filename':
-            url = self._people[event_id][person_id][country_id][
-                'Badge Photo URL']
-            if url == '':
-                return None
-            if self._reg_system:
-                return file_url_to_local(url, os.path.join(self._local_dir,
-                                                           'photos'),
-                                         'photo', person_id)
-            else:
-                # Not actually a possible case.
-                url_path = url[len(self._cfg['url_base']):]
-                url_dirs = url_path.split('/')
-                return os.path.join(self._local_dir, *url_dirs)
+            # Only actually possible with data from the registration
+            # system.
+            return self._local_filename(
+                self._person_event_value('badge_photo_url', event_id,
+                                         person_id, country_id),
+                'photos', 'photo', person_id)
         if name == 'consent_form_filename':
-            k = 'Consent Form URL'
-            url = self._people[event_id][person_id][country_id][k]
-            if url == '':
-                return None
-            if self._reg_system:
-                return file_url_to_local(url, os.path.join(self._local_dir,
-                                                           'consent-forms'),
-                                         'consent-form', person_id)
-            else:
-                # Not actually a possible case.
-                url_path = url[len(self._cfg['url_base']):]
-                url_dirs = url_path.split('/')
-                return os.path.join(self._local_dir, *url_dirs)
+            # Only actually possible with data from the registration
+            # system.
+            return self._local_filename(
+                self._person_event_value('consent_form_url', event_id,
+                                         person_id, country_id),
+                'consent-forms', 'consent-form', person_id)
         if name == 'id_scan_filename':
-            k = 'ID Scan URL'
-            url = self._people[event_id][person_id][country_id][k]
-            if url == '':
-                return None
-            if self._reg_system:
-                return file_url_to_local(url, os.path.join(self._local_dir,
-                                                           'id-scans'),
-                                         'id-scan', person_id)
-            else:
-                # Not actually a possible case.
-                url_path = url[len(self._cfg['url_base']):]
-                url_dirs = url_path.split('/')
-                return os.path.join(self._local_dir, *url_dirs)
-        if name == 'script_scan_urls':
-            r = []
-            for n in range(int(self._events[event_id]['Number of Problems'])):
-                s = (self._people[event_id][person_id][country_id]
-                     ['Script Scan P%d URL' % (n + 1)])
-                if s == '':
-                    s = None
-                r.append(s)
-            return r
+            # Only actually possible with data from the registration
+            # system.
+            return self._local_filename(
+                self._person_event_value('id_scan_url', event_id,
+                                         person_id, country_id),
+                'id-scans', 'id-scan', person_id)
         if name == 'script_scan_filenames':
             # Not supported from CSV data.
-            return [None for n in range(int(
-                self._events[event_id]['Number of Problems']))]
-        if name == 'scratch_scan_urls':
-            r = []
-            for n in range(int(self._events[event_id]['Number of Exams'])):
-                s = (self._people[event_id][person_id][country_id]
-                     ['Scratch Scan Day %d URL' % (n + 1)])
-                if s == '':
-                    s = None
-                r.append(s)
-            return r
+            return [None for n in range(self._num_problems(event_id))]
         if name == 'scratch_scan_filenames':
             # Not supported from CSV data.
-            return [None for n in range(int(
-                self._events[event_id]['Number of Exams']))]
-        if name == 'languages':
-            s = self._people[event_id][person_id][country_id]['Languages']
-            return comma_split(s)
-        if name == 'other_roles':
-            s = self._people[event_id][person_id][country_id]['Other Roles']
-            return comma_split(s)
-        if name == 'extra_awards':
-            s = self._people[event_id][person_id][country_id]['Extra Awards']
-            return comma_split(s)
+            return [None for n in range(self._num_exams(event_id))]
         if name == '_guide_for_ids':
-            s = self._people[event_id][person_id][country_id]['Guide For']
-            cnames = comma_split(s)
+            cnames = _column_value(
+                self._person_guide_for,
+                self._people[event_id][person_id][country_id])
             r = []
-            ce = self._countries[event_id].values()
+            name_map = self._country_name_map(event_id)
             for cn in cnames:
-                cl = [int(c['Country Number']) for c in ce if c['Name'] == cn]
+                cl = name_map.get(cn, [])
                 if len(cl) != 1:
                     raise ValueError('bad number of countries called %s' % cn)
                 r.extend(cl)
             return r
-        if name == 'problem_scores':
-            r = []
-            for n in range(int(self._events[event_id]['Number of Problems'])):
-                s = (self._people[event_id][person_id][country_id]
-                     ['P%d' % (n + 1)])
-                if s == '':
-                    s = None
-                else:
-                    s = int(s)
-                r.append(s)
-            return r
         raise KeyError(name)
 
     def person_event_have_attr(self, person_id, country_id, event_id, name):
@@ -459,33 +595,40 @@ class CSVDataSource(DataSource):
         'is_normal': 'Normal',
         'expected_numbers_confirmed': 'Expected Numbers Confirmed'}
 
+    _country_event_attr_map_list = {'contact_emails': 'Contact Emails'}
+
+    _country_event_attr_conv = _attr_conv(
+        (_country_event_attr_map_str, _csv_to_str),
+        (_country_event_attr_map_int, _csv_to_int),
+        (_country_event_attr_map_bool, _csv_to_bool),
+        (_country_event_attr_map_list, _csv_to_list))
+
+    @staticmethod
+    def _csv_to_official(s):
+        """Convert the CSV field for whether a country is official."""
+        if s == 'Yes':
+            return True
+        if s == 'No':
+            return False
+        raise ValueError('unexpected official setting %s' % s)
+
+    def _country_event_value(self, name, event_id, country_id):
+        """Return the value of a country attribute from countries.csv."""
+        return _column_value(self._country_columns[name],
+                             self._countries[event_id][country_id])
+
     def country_event_get_attr(self, country_id, event_id, name):
-        if name in CSVDataSource._country_event_attr_map_str:
-            k = CSVDataSource._country_event_attr_map_str[name]
-            s = self._countries[event_id][country_id][k]
-            if s == '':
-                s = None
-            return s
-        if name in CSVDataSource._country_event_attr_map_int:
-            k = CSVDataSource._country_event_attr_map_int[name]
-            s = self._countries[event_id][country_id][k]
-            if s == '':
-                return None
-            else:
-                return int(s)
-        if name in CSVDataSource._country_event_attr_map_bool:
-            k = CSVDataSource._country_event_attr_map_bool[name]
-            s = self._countries[event_id][country_id][k]
-            return boolean_states[s.lower()]
+        if name in self._country_columns:
+            return self._country_event_value(name, event_id, country_id)
         if name == 'flag_thumb_url':
-            url = self._countries[event_id][country_id]['Flag URL']
-            if url == '' or '.' not in url:
+            url = self._country_event_value('flag_url', event_id, country_id)
+            if url is None or '.' not in url:
                 return None
             url_split = url.rsplit('.', 1)
             return '%s-t%%(width)d.png' % url_split[0]
         if name == 'flag_filename':
-            url = self._countries[event_id][country_id]['Flag URL']
-            if url == '':
+            url = self._country_event_value('flag_url', event_id, country_id)
+            if url is None:
                 return None
             if self._reg_system:
                 return file_url_to_local(url, os.path.join(self._local_dir,
@@ -502,15 +645,4 @@ class CSVDataSource(DataSource):
                 return None
             filename_split = filename.rsplit('.', 1)
             return '%s-t%%(width)d.png' % filename_split[0]
-        if name == 'is_official':
-            k = self._cfg['official_desc']
-            s = self._countries[event_id][country_id][k]
-            if s == 'Yes':
-                return True
-            if s == 'No':
-                return False
-            raise ValueError('unexpected official setting %s' % s)
-        if name == 'contact_emails':
-            s = self._countries[event_id][country_id]['Contact Emails']
-            return comma_split(s)
         raise KeyError(name)
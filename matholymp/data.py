@@ -33,13 +33,23 @@ countries involved in them, with data provided by a subclass of
 DataSource.
 """
 
+import array
 import collections.abc
+import datetime
+import fractions
+import hashlib
+import os
+import pickle
+import threading
+import time
 
 from matholymp.collate import coll_get_sort_key
-from matholymp.stats import mean_std_dev, corr_coeff
+from matholymp.fileutil import temp_file_name, remove_if_exists
+from matholymp.stats import mean_std_dev, corr_coeff, corr_coeff_matrix, \
+    MeanStdDevAccumulator
 
 __all__ = ['EventGroup', 'Event', 'Paper', 'Person', 'PersonEvent',
-           'Country', 'CountryEvent']
+           'Country', 'CountryEvent', 'CountryStatsCube']
 
 _award_types = ['Gold Medal', 'Silver Medal', 'Bronze Medal',
                 'Honourable Mention']
@@ -47,44 +57,488 @@ _award_types = ['Gold Medal', 'Silver Medal', 'Bronze Medal',
 _award_types_no_hm = ['Gold Medal', 'Silver Medal', 'Bronze Medal']
 
 
+def _competition_ranks(items, score_func):
+    """
+    Return a list of pairs of an item and its rank, given a list of
+    items sorted by descending score, where items with the same score
+    have the same rank.
+    """
+    r = []
+    rank = 0
+    nrank = 0
+    last_score = None
+    for item in items:
+        nrank += 1
+        score = score_func(item)
+        if score != last_score:
+            rank = nrank
+            last_score = score
+        r.append((item, rank))
+    return r
+
+
+def _cumulative_stats(stats):
+    """
+    Return a list giving, for each score s from 0 to one more than the
+    maximum score, the number of people with score at least s, given
+    a list giving the number of people with each score.
+    """
+    r = [0 for s in range(len(stats) + 1)]
+    for s in range(len(stats) - 1, -1, -1):
+        r[s] = r[s + 1] + stats[s]
+    return r
+
+
+def _count_at_least(cum_stats, score):
+    """
+    Return the number of people with score at least the given score,
+    given a list as returned by _cumulative_stats.
+    """
+    if score <= 0:
+        return cum_stats[0]
+    if score >= len(cum_stats):
+        return 0
+    return cum_stats[score]
+
+
+def _medal_counts(cum_stats, gold, silver, bronze):
+    """
+    Return a dict of the number of each medal, given medal boundaries
+    and a list as returned by _cumulative_stats.
+    """
+    num_gold = _count_at_least(cum_stats, gold)
+    num_gold_silver = _count_at_least(cum_stats, silver)
+    num_medals = _count_at_least(cum_stats, bronze)
+    return {'Gold Medal': num_gold,
+            'Silver Medal': num_gold_silver - num_gold,
+            'Bronze Medal': num_medals - num_gold_silver}
+
+
 class _LazyMap(collections.abc.Mapping):
 
-    """A mapping where values are created dynamically."""
+    """
+    A mapping where values are created dynamically.  Values are only
+    created with the given lock held, so that concurrent lookups of
+    the same key return the same value.  If an owning object and the
+    name of the mapping in that object are given, lookups in and
+    iteration over the mapping are recorded by the object's
+    _CacheTracker, if any, as accesses to the pseudo-attributes (name,
+    key) and (name,) respectively.
+    """
 
-    def __init__(self, test_func, get_func, list_func):
+    def __init__(self, lock, test_func, get_func, list_func, owner=None,
+                 name=None):
+        self._lock = lock
         self._dict = {}
         self._test_func = test_func
         self._get_func = get_func
         self._list_func = list_func
         self._not_keys = set()
         self._have_all_keys = False
+        self._owner = owner
+        self._name = name
+
+    def _record_access(self, name):
+        owner = self._owner
+        if owner is not None and owner._tracker is not None:
+            with self._lock:
+                owner._tracker.record_access(owner, name)
 
     def __getitem__(self, key):
+        self._record_access((self._name, key))
         if self._have_all_keys or key in self._dict:
             return self._dict[key]
-        if key in self._not_keys:
-            raise KeyError(key)
-        if self._test_func(key):
-            self._dict[key] = self._get_func(key)
-            return self._dict[key]
-        else:
-            self._not_keys.add(key)
-            raise KeyError(key)
+        with self._lock:
+            if self._have_all_keys or key in self._dict:
+                return self._dict[key]
+            if key in self._not_keys:
+                raise KeyError(key)
+            if self._test_func(key):
+                self._dict[key] = self._get_func(key)
+                return self._dict[key]
+            else:
+                self._not_keys.add(key)
+                raise KeyError(key)
 
     def __iter__(self):
+        self._record_access((self._name,))
         self._ensure_all_keys()
         return self._dict.__iter__()
 
     def __len__(self):
+        self._record_access((self._name,))
         self._ensure_all_keys()
         return len(self._dict)
 
     def _ensure_all_keys(self):
         if not self._have_all_keys:
-            for key in self._list_func():
-                if key not in self._dict:
-                    self._dict[key] = self._get_func(key)
-            self._have_all_keys = True
+            with self._lock:
+                if not self._have_all_keys:
+                    for key in self._list_func():
+                        if key not in self._dict:
+                            self._dict[key] = self._get_func(key)
+                    self._have_all_keys = True
+
+    def _get_if_created(self, key):
+        """Return the value for a key if already created, else None."""
+        return self._dict.get(key)
+
+
+# Cached attribute values are stored in a list for each object, with
+# the index for each attribute (determined when the class is created)
+# stored in the _PropertyCached object; this marker is stored for
+# values not yet cached.  The list is only extended as far as the
+# highest index of a value cached so far, since many objects only
+# ever have a few of their attributes computed.
+_not_cached = object()
+
+
+def _new_cache(obj):
+    """Return an empty cache for an object."""
+    return []
+
+
+def _cache_lookup(obj, index):
+    """
+    Return the cached value with the given index for an object, or
+    _not_cached if none.
+    """
+    try:
+        return obj._cache[index]
+    except IndexError:
+        return _not_cached
+
+
+def _cache_store(obj, index, value):
+    """Store the cached value with the given index for an object."""
+    cache = obj._cache
+    if index >= len(cache):
+        cache.extend([_not_cached] * (index + 1 - len(cache)))
+    cache[index] = value
+
+
+def _cache_set(obj, name, value):
+    """
+    Set the cached value of an attribute of an object, unless a value
+    is already cached.
+    """
+    index = obj._cache_index[name]
+    if _cache_lookup(obj, index) is _not_cached:
+        _cache_store(obj, index, value)
+
+
+def _cache_clear(obj, name):
+    """Remove any cached value of an attribute of an object."""
+    index = obj._cache_index[name]
+    if index < len(obj._cache):
+        obj._cache[index] = _not_cached
+
+
+def _cache_set_columns(objs, columns):
+    """
+    Set cached values of attributes of a list of objects, given a dict
+    mapping attribute names to lists of values in the same order as
+    the objects.
+    """
+    for name, values in columns.items():
+        for obj, value in zip(objs, values):
+            if obj._tracker is not None:
+                with obj._lock:
+                    obj._tracker.set(obj, name, value)
+            else:
+                _cache_set(obj, name, value)
+
+
+# After EventGroup.materialize, the cache of each object is a tuple,
+# so cannot be modified; values not computed by materialize are
+# computed each time they are accessed.
+
+def _cache_frozen(obj):
+    """Return whether the cache of an object has been made read-only."""
+    return isinstance(obj._cache, tuple)
+
+
+def _cache_freeze(obj):
+    """Make the cache of an object read-only."""
+    obj._cache = tuple(obj._cache)
+
+
+def _compute_cached(objs, names):
+    """
+    Compute the given cached attributes of a list of objects.  A value
+    that cannot be computed (for example, because of an error in the
+    data that only matters if the value is used) is left uncomputed,
+    so the error is only raised if and when it is accessed, as it
+    would have been had it not been computed in advance.
+    """
+    for name in names:
+        for obj in objs:
+            try:
+                getattr(obj, name)
+            except Exception:
+                pass
+
+
+def _object_key(obj):
+    """
+    Return a key identifying an object in the data model, that can be
+    used to find the corresponding object in another EventGroup.
+    """
+    if isinstance(obj, EventGroup):
+        return ('EventGroup',)
+    if isinstance(obj, (Event, Person, Country)):
+        return (type(obj).__name__, obj.id)
+    if isinstance(obj, PersonEvent):
+        return ('PersonEvent', obj.person.id, obj.country.country.id,
+                obj.event.id)
+    if isinstance(obj, CountryEvent):
+        return ('CountryEvent', obj.country.id, obj.event.id)
+    raise TypeError('not an object in the data model: %r' % obj)
+
+
+def _contestant_attr_missing(obj, name):
+    """
+    Return whether an attribute is only meaningful for contestants, or
+    for countries with contestants, and the object is not such a
+    contestant or country.
+    """
+    if name not in getattr(type(obj), '_contestant_only', ()):
+        return False
+    if isinstance(obj, PersonEvent):
+        return not obj.is_contestant
+    return not obj.num_contestants
+
+
+def _value_repr(value):
+    """
+    Return a string representation of a value computed from the data,
+    where objects in the data model are represented by their keys, so
+    that equal strings for values computed from different EventGroups
+    mean equal values.
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes,
+                                           fractions.Fraction,
+                                           datetime.date, datetime.time,
+                                           array.array)):
+        return repr(value)
+    if isinstance(value, list):
+        return '[%s]' % ', '.join(_value_repr(v) for v in value)
+    if isinstance(value, tuple):
+        return '(%s)' % ', '.join(_value_repr(v) for v in value)
+    if isinstance(value, dict):
+        return '{%s}' % ', '.join('%s: %s' % (_value_repr(k), _value_repr(v))
+                                  for k, v in value.items())
+    if isinstance(value, (Paper, CountryStatsCube)):
+        return '<%s %s>' % (type(value).__name__,
+                            _value_repr(value._digest_state()))
+    return '<%s>' % repr(_object_key(value))
+
+
+# Version of the format of EventGroup snapshots, to be increased
+# whenever the representation of any of the classes here changes in a
+# way not reflected in the lists of cached attribute names stored in
+# a snapshot.
+_snapshot_version = 1
+
+
+class _SnapshotDataSource:
+
+    """
+    The DataSource for an EventGroup read from a snapshot, which has
+    all values computed already, so should never be used.
+    """
+
+    def __getattr__(self, name):
+        raise ValueError('EventGroup read from snapshot has no DataSource')
+
+
+# The attributes of objects in the data model that are saved
+# separately in a snapshot, or not saved at all.
+_snapshot_special_attrs = ('_ds', '_cache', '_tracker', '_lock', 'event_map',
+                           'person_map', 'country_map')
+
+
+def _snapshot_new(cls):
+    """Return a new object of the given class, when reading a snapshot."""
+    return cls.__new__(cls)
+
+
+class _SnapshotPickler(pickle.Pickler):
+
+    """
+    A Pickler for EventGroup snapshots.  Objects in the data model
+    are saved without their caches, which are saved separately after
+    all the objects, so that the nesting of the saved data does not
+    depend on the number of objects.
+    """
+
+    def __init__(self, file, classes):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._classes = classes
+
+    def persistent_id(self, obj):
+        if obj is _not_cached:
+            return 'not_cached'
+        return None
+
+    def reducer_override(self, obj):
+        if type(obj) in self._classes:
+            state = {}
+            for name in obj.__slots__:
+                if name not in _snapshot_special_attrs:
+                    state[name] = getattr(obj, name)
+            return (_snapshot_new, (type(obj),), (None, state))
+        return NotImplemented
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+
+    """An Unpickler for EventGroup snapshots."""
+
+    def persistent_load(self, pid):
+        if pid == 'not_cached':
+            return _not_cached
+        raise pickle.UnpicklingError('unknown persistent id %s' % pid)
+
+
+class _CacheTracker:
+
+    """
+    A _CacheTracker is used by an EventGroup for which accesses to
+    cached attribute values are to be monitored.  It may record which
+    cached values were computed using which other attribute values
+    (whether computed or from the DataSource), so that values
+    depending on changed data can be removed from the cache, and may
+    record statistics of cache hits and misses and the time taken to
+    compute values, and may record which values were accessed from
+    outside the data model.
+    """
+
+    def __init__(self, track_dependencies, collect_stats,
+                 record_accesses=False):
+        # The (object, name) pairs for the attributes currently being
+        # computed, innermost last.
+        self._computing = []
+        # The (object, name) pairs for the attributes accessed from
+        # outside the data model (the keys of a dict, used for its
+        # ordering).
+        self.accesses = {} if record_accesses else None
+        # Map from an (object, name) pair to the set of (object, name)
+        # pairs for cached values computed using its value, and the
+        # reverse map, so that when a value is removed from the cache
+        # it can also be removed from the sets of dependents of the
+        # values it was computed from.
+        self._dependents = {} if track_dependencies else None
+        self._prerequisites = {} if track_dependencies else None
+        # Map from a (class name, attribute name) pair to a list of
+        # the number of cache hits, the number of cache misses, the
+        # total time spent computing values and the part of that time
+        # not spent computing other cached values.
+        self.stats = {} if collect_stats else None
+        # For each attribute currently being computed, the time spent
+        # so far computing other cached values.
+        self._child_time = []
+
+    def get(self, obj, name, index, getter):
+        """
+        Return the value of an attribute, with the given index in the
+        object's cache, computing it with the given function if not
+        cached.
+        """
+        key = (obj, name)
+        if self._dependents is not None and self._computing:
+            dependent = self._computing[-1]
+            self._dependents.setdefault(key, set()).add(dependent)
+            self._prerequisites.setdefault(dependent, set()).add(key)
+        if self.accesses is not None and not self._computing:
+            self.accesses[key] = None
+        stats = None
+        if self.stats is not None:
+            stats_key = (type(obj).__name__, name)
+            stats = self.stats.get(stats_key)
+            if stats is None:
+                stats = [0, 0, 0.0, 0.0]
+                self.stats[stats_key] = stats
+        value = _cache_lookup(obj, index)
+        if value is not _not_cached:
+            if stats is not None:
+                stats[0] += 1
+            return value
+        start = time.perf_counter()
+        self._computing.append(key)
+        self._child_time.append(0.0)
+        try:
+            value = getter(obj)
+        except BaseException:
+            if self._dependents is not None:
+                self._forget(key)
+            raise
+        finally:
+            self._computing.pop()
+            child_time = self._child_time.pop()
+        if not _cache_frozen(obj):
+            _cache_store(obj, index, value)
+        elapsed = time.perf_counter() - start
+        if self._child_time:
+            self._child_time[-1] += elapsed
+        if stats is not None:
+            stats[1] += 1
+            stats[2] += elapsed
+            stats[3] += elapsed - child_time
+        return value
+
+    def record_access(self, obj, name):
+        """
+        Record an access to data other than a cached attribute value,
+        if accesses are being recorded.
+        """
+        if self.accesses is not None and not self._computing:
+            self.accesses[(obj, name)] = None
+
+    def set(self, obj, name, value):
+        """
+        Set the cached value of an attribute fetched from the
+        DataSource along with other values, unless a value is already
+        cached.  This counts as a cache miss, with the time taken
+        included in that for the value being computed.
+        """
+        index = obj._cache_index[name]
+        if _cache_lookup(obj, index) is not _not_cached:
+            return
+        _cache_store(obj, index, value)
+        if self.stats is not None:
+            stats_key = (type(obj).__name__, name)
+            stats = self.stats.get(stats_key)
+            if stats is None:
+                stats = [0, 0, 0.0, 0.0]
+                self.stats[stats_key] = stats
+            stats[1] += 1
+
+    def invalidate(self, obj, name):
+        """
+        Remove from the cache the value of an attribute and all values
+        depending on it, directly or indirectly.
+        """
+        if self._dependents is None:
+            raise ValueError('dependency tracking not enabled')
+        pending = [(obj, name)]
+        while pending:
+            key = pending.pop()
+            _cache_clear(*key)
+            pending.extend(self._dependents.pop(key, ()))
+            self._forget(key)
+
+    def _forget(self, key):
+        """
+        Remove the record of which values the value for an (object,
+        name) pair was computed from.
+        """
+        for prerequisite in self._prerequisites.pop(key, ()):
+            dependents = self._dependents.get(prerequisite)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[prerequisite]
 
 
 class _PropertyCached(property):
@@ -94,14 +548,47 @@ class _PropertyCached(property):
     not in the cache.
     """
 
+    # Values already cached are read without locking.  Values are only
+    # computed, and objects only created, with the lock for the
+    # EventGroup held, so concurrent first accesses from different
+    # threads compute each value once and return the same object.
+    # This is a single reentrant lock rather than one lock per value
+    # because computing a value computes others it depends on, and
+    # separate locks would need those taken in a consistent order to
+    # avoid deadlock; since computation holds the GIL in any case,
+    # little concurrency is lost.  Dependency tracking and statistics
+    # update shared state on every access, so those accesses are
+    # also made with the lock held.
+
     def __init__(self, name, getter, doc):
         def get_cached(obj):
-            if name in obj._cache:
-                return obj._cache[name]
-            obj._cache[name] = getter(obj)
-            return obj._cache[name]
+            index = self._index
+            if obj._tracker is not None:
+                with obj._lock:
+                    return obj._tracker.get(obj, name, index, getter)
+            value = _cache_lookup(obj, index)
+            if value is _not_cached:
+                with obj._lock:
+                    value = _cache_lookup(obj, index)
+                    if value is _not_cached:
+                        value = getter(obj)
+                        if not _cache_frozen(obj):
+                            _cache_store(obj, index, value)
+            return value
         super().__init__(get_cached, None, None, doc)
         self.__doc__ = doc
+        self._name = name
+        self._index = None
+
+    def __set_name__(self, owner, attr_name):
+        # Allocate an index in the cache list for objects of the
+        # owning class.
+        if '_cache_names' not in owner.__dict__:
+            owner._cache_names = []
+            owner._cache_index = {}
+        self._index = len(owner._cache_names)
+        owner._cache_names.append(self._name)
+        owner._cache_index[self._name] = self._index
 
 
 class _EventGroupPropertyDS(_PropertyCached):
@@ -124,21 +611,46 @@ class EventGroup:
     CountryEvent classes, are conceptually read-only after
     initialisation, representing a single state of the universe, and
     new instances are expected to be created if that state changes.
+    As an exception, if dependency tracking is enabled, the update_*
+    methods may be used to inform the EventGroup that some values
+    from the DataSource have changed, so that only cached values
+    depending on those are recomputed; this does not support changes
+    to which events, people or countries are present.  Values are
+    computed lazily when first accessed, unless materialize is used
+    to compute them all in advance.  An EventGroup and the objects in
+    it may be used from multiple threads at once.
     """
 
-    def __init__(self, datasource):
-        """Initialise an EventGroup from the given DataSource."""
+    __slots__ = ('_ds', '_cache', '_tracker', '_lock', 'event_map',
+                 'person_map', 'country_map')
+
+    def __init__(self, datasource, track_dependencies=False,
+                 collect_stats=False):
+        """
+        Initialise an EventGroup from the given DataSource, optionally
+        tracking dependencies between cached values to support the
+        update_* methods, and optionally collecting statistics about
+        cached values for property_stats_report.
+        """
         self._ds = datasource
-        self._cache = {}
-        self.event_map = _LazyMap(self._event_id_test,
-                                  self._event_id_get, self._event_id_list)
+        self._cache = _new_cache(self)
+        if track_dependencies or collect_stats:
+            self._tracker = _CacheTracker(track_dependencies, collect_stats)
+        else:
+            self._tracker = None
+        self._lock = threading.RLock()
+        self.event_map = _LazyMap(self._lock, self._event_id_test,
+                                  self._event_id_get, self._event_id_list,
+                                  self, 'event_map')
         """A mapping from the id of an event to the Event object."""
-        self.person_map = _LazyMap(self._person_id_test,
-                                   self._person_id_get, self._person_id_list)
+        self.person_map = _LazyMap(self._lock, self._person_id_test,
+                                   self._person_id_get, self._person_id_list,
+                                   self, 'person_map')
         """A mapping from the id of a person to the Person object."""
-        self.country_map = _LazyMap(self._country_id_test,
+        self.country_map = _LazyMap(self._lock, self._country_id_test,
                                     self._country_id_get,
-                                    self._country_id_list)
+                                    self._country_id_list, self,
+                                    'country_map')
         """A mapping from the id of a country to the Country object."""
 
     short_name = _EventGroupPropertyDS(
@@ -285,6 +797,16 @@ class EventGroup:
         A list of all participations by all people (PersonEvent objects).
         """)
 
+    def _get_person_event_list_sorted(self):
+        return sorted(self.person_event_list, key=lambda x: x.sort_key)
+
+    person_event_list_sorted = _PropertyCached(
+        'person_event_list_sorted', _get_person_event_list_sorted,
+        """
+        A list of all participations by all people (PersonEvent
+        objects), sorted by sort_key.
+        """)
+
     _country_ids = _EventGroupPropertyDS(
         '_country_ids',
         """A list of ids for all countries.""")
@@ -296,6 +818,13 @@ class EventGroup:
         'country_list', _get_country_list,
         """A list of all countries (Country objects).""")
 
+    def _get_country_list_sorted(self):
+        return sorted(self.country_list, key=lambda x: x.sort_key)
+
+    country_list_sorted = _PropertyCached(
+        'country_list_sorted', _get_country_list_sorted,
+        """A list of all countries (Country objects), sorted by sort_key.""")
+
     def _country_id_test(self, country_id):
         return self._ds.country_exists(country_id)
 
@@ -317,6 +846,50 @@ class EventGroup:
         A list of all participations by all countries (CountryEvent objects).
         """)
 
+    def _get_country_event_list_sorted(self):
+        return sorted(self.country_event_list, key=lambda x: x.sort_key)
+
+    country_event_list_sorted = _PropertyCached(
+        'country_event_list_sorted', _get_country_event_list_sorted,
+        """
+        A list of all participations by all countries (CountryEvent
+        objects), sorted by sort_key.
+        """)
+
+    def _get_person_participation_map(self):
+        r = {}
+        for p in self.person_event_list:
+            pid = p.person.id
+            if pid not in r:
+                r[pid] = []
+            r[pid].append(p)
+        return r
+
+    _person_participation_map = _PropertyCached(
+        '_person_participation_map', _get_person_participation_map,
+        """
+        A mapping from the id of a person to a list of all
+        participations by that person (PersonEvent objects), in
+        chronological order.
+        """)
+
+    def _get_country_participation_map(self):
+        r = {}
+        for c in self.country_event_list:
+            cid = c.country.id
+            if cid not in r:
+                r[cid] = []
+            r[cid].append(c)
+        return r
+
+    _country_participation_map = _PropertyCached(
+        '_country_participation_map', _get_country_participation_map,
+        """
+        A mapping from the id of a country to a list of all
+        participations by that country (CountryEvent objects), in
+        chronological order.
+        """)
+
     def _get_max_num_problems(self):
         return max([e.num_problems for e in self.event_list
                     if e.num_problems is not None])
@@ -333,6 +906,396 @@ class EventGroup:
         'max_num_exams', _get_max_num_exams,
         """The maximum number of exams at any event.""")
 
+    def _get_country_stats(self):
+        return CountryStatsCube(self)
+
+    country_stats = _PropertyCached(
+        'country_stats', _get_country_stats,
+        """
+        A CountryStatsCube with totals of the results of contestants
+        from each country at each event.
+        """)
+
+    def _check_track_dependencies(self):
+        if self._tracker is None or self._tracker._dependents is None:
+            raise ValueError('dependency tracking not enabled')
+        if _cache_frozen(self):
+            raise ValueError('EventGroup has been materialized')
+
+    def _invalidate(self, obj, names):
+        self._check_track_dependencies()
+        if obj is not None:
+            with self._lock:
+                for name in names:
+                    self._tracker.invalidate(obj, name)
+
+    def property_stats(self):
+        """
+        Return a dict mapping (class name, attribute name) pairs to
+        tuples of the number of cache hits, the number of cache misses,
+        the total time spent computing values of that attribute and
+        the part of that time not spent computing other cached
+        values, for cached attributes accessed so far.  Requires
+        statistics collection to be enabled.
+        """
+        if self._tracker is None or self._tracker.stats is None:
+            raise ValueError('statistics collection not enabled')
+        return {k: tuple(v) for k, v in self._tracker.stats.items()}
+
+    def property_stats_report(self):
+        """
+        Return a text report of the statistics from property_stats,
+        sorted by decreasing time spent computing values of each
+        attribute excluding other cached values.
+        """
+        stats = sorted(self.property_stats().items(),
+                       key=lambda x: (-x[1][3], x[0]))
+        lines = ['%-50s %10s %10s %12s %12s'
+                 % ('Attribute', 'Hits', 'Misses', 'Total time',
+                    'Own time')]
+        for (class_name, name), (hits, misses, total_time,
+                                 own_time) in stats:
+            lines.append('%-50s %10d %10d %12.6f %12.6f'
+                         % ('%s.%s' % (class_name, name), hits, misses,
+                            total_time, own_time))
+        return '\n'.join(lines) + '\n'
+
+    def _created_objects(self):
+        """Return a list of the objects in this EventGroup created so far."""
+        objs = [self]
+        objs.extend(self.event_map._dict.values())
+        objs.extend(self.person_map._dict.values())
+        objs.extend(self.country_map._dict.values())
+        for e in self.event_map._dict.values():
+            objs.extend(e.country_map._dict.values())
+            for pl in e.person_map._dict.values():
+                objs.extend(pl)
+        return objs
+
+    def record_accesses(self, record=True):
+        """
+        Start recording accesses to cached values from outside the
+        data model, for take_accesses, or stop if record is false.
+        Accessing values is slower while they are recorded.
+        """
+        with self._lock:
+            tracker = self._tracker
+            if record:
+                if tracker is None:
+                    tracker = _CacheTracker(False, False, True)
+                elif tracker.accesses is None:
+                    tracker.accesses = {}
+            elif tracker is not None:
+                tracker.accesses = None
+                if tracker._dependents is None and tracker.stats is None:
+                    tracker = None
+            if tracker is not self._tracker:
+                for obj in self._created_objects():
+                    obj._tracker = tracker
+
+    def take_accesses(self):
+        """
+        Return a list of the cached attributes accessed from outside
+        the data model since the EventGroup was created or this method
+        was last called, as pairs of an object key (for
+        object_from_key) and an attribute name, in the order first
+        accessed.  Lookups in the mappings event_map, person_map and
+        country_map of an object are included, with a name that is a
+        pair of the name of the mapping and the key looked up, as is
+        iteration over such a mapping, with a name that is a 1-tuple
+        of the name of the mapping.  Other attributes of objects in
+        the data model identify those objects, and are determined by
+        their keys; methods compute their results from cached
+        attributes, so accesses made by methods called from outside
+        the data model are included.  Requires record_accesses to have
+        been called.
+        """
+        if self._tracker is None or self._tracker.accesses is None:
+            raise ValueError('accesses not being recorded')
+        with self._lock:
+            accesses = self._tracker.accesses
+            self._tracker.accesses = {}
+        return [(_object_key(obj), name) for obj, name in accesses]
+
+    def object_from_key(self, key):
+        """
+        Return the object in this EventGroup with the given key, as
+        returned by take_accesses, or None if there is no such object.
+        """
+        kind = key[0]
+        if kind == 'EventGroup':
+            return self
+        if kind == 'Event':
+            return self.event_map.get(key[1])
+        if kind == 'Person':
+            return self.person_map.get(key[1])
+        if kind == 'Country':
+            return self.country_map.get(key[1])
+        if kind == 'CountryEvent':
+            e = self.event_map.get(key[2])
+            return e.country_map.get(key[1]) if e else None
+        if kind == 'PersonEvent':
+            e = self.event_map.get(key[3])
+            for p in e.person_map.get(key[1], []) if e else []:
+                if p.country.country.id == key[2]:
+                    return p
+            return None
+        raise ValueError('unknown object key %s' % repr(key))
+
+    def attribute_digest(self, key, name):
+        """
+        Return a digest of the value of an attribute of the object
+        with the given key, as returned by take_accesses, so that
+        values in different EventGroups (for example, for different
+        versions of the data) may be compared; return None if there is
+        no such object or the attribute has no value for that object
+        (being only meaningful for contestants, or not provided by
+        the DataSource).
+        """
+        obj = self.object_from_key(key)
+        if obj is None:
+            return None
+        if isinstance(name, tuple):
+            obj_map = getattr(obj, name[0])
+            if len(name) == 1:
+                value = list(obj_map)
+            else:
+                value = obj_map.get(name[1])
+        else:
+            if _contestant_attr_missing(obj, name):
+                return None
+            try:
+                value = getattr(obj, name)
+            except KeyError:
+                # The DataSource does not provide this attribute.
+                return None
+        return hashlib.blake2b(_value_repr(value).encode('utf-8'),
+                               digest_size=16).digest()
+
+    @property
+    def materialized(self):
+        """Whether materialize has been called for this EventGroup."""
+        return _cache_frozen(self)
+
+    def materialize(self, props=None):
+        """
+        Compute cached attributes of this EventGroup and of all the
+        events, people and countries in it, then make the cached
+        values read-only, so that no further computation is done when
+        they are accessed (for example, from processes forked to share
+        the data).  If props is specified, it is a mapping from class
+        names ('EventGroup', 'Event', 'Person', 'PersonEvent',
+        'Country' and 'CountryEvent') to iterables of the names of
+        attributes to compute for all objects of that class;
+        otherwise, all cached attributes are computed except for those
+        only available from the registration system.  Attributes only
+        meaningful for contestants, or for countries with contestants,
+        are only computed for those objects.  Afterwards, attributes
+        that were not computed, including any whose computation raised
+        an exception, are computed again each time they are accessed,
+        and calling the update_* methods raises ValueError.
+        """
+        with self._lock:
+            if _cache_frozen(self):
+                raise ValueError('EventGroup has been materialized')
+            self._compute_all(props)
+            for obj in self._all_objects():
+                _cache_freeze(obj)
+
+    def _all_objects(self):
+        """Return a list of this EventGroup and all objects in it."""
+        return ([self] + self.event_list + self.person_list
+                + self.country_list + self.person_event_list
+                + self.country_event_list)
+
+    def _compute_all(self, props):
+        """
+        Compute cached attributes of this EventGroup and of all the
+        events, people and countries in it, as for materialize.
+        """
+        with self._lock:
+            classes = (EventGroup, Event, Person, PersonEvent, Country,
+                       CountryEvent)
+            names = {}
+            for cls in classes:
+                if props is None:
+                    reg_only = getattr(cls, '_registration_only', ())
+                    names[cls] = [n for n in cls._cache_names
+                                  if n not in reg_only]
+                else:
+                    names[cls] = list(props.get(cls.__name__, ()))
+                    for n in names[cls]:
+                        if n not in cls._cache_index:
+                            raise ValueError('unknown attribute %s.%s'
+                                             % (cls.__name__, n))
+            # Compute values in stages: the lists of objects first, then
+            # attributes of events, then those of participations by
+            # people and countries (fetching attributes from the
+            # DataSource in bulk for each event), and finally those of
+            # people and countries that combine all their participations.
+            # Within each stage, each attribute is computed for all
+            # objects before moving on to the next attribute.
+            events = self.event_list
+            person_events = self.person_event_list
+            country_events = self.country_event_list
+            _compute_cached([self], names[EventGroup])
+            _compute_cached(events, names[Event])
+            pe_ds_names = [n for n in names[PersonEvent]
+                           if isinstance(getattr(PersonEvent, n),
+                                         _PersonEventPropertyDS)
+                           and n not in PersonEvent._prefetch_names]
+            ce_ds_names = [n for n in names[CountryEvent]
+                           if isinstance(getattr(CountryEvent, n),
+                                         _CountryEventPropertyDS)
+                           and n not in CountryEvent._prefetch_names]
+            # If fetching attributes in bulk fails, they are computed
+            # one at a time below, so only those values that cannot be
+            # computed are left uncomputed.
+            for e in events:
+                if pe_ds_names:
+                    pl = e.person_list
+                    keys = [(p.person.id, p.country.country.id) for p in pl]
+                    try:
+                        _cache_set_columns(pl, self._ds.person_event_get_attrs(
+                            e.id, keys, pe_ds_names))
+                    except Exception:
+                        pass
+                if ce_ds_names:
+                    cl = e.country_list
+                    try:
+                        _cache_set_columns(
+                            cl, self._ds.country_event_get_attrs(
+                                e.id, [c.country.id for c in cl],
+                                ce_ds_names))
+                    except Exception:
+                        pass
+            for cls, objs, cond in ((PersonEvent, person_events,
+                                     lambda p: p.is_contestant),
+                                    (CountryEvent, country_events,
+                                     lambda c: c.num_contestants)):
+                _compute_cached(objs, [n for n in names[cls]
+                                       if n not in cls._contestant_only])
+                _compute_cached([o for o in objs if cond(o)],
+                                [n for n in names[cls]
+                                 if n in cls._contestant_only])
+            _compute_cached(self.person_list, names[Person])
+            _compute_cached(self.country_list, names[Country])
+
+    @staticmethod
+    def _snapshot_layout():
+        return {cls.__name__: cls._cache_names
+                for cls in (EventGroup, Event, Person, PersonEvent, Country,
+                            CountryEvent)}
+
+    def write_snapshot(self, file_name, key=None):
+        """
+        Write a snapshot of this EventGroup, with all its computed
+        values, to the given file.  If materialize has not been
+        called, the values it would compute are computed first, but
+        this EventGroup is not made read-only, so may continue to be
+        used as before.  key is an arbitrary picklable value
+        identifying the data, to be checked by read_snapshot.  The
+        file should not be writable by anyone not trusted to run code
+        as the user reading it.
+        """
+        with self._lock:
+            if not _cache_frozen(self):
+                self._compute_all(None)
+            objs = self._all_objects()
+            maps = [(obj, name, getattr(obj, name)._dict,
+                     getattr(obj, name)._have_all_keys)
+                    for obj in [self] + self.event_list
+                    for name in ('person_map', 'country_map', 'event_map')
+                    if hasattr(obj, name)]
+            snapshot = {'version': _snapshot_version,
+                        'layout': self._snapshot_layout(),
+                        'key': key,
+                        'objects': objs,
+                        'maps': maps,
+                        'caches': [tuple(obj._cache) for obj in objs]}
+        classes = {type(obj) for obj in objs}
+        tmp_file_name = temp_file_name(file_name)
+        try:
+            with open(tmp_file_name, 'wb') as snapshot_file:
+                _SnapshotPickler(snapshot_file, classes).dump(snapshot)
+            os.replace(tmp_file_name, file_name)
+        finally:
+            remove_if_exists(tmp_file_name)
+
+    @staticmethod
+    def read_snapshot(file_name, key=None):
+        """
+        Return an EventGroup read from a snapshot written by
+        write_snapshot.  There is no underlying DataSource, so values
+        not computed when the snapshot was written can only be
+        accessed if they can be computed from those that were;
+        otherwise, accessing them raises ValueError.  ValueError is
+        also raised if the snapshot is for a different version of
+        matholymp or was written with a different key.
+        """
+        with open(file_name, 'rb') as snapshot_file:
+            snapshot = _SnapshotUnpickler(snapshot_file).load()
+        if (not isinstance(snapshot, dict)
+            or snapshot.get('version') != _snapshot_version
+            or snapshot.get('layout') != EventGroup._snapshot_layout()):
+            raise ValueError('snapshot %s is for a different version'
+                             % file_name)
+        if snapshot['key'] != key:
+            raise ValueError('snapshot %s is for different data' % file_name)
+        objs = snapshot['objects']
+        event_group = objs[0]
+        event_group._ds = _SnapshotDataSource()
+        lock = threading.RLock()
+        for obj, cache in zip(objs, snapshot['caches']):
+            obj._cache = cache
+            obj._tracker = None
+            obj._lock = lock
+        for obj, name, obj_map, have_all_keys in snapshot['maps']:
+            lazy_map = _LazyMap(lock, getattr(obj, '_%s_id_test' % name[:-4]),
+                                getattr(obj, '_%s_id_get' % name[:-4]),
+                                getattr(obj, '_%s_id_list' % name[:-4]),
+                                obj, name)
+            lazy_map._dict = obj_map
+            lazy_map._have_all_keys = have_all_keys
+            setattr(obj, name, lazy_map)
+        return event_group
+
+    def update_event_group(self, names):
+        """
+        Discard cached values depending on the given attributes of
+        this EventGroup, which have changed in the DataSource.
+        """
+        self._invalidate(self, names)
+
+    def update_event(self, event_id, names):
+        """
+        Discard cached values depending on the given attributes of an
+        Event, which have changed in the DataSource.
+        """
+        self._invalidate(self.event_map._get_if_created(event_id), names)
+
+    def update_person_event(self, person_id, country_id, event_id, names):
+        """
+        Discard cached values depending on the given attributes of a
+        PersonEvent, which have changed in the DataSource.
+        """
+        self._check_track_dependencies()
+        e = self.event_map._get_if_created(event_id)
+        pl = e.person_map._get_if_created(person_id) if e else None
+        for p in pl or []:
+            if p.country.country.id == country_id:
+                self._invalidate(p, names)
+
+    def update_country_event(self, country_id, event_id, names):
+        """
+        Discard cached values depending on the given attributes of a
+        CountryEvent, which have changed in the DataSource.
+        """
+        self._check_track_dependencies()
+        e = self.event_map._get_if_created(event_id)
+        c = e.country_map._get_if_created(country_id) if e else None
+        self._invalidate(c, names)
+
 
 class _EventPropertyDS(_PropertyCached):
 
@@ -352,6 +1315,13 @@ class Event:
     this particular event, are None.
     """
 
+    __slots__ = ('event_group', 'id', '_cache', '_tracker', '_lock',
+                 'person_map', 'country_map')
+
+    # Attributes whose data is only available from the registration
+    # system, not in the data for the static site.
+    _registration_only = ('people_by_room', 'language_list')
+
     def __init__(self, event_group, event_id):
         """
         Initialise an Event from the given EventGroup.  Normally users
@@ -362,15 +1332,19 @@ class Event:
         """The EventGroup object for this event."""
         self.id = event_id
         """The id of this event."""
-        self._cache = {}
-        self.person_map = _LazyMap(self._person_id_test,
-                                   self._person_id_get, self._person_id_list)
+        self._cache = _new_cache(self)
+        self._tracker = event_group._tracker
+        self._lock = event_group._lock
+        self.person_map = _LazyMap(self._lock, self._person_id_test,
+                                   self._person_id_get, self._person_id_list,
+                                   self, 'person_map')
         """
         A mapping from the id of a person to a list of PersonEvent objects.
         """
-        self.country_map = _LazyMap(self._country_id_test,
+        self.country_map = _LazyMap(self._lock, self._country_id_test,
                                     self._country_id_get,
-                                    self._country_id_list)
+                                    self._country_id_list, self,
+                                    'country_map')
         """A mapping from the id of a country to the CountryEvent object."""
 
     def _get_short_name(self):
@@ -560,13 +1534,58 @@ class Event:
         'marks_total', _get_marks_total,
         """The maximum number of marks available in total at this event.""")
 
+    def _get_problem_score_columns(self):
+        rows = [p.problem_scores for p in self.contestant_list]
+        if not rows:
+            return [[] for n in range(self.num_problems)]
+        return [list(col) for col in zip(*rows)][:self.num_problems]
+
+    _problem_score_columns = _PropertyCached(
+        '_problem_score_columns', _get_problem_score_columns,
+        """
+        A list giving, for each problem, a list of the scores (None if
+        not known) of each contestant on that problem, in the order of
+        contestant_list.
+        """)
+
+    def _get_total_score_column(self):
+        return [p.total_score for p in self.contestant_list]
+
+    _total_score_column = _PropertyCached(
+        '_total_score_column', _get_total_score_column,
+        """
+        A list of the total scores of each contestant, in the order of
+        contestant_list.
+        """)
+
+    def _get_max_total_score_column(self):
+        return [p.max_total_score for p in self.contestant_list]
+
+    _max_total_score_column = _PropertyCached(
+        '_max_total_score_column', _get_max_total_score_column,
+        """
+        A list of the maximum possible total scores of each
+        contestant, in the order of contestant_list.
+        """)
+
+    def _get_official_column(self):
+        return [p.country.is_official for p in self.contestant_list]
+
+    _official_column = _PropertyCached(
+        '_official_column', _get_official_column,
+        """
+        A list of whether each contestant is from an official country,
+        in the order of contestant_list.
+        """)
+
     def _get_problem_stats(self):
-        r = [[0 for s in range(self.marks_per_problem[n] + 1)]
-             for n in range(self.num_problems)]
-        for p in self.contestant_list:
-            for n in range(self.num_problems):
-                if p.problem_scores[n] is not None:
-                    r[n][p.problem_scores[n]] += 1
+        r = []
+        for n, col in enumerate(self._problem_score_columns):
+            counts = [0 for s in range(self.marks_per_problem[n] + 1)]
+            for s in col:
+                if s is not None:
+                    counts[s] += 1
+            r.append(counts)
         return r
 
     problem_stats = _PropertyCached(
@@ -579,9 +1598,7 @@ class Event:
         """)
 
     def _get_problem_mean_std_dev(self):
-        return [mean_std_dev([p.problem_scores[n]
-                              for p in self.contestant_list])
-                for n in range(self.num_problems)]
+        return [mean_std_dev(col) for col in self._problem_score_columns]
 
     problem_mean_std_dev = _PropertyCached(
         'problem_mean_std_dev', _get_problem_mean_std_dev,
@@ -617,9 +1634,9 @@ class Event:
         """)
 
     def _get_problem_corr_with_total(self):
-        return [corr_coeff([(p.problem_scores[n], p.total_score)
-                            for p in self.contestant_list])
-                for n in range(self.num_problems)]
+        totals = self._total_score_column
+        return [corr_coeff(zip(col, totals))
+                for col in self._problem_score_columns]
 
     problem_corr_with_total = _PropertyCached(
         'problem_corr_with_total', _get_problem_corr_with_total,
@@ -630,10 +1647,7 @@ class Event:
         """)
 
     def _get_problem_corr(self):
-        return [[corr_coeff([(p.problem_scores[n1], p.problem_scores[n2])
-                             for p in self.contestant_list])
-                 for n2 in range(self.num_problems)]
-                for n1 in range(self.num_problems)]
+        return corr_coeff_matrix(self._problem_score_columns)
 
     problem_corr = _PropertyCached(
         'problem_corr', _get_problem_corr,
@@ -643,15 +1657,19 @@ class Event:
         problems (for contestants with known scores on both problems).
         """)
 
-    def _get_total_stats_cond(self, cond):
+    def _get_score_stats(self, scores, official_only):
         r = [0 for s in range(self.marks_total + 1)]
-        for p in self.contestant_list:
-            if cond(p):
-                r[p.total_score] += 1
+        if official_only:
+            for s, official in zip(scores, self._official_column):
+                if official:
+                    r[s] += 1
+        else:
+            for s in scores:
+                r[s] += 1
         return r
 
     def _get_total_stats(self):
-        return self._get_total_stats_cond(lambda p: True)
+        return self._get_score_stats(self._total_score_column, False)
 
     total_stats = _PropertyCached(
         'total_stats', _get_total_stats,
@@ -661,7 +1679,7 @@ class Event:
         """)
 
     def _get_total_stats_official(self):
-        return self._get_total_stats_cond(lambda p: p.country.is_official)
+        return self._get_score_stats(self._total_score_column, True)
 
     total_stats_official = _PropertyCached(
         'total_stats_official', _get_total_stats_official,
@@ -671,15 +1689,8 @@ class Event:
         score.
         """)
 
-    def _get_max_total_stats_cond(self, cond):
-        r = [0 for s in range(self.marks_total + 1)]
-        for p in self.contestant_list:
-            if cond(p):
-                r[p.max_total_score] += 1
-        return r
-
     def _get_max_total_stats(self):
-        return self._get_max_total_stats_cond(lambda p: True)
+        return self._get_score_stats(self._max_total_score_column, False)
 
     max_total_stats = _PropertyCached(
         'max_total_stats', _get_max_total_stats,
@@ -690,7 +1701,7 @@ class Event:
         """)
 
     def _get_max_total_stats_official(self):
-        return self._get_max_total_stats_cond(lambda p: p.country.is_official)
+        return self._get_score_stats(self._max_total_score_column, True)
 
     max_total_stats_official = _PropertyCached(
         'max_total_stats_official', _get_max_total_stats_official,
@@ -702,7 +1713,7 @@ class Event:
         """)
 
     def _get_total_mean_std_dev(self):
-        return mean_std_dev([p.total_score for p in self.contestant_list])
+        return mean_std_dev(self._total_score_column)
 
     total_mean_std_dev = _PropertyCached(
         'total_mean_std_dev', _get_total_mean_std_dev,
@@ -762,12 +1773,29 @@ class Event:
         """A list of ids for all people at this event.""")
 
     def _get_person_list(self):
-        return [pe for pl in self.person_map.values() for pe in pl]
+        r = [pe for pl in self.person_map.values() for pe in pl]
+        # Fetch the attributes needed for almost any use of the list
+        # of people in a single call to the DataSource.
+        ds = self.event_group._ds
+        _cache_set_columns(r, ds.person_event_get_attrs(
+            self.id, [(p.person.id, p.country.country.id) for p in r],
+            PersonEvent._prefetch_names))
+        return r
 
     person_list = _PropertyCached(
         'person_list', _get_person_list,
         """A list of all people (PersonEvent objects) at this event.""")
 
+    def _get_person_list_sorted(self):
+        return sorted(self.person_list, key=lambda x: x.sort_key)
+
+    person_list_sorted = _PropertyCached(
+        'person_list_sorted', _get_person_list_sorted,
+        """
+        A list of all people (PersonEvent objects) at this event,
+        sorted by sort_key.
+        """)
+
     def _person_id_test(self, person_id):
         return self.event_group._ds.person_event_exists(person_id, self.id)
 
@@ -781,6 +1809,42 @@ class Event:
     def _person_id_list(self):
         return self._person_ids
 
+    def _get_person_list_by_country(self):
+        r = {}
+        for p in self.person_list:
+            cid = p.country.country.id
+            if cid not in r:
+                r[cid] = []
+            r[cid].append(p)
+        return r
+
+    _person_list_by_country = _PropertyCached(
+        '_person_list_by_country', _get_person_list_by_country,
+        """
+        A mapping from the id of a country to a list of the people
+        (PersonEvent objects) from that country at this event, in the
+        order of person_list.
+        """)
+
+    def _get_guide_list_by_country(self):
+        r = {}
+        for p in self.person_list:
+            for c in p.guide_for:
+                cid = c.country.id
+                if cid not in r:
+                    r[cid] = []
+                if not r[cid] or r[cid][-1] is not p:
+                    r[cid].append(p)
+        return r
+
+    _guide_list_by_country = _PropertyCached(
+        '_guide_list_by_country', _get_guide_list_by_country,
+        """
+        A mapping from the id of a country to a list of the guides
+        (PersonEvent objects) for that country at this event, in the
+        order of person_list.
+        """)
+
     def _get_people_by_room(self):
         r = {}
         for p in self.person_list:
@@ -821,6 +1885,27 @@ class Event:
         'contestant_list', _get_contestant_list,
         """A list of all contestants (PersonEvent objects) at this event.""")
 
+    def _get_contestant_list_sorted(self):
+        return sorted(self.contestant_list, key=lambda x: x.sort_key)
+
+    contestant_list_sorted = _PropertyCached(
+        'contestant_list_sorted', _get_contestant_list_sorted,
+        """
+        A list of all contestants (PersonEvent objects) at this event,
+        sorted by sort_key.
+        """)
+
+    def _get_contestants_by_rank(self):
+        return sorted(self.contestant_list_sorted, key=lambda x: x.rank)
+
+    contestants_by_rank = _PropertyCached(
+        'contestants_by_rank', _get_contestants_by_rank,
+        """
+        A list of all contestants (PersonEvent objects) at this event,
+        sorted by rank, and by sort_key for contestants with the same
+        rank.
+        """)
+
     def _get_num_contestants(self):
         return len(self.contestant_list)
 
@@ -885,6 +1970,223 @@ class Event:
         '_award_types', _get_award_types,
         """A list of types of award available at this event.""")
 
+    def _get_contestants_by_score(self):
+        return sorted(self.contestant_list, key=lambda x: x.total_score,
+                      reverse=True)
+
+    _contestants_by_score = _PropertyCached(
+        '_contestants_by_score', _get_contestants_by_score,
+        """
+        A list of all contestants (PersonEvent objects) at this event,
+        sorted by descending total score.
+        """)
+
+    def rank_contestants(self, cond=None):
+        """
+        Return a list of pairs of a contestant (PersonEvent object)
+        and their rank among those contestants at this event for
+        which cond (a function taking a PersonEvent object) returns
+        true, or among all contestants if cond is None, in order of
+        rank.  This uses a single sorted list of contestants, so
+        ranking a subset of contestants does not require sorting
+        again.
+        """
+        if cond is None:
+            contestants = self._contestants_by_score
+        else:
+            contestants = [p for p in self._contestants_by_score if cond(p)]
+        return _competition_ranks(contestants, lambda x: x.total_score)
+
+    def _get_contestant_rank_map(self):
+        return dict(self.rank_contestants())
+
+    _contestant_rank_map = _PropertyCached(
+        '_contestant_rank_map', _get_contestant_rank_map,
+        """
+        A mapping from contestants (PersonEvent objects) at this event
+        to their ranks.
+        """)
+
+    def _get_contestant_rank_map_official(self):
+        return dict(self.rank_contestants(lambda x: x.country.is_official))
+
+    _contestant_rank_map_official = _PropertyCached(
+        '_contestant_rank_map_official', _get_contestant_rank_map_official,
+        """
+        A mapping from contestants (PersonEvent objects) from official
+        countries at this event to their ranks among such contestants.
+        """)
+
+    def _get_countries_by_score(self):
+        return sorted(self.country_with_contestants_list,
+                      key=lambda x: x.total_score_for_rank, reverse=True)
+
+    _countries_by_score = _PropertyCached(
+        '_countries_by_score', _get_countries_by_score,
+        """
+        A list of all countries (CountryEvent objects) with
+        contestants at this event, sorted by descending total score
+        for ranking purposes.
+        """)
+
+    def rank_countries(self, cond=None):
+        """
+        Return a list of pairs of a country (CountryEvent object) and
+        its rank among those countries with contestants at this event
+        for which cond (a function taking a CountryEvent object)
+        returns true, or among all countries with contestants if cond
+        is None, in order of rank.  This uses a single sorted list of
+        countries, so ranking a subset of countries does not require
+        sorting again.
+        """
+        if cond is None:
+            countries = self._countries_by_score
+        else:
+            countries = [c for c in self._countries_by_score if cond(c)]
+        return _competition_ranks(countries,
+                                  lambda x: x.total_score_for_rank)
+
+    def _get_country_rank_map(self):
+        return dict(self.rank_countries())
+
+    _country_rank_map = _PropertyCached(
+        '_country_rank_map', _get_country_rank_map,
+        """
+        A mapping from countries (CountryEvent objects) with
+        contestants at this event to their ranks.
+        """)
+
+    def _get_country_rank_map_official(self):
+        return dict(self.rank_countries(lambda x: x.is_official))
+
+    _country_rank_map_official = _PropertyCached(
+        '_country_rank_map_official', _get_country_rank_map_official,
+        """
+        A mapping from official countries (CountryEvent objects) with
+        contestants at this event to their ranks among such countries.
+        """)
+
+    def _get_total_stats_cumulative(self):
+        return _cumulative_stats(self.total_stats)
+
+    _total_stats_cumulative = _PropertyCached(
+        '_total_stats_cumulative', _get_total_stats_cumulative,
+        """
+        A list giving, for each possible total score and one more than
+        the maximum, the number of contestants receiving at least that
+        total score.
+        """)
+
+    def _get_total_stats_cumulative_official(self):
+        return _cumulative_stats(self.total_stats_official)
+
+    _total_stats_cumulative_official = _PropertyCached(
+        '_total_stats_cumulative_official',
+        _get_total_stats_cumulative_official,
+        """
+        A list giving, for each possible total score and one more than
+        the maximum, the number of contestants from official countries
+        receiving at least that total score.
+        """)
+
+    def _get_country_total_stats_cumulative(self):
+        r = {}
+        for p, t in zip(self.contestant_list, self._total_score_column):
+            cid = p.country.country.id
+            if cid not in r:
+                r[cid] = [0 for s in range(self.marks_total + 1)]
+            r[cid][t] += 1
+        return {cid: _cumulative_stats(r[cid]) for cid in r}
+
+    _country_total_stats_cumulative = _PropertyCached(
+        '_country_total_stats_cumulative',
+        _get_country_total_stats_cumulative,
+        """
+        A mapping from the id of a country to a list giving, for each
+        possible total score and one more than the maximum, the number
+        of contestants from that country receiving at least that total
+        score.
+        """)
+
+    def medal_counts(self, gold, silver, bronze, official=False):
+        """
+        Return a dict giving the number of each medal that would be
+        awarded at this event (to contestants from official countries
+        only, if official is true) with the given medal boundaries,
+        which need not be the actual boundaries for this event.  This
+        does not depend on the number of contestants.
+        """
+        if not gold >= silver >= bronze:
+            raise ValueError('medal boundaries not in order')
+        if official:
+            cum_stats = self._total_stats_cumulative_official
+        else:
+            cum_stats = self._total_stats_cumulative
+        return _medal_counts(cum_stats, gold, silver, bronze)
+
+    def country_medal_counts(self, gold, silver, bronze):
+        """
+        Return a mapping from each country (CountryEvent object) with
+        contestants at this event to a dict giving the number of each
+        medal that would be awarded to contestants from that country
+        with the given medal boundaries, which need not be the actual
+        boundaries for this event.
+        """
+        if not gold >= silver >= bronze:
+            raise ValueError('medal boundaries not in order')
+        country_cum_stats = self._country_total_stats_cumulative
+        return {c: _medal_counts(country_cum_stats[c.country.id],
+                                 gold, silver, bronze)
+                for c in self.country_with_contestants_list}
+
+    def min_medal_boundaries(self, ratios=(1, 2, 3),
+                             medal_fraction=fractions.Fraction(1, 2),
+                             official=False):
+        """
+        Return the lowest gold, silver and bronze medal boundaries at
+        this event (considering contestants from official countries
+        only, if official is true) such that at most medal_fraction
+        of contestants receive medals and the numbers of gold, silver
+        and bronze medals do not exceed the given ratios, cumulatively
+        from gold downwards (so with the defaults, at most 1/12 of
+        contestants receive gold, at most 1/4 gold or silver and at
+        most 1/2 any medal).  A boundary one more than the maximum
+        total score means no medals of that kind.  The triples of
+        boundaries meeting these targets are exactly those in order
+        with each boundary no lower than the one returned.
+        """
+        if len(ratios) != 3:
+            raise ValueError('expected three medal ratios')
+        if any(ratio < 0 for ratio in ratios):
+            raise ValueError('negative medal ratio')
+        if sum(ratios) == 0:
+            raise ValueError('medal ratios are all zero')
+        if official:
+            cum_stats = self._total_stats_cumulative_official
+        else:
+            cum_stats = self._total_stats_cumulative
+        num = cum_stats[0]
+        ratio_total = sum(ratios)
+        limits = []
+        ratio_sum = 0
+        for ratio in ratios:
+            ratio_sum += ratio
+            limits.append(num * fractions.Fraction(medal_fraction)
+                          * ratio_sum)
+        # The number of contestants with at least a given score only
+        # increases as the score decreases, and the limits increase
+        # from gold to bronze, so a single pass downwards from the
+        # maximum score finds all three boundaries.
+        bounds = [len(cum_stats) - 1 for ratio in ratios]
+        for score in range(len(cum_stats) - 1, -1, -1):
+            count = cum_stats[score] * ratio_total
+            if count > limits[2]:
+                break
+            for n, limit in enumerate(limits):
+                if count <= limit:
+                    bounds[n] = score
+        return tuple(bounds)
+
     def _get_num_awards_cond(self, cond):
         if self.scores_final:
             ival = 0
@@ -922,12 +2224,29 @@ class Event:
         """A list of ids for all countries at this event.""")
 
     def _get_country_list(self):
-        return list(self.country_map.values())
+        r = list(self.country_map.values())
+        # Fetch the attributes needed for almost any use of the list
+        # of countries in a single call to the DataSource.
+        ds = self.event_group._ds
+        _cache_set_columns(r, ds.country_event_get_attrs(
+            self.id, [c.country.id for c in r],
+            CountryEvent._prefetch_names))
+        return r
 
     country_list = _PropertyCached(
         'country_list', _get_country_list,
         """A list of all countries (CountryEvent objects) at this event.""")
 
+    def _get_country_list_sorted(self):
+        return sorted(self.country_list, key=lambda x: x.sort_key)
+
+    country_list_sorted = _PropertyCached(
+        'country_list_sorted', _get_country_list_sorted,
+        """
+        A list of all countries (CountryEvent objects) at this event,
+        sorted by sort_key.
+        """)
+
     def _country_id_test(self, country_id):
         return self.event_group._ds.country_event_exists(country_id, self.id)
 
@@ -958,6 +2277,18 @@ class Event:
         'country_with_contestants_list', _get_country_with_contestants_list,
         """A list of all countries with contestants at this event.""")
 
+    def _get_countries_by_rank(self):
+        return sorted(sorted(self.country_with_contestants_list,
+                             key=lambda x: x.sort_key),
+                      key=lambda x: x.rank)
+
+    countries_by_rank = _PropertyCached(
+        'countries_by_rank', _get_countries_by_rank,
+        """
+        A list of all countries with contestants at this event, sorted
+        by rank, and by sort_key for countries with the same rank.
+        """)
+
     def _get_num_countries(self):
         return len(self.country_with_contestants_list)
 
@@ -1091,6 +2422,10 @@ class Paper:
         self.url = url
         """The URL of this paper."""
 
+    def _digest_state(self):
+        """Return the values defining this paper, for attribute_digest."""
+        return (self.day, self.language, self.description, self.url)
+
 
 class Person:
 
@@ -1099,6 +2434,8 @@ class Person:
     within an EventGroup.
     """
 
+    __slots__ = ('event_group', 'id', '_cache', '_tracker', '_lock')
+
     def __init__(self, event_group, person_id):
         """
         Initialise a Person from the given EventGroup.  Normally users
@@ -1110,12 +2447,12 @@ class Person:
         """The EventGroup object for this person."""
         self.id = person_id
         """The id of this person."""
-        self._cache = {}
+        self._cache = _new_cache(self)
+        self._tracker = event_group._tracker
+        self._lock = event_group._lock
 
     def _get_participation_list(self):
-        partl = [e.person_map[self.id] for e in self.event_group.event_list
-                 if self.id in e.person_map]
-        partl = [p for pl in partl for p in pl]
+        partl = self.event_group._person_participation_map.get(self.id, [])
         partl = sorted(partl, key=lambda p: p.sort_key)
         return partl
 
@@ -1267,6 +2604,29 @@ class PersonEvent:
     same country), they have multiple PersonEvents at the same Event.
     """
 
+    __slots__ = ('person', 'country', 'event', '_cache', '_tracker', '_lock')
+
+    # Attributes whose data is only available from the registration
+    # system, not in the data for the static site.
+    _registration_only = (
+        'badge_photo_url', 'badge_photo_filename', 'badge_background',
+        'badge_colour_outer', 'badge_colour_inner', 'badge_colour_text',
+        'consent_form_url', 'consent_form_filename', 'id_scan_url',
+        'id_scan_filename', 'script_scan_urls', 'script_scan_filenames',
+        'scratch_scan_urls', 'scratch_scan_filenames', 'languages', 'diet',
+        'room_type', 'room_share_with', 'room_number', 'phone_number',
+        'generic_id', 'gender', 'date_of_birth', 'passport_number',
+        'nationality', 'passport_given_name', 'passport_family_name', 'tshirt',
+        'arrival_place', 'arrival_is_airport', 'arrival_date', 'arrival_time',
+        'arrival_flight', 'departure_place', 'departure_is_airport',
+        'departure_date', 'departure_time', 'departure_flight',
+        'event_photos_consent', 'remote_participant', 'basic_data_missing')
+
+    # Attributes only meaningful for contestants.
+    _contestant_only = ('contestant_code', 'have_any_scores', 'total_score',
+                        'max_total_score', 'award', 'awards_str', 'rank',
+                        'rank_official')
+
     def __init__(self, person, country, event):
         """
         Initialise a PersonEvent from the given Person, CountryEvent
@@ -1281,7 +2641,15 @@ class PersonEvent:
         self.event = event
         """The Event object for this PersonEvent."""
         assert person.event_group is event.event_group
-        self._cache = {}
+        self._cache = _new_cache(self)
+        self._tracker = person.event_group._tracker
+        self._lock = person.event_group._lock
+
+    # Attributes fetched from the DataSource for all people at an
+    # event together when the list of people is first needed.  These
+    # are attributes that have valid values for all people.
+    _prefetch_names = ('primary_role', 'other_roles', 'given_name',
+                       'family_name')
 
     annual_url = _PersonEventPropertyDS(
         'annual_url',
@@ -1455,17 +2823,7 @@ class PersonEvent:
 
     def _get_rank(self):
         assert self.is_contestant
-        rank = 0
-        nrank = 0
-        last_score = -1
-        for p in sorted(self.event.contestant_list,
-                        key=lambda x: x.total_score, reverse=True):
-            nrank += 1
-            if p.total_score != last_score:
-                rank = nrank
-                last_score = p.total_score
-            p._cache['rank'] = rank
-        return self._cache['rank']
+        return self.event._contestant_rank_map[self]
 
     rank = _PropertyCached(
         'rank', _get_rank,
@@ -1475,17 +2833,7 @@ class PersonEvent:
         assert self.is_contestant
         if not self.country.is_official:
             return None
-        rank = 0
-        nrank = 0
-        last_score = -1
-        for p in sorted(self.event.contestant_list_official,
-                        key=lambda x: x.total_score, reverse=True):
-            nrank += 1
-            if p.total_score != last_score:
-                rank = nrank
-                last_score = p.total_score
-            p._cache['rank_official'] = rank
-        return self._cache['rank_official']
+        return self.event._contestant_rank_map_official[self]
 
     rank_official = _PropertyCached(
         'rank_official', _get_rank_official,
@@ -1783,6 +3131,8 @@ class Country:
     all).
     """
 
+    __slots__ = ('event_group', 'id', '_cache', '_tracker', '_lock')
+
     def __init__(self, event_group, country_id):
         """
         Initialise a Country from the given EventGroup.  Normally
@@ -1794,11 +3144,13 @@ class Country:
         """The EventGroup object for this country."""
         self.id = country_id
         """The id of this country."""
-        self._cache = {}
+        self._cache = _new_cache(self)
+        self._tracker = event_group._tracker
+        self._lock = event_group._lock
 
     def _get_participation_list(self):
-        return [e.country_map[self.id] for e in self.event_group.event_list
-                if self.id in e.country_map]
+        return list(self.event_group._country_participation_map.get(self.id,
+                                                                    []))
 
     participation_list = _PropertyCached(
         'participation_list', _get_participation_list,
@@ -1931,6 +3283,20 @@ class CountryEvent:
     particular Event.
     """
 
+    __slots__ = ('country', 'event', '_cache', '_tracker', '_lock')
+
+    # Attributes whose data is only available from the registration
+    # system, not in the data for the static site.
+    _registration_only = (
+        'contact_emails', 'expected_leaders', 'expected_deputies',
+        'expected_contestants', 'expected_observers_a', 'expected_observers_b',
+        'expected_observers_c', 'expected_single_rooms',
+        'expected_numbers_confirmed', 'expected_roles', 'billing_address',
+        'leader_email', 'physical_address', 'participation_type', 'generic_id')
+
+    # Attributes only meaningful for countries with contestants.
+    _contestant_only = ('rank', 'rank_official')
+
     def __init__(self, country, event):
         """
         Initialise a CountryEvent from the given Country and Event.
@@ -1943,7 +3309,14 @@ class CountryEvent:
         self.event = event
         """The Event object for this CountryEvent."""
         assert country.event_group is event.event_group
-        self._cache = {}
+        self._cache = _new_cache(self)
+        self._tracker = country.event_group._tracker
+        self._lock = country.event_group._lock
+
+    # Attributes fetched from the DataSource for all countries at an
+    # event together when the list of countries is first needed.
+    # These are attributes that have valid values for all countries.
+    _prefetch_names = ('code', 'name', 'is_normal')
 
     annual_url = _CountryEventPropertyDS(
         'annual_url',
@@ -2109,7 +3482,8 @@ class CountryEvent:
             return [p for pid in ids for p in self.event.person_map[pid]
                     if p.country.country.id == self.country.id]
         else:
-            return [p for p in self.event.person_list if self is p.country]
+            return list(self.event._person_list_by_country.get(
+                self.country.id, []))
 
     person_list = _PropertyCached(
         'person_list', _get_person_list,
@@ -2118,6 +3492,16 @@ class CountryEvent:
         at this event.
         """)
 
+    def _get_person_list_sorted(self):
+        return sorted(self.person_list, key=lambda x: x.sort_key)
+
+    person_list_sorted = _PropertyCached(
+        'person_list_sorted', _get_person_list_sorted,
+        """
+        A list of all people (PersonEvent objects) from this country
+        at this event, sorted by sort_key.
+        """)
+
     def _get_contestant_list(self):
         return [p for p in self.person_list if p.is_contestant]
 
@@ -2128,6 +3512,16 @@ class CountryEvent:
         country at this event.
         """)
 
+    def _get_contestant_list_sorted(self):
+        return sorted(self.contestant_list, key=lambda x: x.sort_key)
+
+    contestant_list_sorted = _PropertyCached(
+        'contestant_list_sorted', _get_contestant_list_sorted,
+        """
+        A list of all contestants (PersonEvent objects) from this
+        country at this event, sorted by sort_key.
+        """)
+
     def _get_num_contestants(self):
         return len(self.contestant_list)
 
@@ -2147,7 +3541,8 @@ class CountryEvent:
                     raise ValueError('Guide present more than once at Event')
             return [p for pl in gl for p in pl]
         else:
-            return [p for p in self.event.person_list if self in p.guide_for]
+            return list(self.event._guide_list_by_country.get(
+                self.country.id, []))
 
     guide_list = _PropertyCached(
         'guide_list', _get_guide_list,
@@ -2156,6 +3551,16 @@ class CountryEvent:
         this event.
         """)
 
+    def _get_guide_list_sorted(self):
+        return sorted(self.guide_list, key=lambda x: x.sort_key)
+
+    guide_list_sorted = _PropertyCached(
+        'guide_list_sorted', _get_guide_list_sorted,
+        """
+        A list of all guides (PersonEvent objects) for this country at
+        this event, sorted by sort_key.
+        """)
+
     def _get_num_awards(self):
         d = {}
         if self.event.scores_final:
@@ -2286,17 +3691,7 @@ class CountryEvent:
 
     def _get_rank(self):
         assert self.num_contestants
-        rank = 0
-        nrank = 0
-        last_score = -1
-        for c in sorted(self.event.country_with_contestants_list,
-                        key=lambda x: x.total_score_for_rank, reverse=True):
-            nrank += 1
-            if c.total_score_for_rank != last_score:
-                rank = nrank
-                last_score = c.total_score_for_rank
-            c._cache['rank'] = rank
-        return self._cache['rank']
+        return self.event._country_rank_map[self]
 
     rank = _PropertyCached(
         'rank', _get_rank,
@@ -2306,17 +3701,7 @@ class CountryEvent:
         assert self.num_contestants
         if not self.is_official:
             return None
-        rank = 0
-        nrank = 0
-        last_score = -1
-        for c in sorted(self.event.country_with_contestants_list_official,
-                        key=lambda x: x.total_score_for_rank, reverse=True):
-            nrank += 1
-            if c.total_score_for_rank != last_score:
-                rank = nrank
-                last_score = c.total_score_for_rank
-            c._cache['rank_official'] = rank
-        return self._cache['rank_official']
+        return self.event._country_rank_map_official[self]
 
     rank_official = _PropertyCached(
         'rank_official', _get_rank_official,
@@ -2339,3 +3724,210 @@ class CountryEvent:
     sort_key = _PropertyCached(
         'sort_key', _get_sort_key,
         """General-purpose sort key.""")
+
+
+class CountryStatsCube:
+
+    """
+    A CountryStatsCube holds totals of the results of the contestants
+    from each country at each event, on each problem, computed in a
+    single pass over all participations, so that statistics for any
+    combination of countries, events and problems can be obtained
+    without examining individual PersonEvent objects.  Countries and
+    events may be specified to its methods as a single Country or
+    Event object, an iterable of such objects, or None for all
+    countries or events; likewise, problems may be specified as a
+    single problem index (starting at 0), an iterable of indices or
+    None.  A CountryStatsCube is normally obtained from the
+    country_stats attribute of an EventGroup.
+    """
+
+    def __init__(self, event_group):
+        """Initialise a CountryStatsCube from the given EventGroup."""
+        self.event_group = event_group
+        """The EventGroup object for this CountryStatsCube."""
+        self.countries = event_group.country_list
+        """The countries (Country objects) covered."""
+        self.events = event_group.event_list
+        """The events (Event objects) covered."""
+        num_problems = [e.num_problems for e in self.events
+                        if e.num_problems is not None]
+        self.num_problems = max(num_problems) if num_problems else 0
+        """The maximum number of problems at any event."""
+        self._country_index = {c: i for i, c in enumerate(self.countries)}
+        self._event_index = {e: i for i, e in enumerate(self.events)}
+        self._award_index = {a: i for i, a in enumerate(_award_types)}
+        # The arrays are indexed by country, then event, then problem
+        # or award.
+        ne = len(self.events)
+        na = len(_award_types)
+        npr = self.num_problems
+        size = len(self.countries) * ne
+        num_contestants = array.array('q', [0]) * size
+        num_awards = array.array('q', [0]) * (size * na)
+        score_n = array.array('q', [0]) * (size * npr)
+        score_s = array.array('q', [0]) * (size * npr)
+        score_s2 = array.array('q', [0]) * (size * npr)
+        country_index = self._country_index
+        event_index = self._event_index
+        award_index = self._award_index
+        for p in event_group.person_event_list:
+            if not p.is_contestant:
+                continue
+            ce = country_index[p.country.country] * ne + event_index[p.event]
+            num_contestants[ce] += 1
+            a = award_index.get(p.award)
+            if a is not None:
+                num_awards[ce * na + a] += 1
+            base = ce * npr
+            for j, s in enumerate(p.problem_scores):
+                if s is not None:
+                    score_n[base + j] += 1
+                    score_s[base + j] += s
+                    score_s2[base + j] += s * s
+        self._num_contestants = num_contestants
+        self._num_awards = num_awards
+        self._score_n = score_n
+        self._score_s = score_s
+        self._score_s2 = score_s2
+
+    def _digest_state(self):
+        """
+        Return the values from which all results of this
+        CountryStatsCube are computed, for attribute_digest, in an
+        order that does not depend on the order of the lists of
+        countries and events.
+        """
+        ne = len(self.events)
+        na = len(_award_types)
+        npr = self.num_problems
+        state = []
+        for c, ci in self._country_index.items():
+            for e, ei in self._event_index.items():
+                ce = ci * ne + ei
+                state.append(((c.id, e.id), self._num_contestants[ce],
+                              self._num_awards[ce * na:(ce + 1) * na],
+                              self._score_n[ce * npr:(ce + 1) * npr],
+                              self._score_s[ce * npr:(ce + 1) * npr],
+                              self._score_s2[ce * npr:(ce + 1) * npr]))
+        state.sort(key=lambda x: x[0])
+        return (npr, state)
+
+    @staticmethod
+    def _indices(sel, index_map):
+        """Return a list of indices for a selection of objects."""
+        if sel is None:
+            return range(len(index_map))
+        if isinstance(sel, collections.abc.Iterable):
+            return [index_map[x] for x in sel]
+        return [index_map[sel]]
+
+    def _problem_indices(self, sel):
+        """Return a list of indices for a selection of problems."""
+        if sel is None:
+            return range(self.num_problems)
+        if not isinstance(sel, collections.abc.Iterable):
+            sel = [sel]
+        r = list(sel)
+        for j in r:
+            if not 0 <= j < self.num_problems:
+                raise ValueError('problem index %d out of range' % j)
+        return r
+
+    def _country_event_indices(self, countries, events):
+        """
+        Return a list of indices for a selection of countries and
+        events.
+        """
+        ne = len(self.events)
+        es = self._indices(events, self._event_index)
+        return [c * ne + e
+                for c in self._indices(countries, self._country_index)
+                for e in es]
+
+    def num_contestants(self, countries=None, events=None):
+        """
+        Return the number of contestants from the given countries at
+        the given events.
+        """
+        nc = self._num_contestants
+        return sum([nc[i]
+                    for i in self._country_event_indices(countries, events)])
+
+    def num_awards(self, countries=None, events=None):
+        """
+        Return a dict giving the number of each award received by
+        contestants from the given countries at the given events.
+        """
+        na = len(_award_types)
+        r = [0] * na
+        nawards = self._num_awards
+        for i in self._country_event_indices(countries, events):
+            base = i * na
+            for a in range(na):
+                r[a] += nawards[base + a]
+        return {k: r[self._award_index[k]]
+                for k in self.event_group._award_types}
+
+    def problem_mean_std_dev(self, countries=None, events=None,
+                             problems=None):
+        """
+        Return the mean and standard deviation of the known scores of
+        contestants from the given countries at the given events on
+        the given problems (combined), or None if there are no such
+        scores.
+        """
+        npr = self.num_problems
+        problems = self._problem_indices(problems)
+        acc = MeanStdDevAccumulator()
+        for i in self._country_event_indices(countries, events):
+            base = i * npr
+            for j in problems:
+                acc.add_sums(self._score_n[base + j], self._score_s[base + j],
+                             self._score_s2[base + j])
+        return acc.result()
+
+    def problem_mean(self, countries=None, events=None, problems=None):
+        """
+        Return the mean of the known scores of contestants from the
+        given countries at the given events on the given problems
+        (combined), or None if there are no such scores.
+        """
+        r = self.problem_mean_std_dev(countries, events, problems)
+        return None if r is None else r[0]
+
+    def num_awards_by_event(self, countries=None):
+        """
+        Return a list giving, for each event in chronological order,
+        a dict of the number of each award received by contestants
+        from the given countries at that event.
+        """
+        return [self.num_awards(countries, e) for e in self.events]
+
+    def num_participations(self, country):
+        """
+        Return the number of events at which the given country had
+        contestants.
+        """
+        nc = self._num_contestants
+        return len([i for i in self._country_event_indices(country, None)
+                    if nc[i]])
+
+    def medal_table(self):
+        """
+        Return a list of tuples of a country (Country object), a dict
+        of the number of each award received by its contestants at
+        all events, its number of contestants and the number of
+        events at which it had contestants, for all countries that
+        had contestants, sorted by decreasing numbers of gold, silver
+        and bronze medals and honourable mentions.
+        """
+        r = []
+        for c in self.countries:
+            num_contestants = self.num_contestants(c)
+            if not num_contestants:
+                continue
+            r.append((c, self.num_awards(c), num_contestants,
+                      self.num_participations(c)))
+        r.sort(key=lambda x: ([-x[1][k] for k in x[1]], x[0].sort_key))
+        return r
@@ -128,6 +128,21 @@ class DataSource:
         """
         raise NotImplementedError
 
+    def person_event_get_attrs(self, event_id, keys, names):
+        """
+        Return a dict mapping each of the given attribute names to a
+        list of the values of that attribute for the PersonEvents at
+        the given event with the given (person id, country id) pairs,
+        in the same order as those pairs.  Possible names are as for
+        person_event_get_attr, except for _country_ids.  Subclasses
+        may override this to fetch the attributes more efficiently
+        than by separate calls to person_event_get_attr.
+        """
+        return {name: [self.person_event_get_attr(person_id, country_id,
+                                                  event_id, name)
+                       for person_id, country_id in keys]
+                for name in names}
+
     def person_event_have_attr(self, person_id, country_id, event_id, name):
         """
         Return whether this DataSource provides a value of an
@@ -150,6 +165,21 @@ class DataSource:
         """
         raise NotImplementedError
 
+    def country_event_get_attrs(self, event_id, country_ids, names):
+        """
+        Return a dict mapping each of the given attribute names to a
+        list of the values of that attribute for the CountryEvents at
+        the given event with the given country ids, in the same order
+        as those ids.  Possible names are as for
+        country_event_get_attr.  Subclasses may override this to
+        fetch the attributes more efficiently than by separate calls
+        to country_event_get_attr.
+        """
+        return {name: [self.country_event_get_attr(country_id, event_id,
+                                                   name)
+                       for country_id in country_ids]
+                for name in names}
+
     def country_event_have_attr(self, country_id, event_id, name):
         """
         Return whether this DataSource provides a value of an
@@ -400,8 +400,7 @@ class DocumentGenerator:
         else:
             template_fields['have_team_rooms'] = 'true'
             room_list = [self.room_list_text(p)
-                         for p in sorted(person.event.person_list,
-                                         key=lambda x: x.sort_key)
+                         for p in person.event.person_list_sorted
                          if p.country in country_list]
             template_fields['team_rooms'] = ' \\\\ '.join(room_list)
             if template_fields['team_rooms'] == '':
@@ -479,8 +478,7 @@ class DocumentGenerator:
     def generate_award_certs(self, person_id, use_background):
         """Generate all award certificates requested by the command line."""
         template_file_base = 'certificate-template-award'
-        contestants = sorted(self._event.contestant_list,
-                             key=lambda x: x.sort_key)
+        contestants = self._event.contestant_list_sorted
         if person_id == 'gold':
             contestants = [p for p in contestants if p.award == 'Gold Medal']
             output_file_base = 'gold-certificates'
@@ -525,7 +523,7 @@ class DocumentGenerator:
         """
         template_file_base = 'certificate-template-participation'
         if person_id == 'all':
-            people = sorted(self._event.person_list, key=lambda x: x.sort_key)
+            people = self._event.person_list_sorted
             output_file_base = 'participation-certificates'
         else:
             p = self.get_person_by_id(person_id)
@@ -824,7 +822,7 @@ class DocumentGenerator:
         all_languages_part_kind = {}
         part_kinds = set()
         one_language_contestants = []
-        for p in sorted(self._event.contestant_list, key=lambda x: x.sort_key):
+        for p in self._event.contestant_list_sorted:
             ccode = p.contestant_code
             if p.remote_participant is None:
                 part_kind = 'unknown'
@@ -893,8 +891,7 @@ class DocumentGenerator:
         form_list = []
         output_file_base = 'coord-forms'
         for pn in range(1, self._event.num_problems + 1):
-            for c in sorted(self._event.country_list,
-                            key=lambda x: x.sort_key):
+            for c in self._event.country_list_sorted:
                 contestants = c.contestant_list
                 if contestants:
                     clist = []
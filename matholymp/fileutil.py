@@ -33,15 +33,24 @@ This module provides file access support for matholymp use.
 
 import configparser
 import csv
+import hashlib
 import io
 import os
 import os.path
+import pickle
 import re
 import string
-
-__all__ = ['read_utf8_csv', 'read_utf8_csv_bytes', 'write_utf8_csv_bytes',
-           'write_utf8_csv', 'comma_join', 'comma_split', 'make_dirs_for_file',
-           'write_bytes_to_file', 'write_text_to_file', 'read_text_from_file',
+import sys
+import tarfile
+import threading
+import zipfile
+
+__all__ = ['read_utf8_csv', 'read_utf8_csv_bytes', 'temp_file_name',
+           'read_cache_file', 'write_cache_file', 'read_utf8_csv_cached',
+           'write_utf8_csv_bytes', 'write_utf8_csv', 'comma_join',
+           'comma_split', 'make_dirs_for_file', 'OutputManifest',
+           'write_file_bundle', 'write_bytes_to_file', 'write_text_to_file',
+           'remove_output_file', 'read_text_from_file',
            'replace_text_in_file', 'read_config_raw', 'read_config',
            'write_config_raw', 'boolean_states', 'remove_if_exists',
            'file_format_contents', 'file_extension', 'mime_type_map']
@@ -74,6 +83,100 @@ def read_utf8_csv_bytes(csv_file_bytes, delimiter=','):
     return rows
 
 
+def temp_file_name(file_name):
+    """
+    Return the name of a temporary file in which to write the new
+    contents of a file before renaming it, unique to the calling
+    process and thread.
+    """
+    return '%s.tmp%d.%d' % (file_name, os.getpid(), threading.get_ident())
+
+
+def read_cache_file(cache_file_name, version):
+    """
+    Read a cache written with write_cache_file, returning None if it
+    does not exist, cannot be read or is for a different version.
+    """
+    try:
+        with open(cache_file_name, 'rb') as cache_file:
+            cache = pickle.load(cache_file)
+    except Exception:
+        # A missing, truncated or otherwise corrupt cache is simply
+        # regenerated.
+        return None
+    if not isinstance(cache, dict) or cache.get('version') != version:
+        return None
+    return cache
+
+
+def write_cache_file(cache_file_name, cache):
+    """
+    Write a cache (a dict with a 'version' key), ignoring errors (a
+    cache is only an optimization).
+    """
+    tmp_file_name = temp_file_name(cache_file_name)
+    try:
+        with open(tmp_file_name, 'wb') as cache_file:
+            pickle.dump(cache, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file_name, cache_file_name)
+    except OSError:
+        remove_if_exists(tmp_file_name)
+
+
+# Version of the format of caches written by read_utf8_csv_cached,
+# to be increased whenever that format, or the format of the data
+# returned by read_utf8_csv, changes.
+_csv_cache_version = 1
+
+
+def read_utf8_csv_cached(csv_file_names, cache_file_name):
+    """
+    Read the contents of UTF-8 CSV files (with BOM) into a list of
+    arrays of dictionaries, as read_utf8_csv does for each file,
+    using a cache of the parsed contents in the given file, which is
+    updated if the contents of any of the CSV files have changed.  A
+    cached file is considered unchanged if it has the same size and
+    modification time as when cached, or if its size and SHA-256 hash
+    are unchanged.  The cache file should not be writable by anyone
+    not trusted to run code as the user reading it.
+    """
+    cache = read_cache_file(cache_file_name, _csv_cache_version)
+    if cache is not None and len(cache['files']) != len(csv_file_names):
+        cache = None
+    # The file status is obtained before reading a file, so any
+    # change made after that point will be detected next time.
+    stats = [os.stat(f) for f in csv_file_names]
+    keys = [(os.path.basename(f), st.st_size, st.st_mtime_ns)
+            for f, st in zip(csv_file_names, stats)]
+    ret = []
+    files = []
+    changed = cache is None
+    for n, csv_file_name in enumerate(csv_file_names):
+        key = keys[n]
+        if cache is not None:
+            old_key, old_hash = cache['files'][n]
+            if old_key == key:
+                ret.append(cache['data'][n])
+                files.append((key, old_hash))
+                continue
+        with open(csv_file_name, 'rb') as csv_file:
+            csv_bytes = csv_file.read()
+        csv_hash = hashlib.sha256(csv_bytes).hexdigest()
+        changed = True
+        if (cache is not None
+                and cache['files'][n][0][:2] == key[:2]
+                and cache['files'][n][1] == csv_hash):
+            ret.append(cache['data'][n])
+        else:
+            ret.append(read_utf8_csv_bytes(csv_bytes))
+        files.append((key, csv_hash))
+    if changed:
+        write_cache_file(cache_file_name, {'version': _csv_cache_version,
+                                           'files': files,
+                                           'data': ret})
+    return ret
+
+
 def write_utf8_csv_bytes(rows, keys, delimiter=','):
     """
     Return the byte contents of a UTF-8 CSV file (with BOM) from an
@@ -94,10 +197,10 @@ def write_utf8_csv_bytes(rows, keys, delimiter=','):
     return csv_bytes
 
 
-def write_utf8_csv(csv_file_name, rows, keys, delimiter=','):
+def write_utf8_csv(csv_file_name, rows, keys, delimiter=',', manifest=None):
     """Write a UTF-8 CSV file (with BOM) from an array of dictionaries."""
     write_bytes_to_file(write_utf8_csv_bytes(rows, keys, delimiter=delimiter),
-                        csv_file_name)
+                        csv_file_name, manifest)
 
 
 def comma_join(val_list):
@@ -144,26 +247,260 @@ def comma_split(val_text):
 def make_dirs_for_file(file_name):
     """Create directories needed to create a file."""
     dir_name = os.path.dirname(file_name)
-    if not os.access(dir_name, os.F_OK):
-        os.makedirs(dir_name)
+    if dir_name and not os.access(dir_name, os.F_OK):
+        # Another process generating part of the same site may create
+        # the directory at the same time.
+        os.makedirs(dir_name, exist_ok=True)
 
 
-def write_bytes_to_file(out_bytes, out_file_name):
-    """Write some bytes to a file, but not if it would be unchanged."""
-    make_dirs_for_file(out_file_name)
-    if os.access(out_file_name, os.F_OK):
-        with open(out_file_name, 'rb') as in_file:
-            content = in_file.read()
-        if content == out_bytes:
+def _file_has_contents(file_name, contents, size):
+    """
+    Return whether a file, of the given size, has the given contents.
+    """
+    if size != len(contents):
+        return False
+    with open(file_name, 'rb') as in_file:
+        return in_file.read() == contents
+
+
+# Version of the format of output manifests, to be increased whenever
+# that format changes.
+_output_manifest_version = 1
+
+
+class OutputManifest:
+
+    """
+    An OutputManifest records the size, modification time and SHA-256
+    hash of files written under a directory by write_bytes_to_file,
+    so that a new version of a file can be determined to be unchanged
+    from its hash and the status of the existing file, without
+    reading that file.  It also records which files have been created
+    or modified since it was loaded.  The manifest file should not be
+    writable by anyone not trusted to run code as the user reading
+    it.
+    """
+
+    def __init__(self, manifest_file_name, top_directory):
+        """
+        Initialise an OutputManifest for files under the given
+        directory, loading the given manifest file if it exists and
+        is for that directory.  If the manifest file name is None,
+        the manifest is only used to record which files are created
+        or modified.
+        """
+        self._file_name = manifest_file_name
+        self._top_directory = os.path.abspath(top_directory)
+        if manifest_file_name is None:
+            manifest = None
+        else:
+            manifest = read_cache_file(manifest_file_name,
+                                       _output_manifest_version)
+        if (manifest is not None
+            and manifest['top_directory'] == self._top_directory):
+            self._files = manifest['files']
+        else:
+            self._files = {}
+        # Map from the path of each file created or modified to True
+        # if created, False if modified.
+        self._changes = {}
+        # The entries in self._files, and in self._changes, set since
+        # the last call to take_updates.
+        self._updates = {}
+
+    def _rel_path(self, file_name):
+        """Return the path of a file relative to the directory."""
+        rel_path = os.path.relpath(os.path.abspath(file_name),
+                                   self._top_directory)
+        return rel_path.replace(os.sep, '/')
+
+    def write_bytes(self, out_bytes, out_file_name):
+        """
+        Write some bytes to a file, but not if it would be unchanged,
+        recording the file in the manifest.
+        """
+        rel_path = self._rel_path(out_file_name)
+        digest = hashlib.sha256(out_bytes).digest()
+        try:
+            st = os.stat(out_file_name)
+        except FileNotFoundError:
+            st = None
+        if st is not None:
+            entry = (st.st_size, st.st_mtime_ns, digest)
+            old_entry = self._files.get(rel_path)
+            if old_entry == entry:
+                return
+            # The contents of an existing file only need reading if
+            # not known from the manifest.
+            if old_entry is None or old_entry[:2] != entry[:2]:
+                if _file_has_contents(out_file_name, out_bytes, st.st_size):
+                    self._record(rel_path, entry, None)
+                    return
+        else:
+            make_dirs_for_file(out_file_name)
+        with open(out_file_name, 'wb') as out_file:
+            out_file.write(out_bytes)
+        new_st = os.stat(out_file_name)
+        self._record(rel_path, (new_st.st_size, new_st.st_mtime_ns, digest),
+                     st is None)
+
+    def remove_file(self, out_file_name):
+        """Remove a file if it exists, recording its removal."""
+        rel_path = self._rel_path(out_file_name)
+        try:
+            os.remove(out_file_name)
+        except FileNotFoundError:
+            if rel_path not in self._files:
+                return
+        self._record(rel_path, None, self._changes.get(rel_path) is True)
+
+    def _record(self, rel_path, entry, created):
+        """
+        Record the status of a file, and whether it was created (True),
+        modified (False) or unchanged (None), or that it was removed
+        (if the status is None, with created true if it was only
+        created since the manifest was loaded).
+        """
+        if entry is None:
+            self._files.pop(rel_path, None)
+            if created or self._changes.get(rel_path) is True:
+                # Created and then removed in the same run.
+                self._changes.pop(rel_path, None)
+            else:
+                self._changes[rel_path] = None
+        else:
+            self._files[rel_path] = entry
+            if created is not None:
+                if (rel_path in self._changes
+                    and self._changes[rel_path] is None):
+                    # Removed and then written again in the same run.
+                    self._changes[rel_path] = False
+                else:
+                    self._changes.setdefault(rel_path, created)
+        self._updates[rel_path] = (entry, created)
+
+    def take_updates(self):
+        """
+        Return the changes to this manifest since this method was last
+        called (or since it was loaded), for apply_updates to apply to
+        another OutputManifest for the same directory (for example, in
+        another process writing some of the files).
+        """
+        updates = self._updates
+        self._updates = {}
+        return updates
+
+    def apply_updates(self, updates):
+        """Apply changes to the manifest returned by take_updates."""
+        for rel_path, (entry, created) in updates.items():
+            self._record(rel_path, entry, created)
+
+    def changed_files(self):
+        """
+        Return a sorted list of the paths, relative to the directory
+        and using '/' as a separator, of the files created or modified
+        since the manifest was loaded.
+        """
+        return sorted(rel_path for rel_path, created in self._changes.items()
+                      if created is not None)
+
+    def changes(self):
+        """
+        Return a sorted list of pairs of a path, as for changed_files,
+        and 'created', 'modified' or 'deleted', for the files created,
+        modified or removed since the manifest was loaded and those in
+        the manifest that no longer exist (which are removed from the
+        manifest).
+        """
+        for rel_path in list(self._files):
+            if rel_path not in self._changes and not os.access(
+                    os.path.join(self._top_directory, *rel_path.split('/')),
+                    os.F_OK):
+                del self._files[rel_path]
+                self._changes[rel_path] = None
+        return [(rel_path, {True: 'created', False: 'modified',
+                            None: 'deleted'}[created])
+                for rel_path, created in sorted(self._changes.items())]
+
+    def save(self):
+        """Save the manifest to its file, if any, ignoring errors."""
+        if self._file_name is None:
             return
+        write_cache_file(self._file_name,
+                         {'version': _output_manifest_version,
+                          'top_directory': self._top_directory,
+                          'files': self._files})
+
+
+def write_file_bundle(bundle_file_name, top_directory, paths):
+    """
+    Write an archive of the given files, with paths relative to the
+    given directory and using '/' as a separator.  The format is
+    determined by the extension of the archive file name: '.zip' for
+    a zip file, or '.tar', '.tar.gz', '.tgz', '.tar.bz2' or '.tar.xz'
+    for a tar file; the name '-' means an uncompressed tar file
+    written to standard output.
+    """
+    if bundle_file_name.endswith('.zip'):
+        with zipfile.ZipFile(bundle_file_name, 'w',
+                             zipfile.ZIP_DEFLATED) as zip_file:
+            for path in paths:
+                zip_file.write(os.path.join(top_directory, *path.split('/')),
+                               path)
+        return
+    if bundle_file_name == '-':
+        tar_args = {'fileobj': sys.stdout.buffer, 'mode': 'w|'}
+    else:
+        tar_modes = {'.tar': 'w', '.tar.gz': 'w:gz', '.tgz': 'w:gz',
+                     '.tar.bz2': 'w:bz2', '.tar.xz': 'w:xz'}
+        for ext, mode in tar_modes.items():
+            if bundle_file_name.endswith(ext):
+                tar_args = {'name': bundle_file_name, 'mode': mode}
+                break
+        else:
+            raise ValueError('unknown archive format for %s'
+                             % bundle_file_name)
+    with tarfile.open(**tar_args) as tar_file:
+        for path in paths:
+            tar_file.add(os.path.join(top_directory, *path.split('/')), path,
+                         recursive=False)
+
+
+def write_bytes_to_file(out_bytes, out_file_name, manifest=None):
+    """
+    Write some bytes to a file, but not if it would be unchanged,
+    recording it in an OutputManifest if one is specified.
+    """
+    if manifest is not None:
+        manifest.write_bytes(out_bytes, out_file_name)
+        return
+    make_dirs_for_file(out_file_name)
+    try:
+        size = os.stat(out_file_name).st_size
+    except FileNotFoundError:
+        size = None
+    if size is not None and _file_has_contents(out_file_name, out_bytes,
+                                               size):
+        return
     with open(out_file_name, 'wb') as out_file:
         out_file.write(out_bytes)
 
 
-def write_text_to_file(out_text, out_file_name):
+def write_text_to_file(out_text, out_file_name, manifest=None):
     """Write some UTF-8 text to a file (without BOM)."""
     out_bytes = out_text.encode(encoding='utf-8')
-    write_bytes_to_file(out_bytes, out_file_name)
+    write_bytes_to_file(out_bytes, out_file_name, manifest)
+
+
+def remove_output_file(out_file_name, manifest=None):
+    """
+    Remove a file if it exists, recording its removal in an
+    OutputManifest if one is specified.
+    """
+    if manifest is not None:
+        manifest.remove_file(out_file_name)
+    else:
+        remove_if_exists(out_file_name)
 
 
 def read_text_from_file(file_name):
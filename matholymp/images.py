@@ -32,7 +32,7 @@
 __all__ = ['open_image_no_alpha', 'scale_image_to_size',
            'scale_image_to_size_jpeg', 'scale_image_to_size_png',
            'image_size_for_width', 'scale_image_to_width_jpeg',
-           'scale_image_to_width_png']
+           'scale_image_to_width_png', 'scale_image_file_to_widths']
 
 import io
 import fractions
@@ -40,9 +40,8 @@ import fractions
 from PIL import Image
 
 
-def open_image_no_alpha(filename):
-    """Open an image, returning an Image object with no alpha channel."""
-    image = Image.open(filename)
+def _remove_alpha(image):
+    """Return an image with any alpha channel removed."""
     if image.mode not in ('RGB', 'L'):
         # Convert to RGB, removing any alpha channel.
         if (image.mode in ('RGBA', 'LA')
@@ -56,38 +55,49 @@ def open_image_no_alpha(filename):
     return image
 
 
+def open_image_no_alpha(filename):
+    """Open an image, returning an Image object with no alpha channel."""
+    return _remove_alpha(Image.open(filename))
+
+
 def scale_image_to_size(image, size_xy):
     """Return an image scaled to the given size."""
     return image.resize(size_xy, Image.LANCZOS)
 
 
-def scale_image_to_size_jpeg(image, size_xy):
-    """Return an image scaled to the given size, as JPEG file contents."""
-    image = scale_image_to_size(image, size_xy)
+def _image_bytes(image, image_format):
+    """Return the contents of a JPEG or PNG file for an image."""
     image_out = io.BytesIO()
-    image.save(image_out, format='JPEG', quality=90)
+    if image_format == 'JPEG':
+        image.save(image_out, format='JPEG', quality=90)
+    else:
+        image.save(image_out, format='PNG')
     image_bytes = image_out.getvalue()
     image_out.close()
     return image_bytes
 
 
+def scale_image_to_size_jpeg(image, size_xy):
+    """Return an image scaled to the given size, as JPEG file contents."""
+    return _image_bytes(scale_image_to_size(image, size_xy), 'JPEG')
+
+
 def scale_image_to_size_png(image, size_xy):
     """Return an image scaled to the given size, as PNG file contents."""
-    image = scale_image_to_size(image, size_xy)
-    image_out = io.BytesIO()
-    image.save(image_out, format='PNG')
-    image_bytes = image_out.getvalue()
-    image_out.close()
-    return image_bytes
+    return _image_bytes(scale_image_to_size(image, size_xy), 'PNG')
 
 
-def image_size_for_width(image, width):
-    """Return the size of an image, scaled to the given width."""
-    orig_size = image.size
+def _size_for_width(orig_size, width):
+    """Return an image size, scaled to the given width."""
     scaled_y = orig_size[1] * fractions.Fraction(width, orig_size[0])
     return (width, round(scaled_y))
 
 
+def image_size_for_width(image, width):
+    """Return the size of an image, scaled to the given width."""
+    return _size_for_width(image.size, width)
+
+
 def scale_image_to_width_jpeg(image, width):
     """Return an image scaled to the given width, as JPEG file contents."""
     return scale_image_to_size_jpeg(image, image_size_for_width(image, width))
@@ -96,3 +106,25 @@ def scale_image_to_width_jpeg(image, width):
 def scale_image_to_width_png(image, width):
     """Return an image scaled to the given width, as PNG file contents."""
     return scale_image_to_size_png(image, image_size_for_width(image, width))
+
+
+def scale_image_file_to_widths(filename, widths, image_format):
+    """
+    Return a list of the contents of image files, in the given format
+    ('JPEG' or 'PNG'), of the image in a file, with any alpha channel
+    removed, scaled to each of the given widths.  The image is only
+    decoded once, and a JPEG image much larger than needed is decoded
+    at reduced size.
+    """
+    image = Image.open(filename)
+    sizes = [_size_for_width(image.size, width) for width in widths]
+    # As in Image.thumbnail, the image is decoded at no less than
+    # twice the size needed, to limit the loss of quality; draft
+    # does nothing except for JPEG images.
+    draft = image.draft(None, (2 * max(size[0] for size in sizes),
+                               2 * max(size[1] for size in sizes)))
+    box = draft[1] if draft is not None else None
+    image = _remove_alpha(image)
+    return [_image_bytes(image.resize(size, Image.LANCZOS, box=box),
+                         image_format)
+            for size in sizes]
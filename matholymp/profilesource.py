@@ -0,0 +1,202 @@
+# ProfilingDataSource class for matholymp package.
+
+# Copyright 2026 Joseph Samuel Myers.
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see
+# <https://www.gnu.org/licenses/>.
+
+# Additional permission under GNU GPL version 3 section 7:
+
+# If you modify this program, or any covered work, by linking or
+# combining it with the OpenSSL project's OpenSSL library (or a
+# modified version of that library), containing parts covered by the
+# terms of the OpenSSL or SSLeay licenses, the licensors of this
+# program grant you additional permission to convey the resulting
+# work.  Corresponding Source for a non-source form of such a
+# combination shall include the source code for the parts of OpenSSL
+# used as well as that of the covered work.
+
+
+"""
+This module provides the ProfilingDataSource class that wraps another
+DataSource and records statistics of the calls made to it.
+"""
+
+import time
+import weakref
+
+from matholymp.datasource import DataSource
+
+__all__ = ['ProfilingDataSource']
+
+# Upper bounds, in seconds, of the buckets used for histograms of the
+# time taken by calls (the last bucket has no upper bound).
+_latency_buckets = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1)
+
+_latency_bucket_names = ('<1us', '<10us', '<100us', '<1ms', '<10ms',
+                         '<100ms', '>=100ms')
+
+
+def _hashable(value):
+    """Return a hashable equivalent of a call argument."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+class _CallStats:
+
+    """
+    A _CallStats records statistics of calls to a DataSource, kept
+    separate from the ProfilingDataSource so that a report can be
+    written when that is discarded.
+    """
+
+    def __init__(self):
+        # Map from (method name, attribute name) pairs to lists of the
+        # number of calls, the number of calls repeating an earlier
+        # call with the same arguments, the total time taken and the
+        # number of calls in each latency bucket.
+        self.stats = {}
+        self._calls_seen = set()
+
+    def record(self, method, name, args, elapsed):
+        """Record a call and the time it took."""
+        key = (method, name)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = [0, 0, 0.0, [0 for b in _latency_bucket_names]]
+            self.stats[key] = stats
+        stats[0] += 1
+        call = (method, _hashable(args))
+        if call in self._calls_seen:
+            stats[1] += 1
+        else:
+            self._calls_seen.add(call)
+        stats[2] += elapsed
+        bucket = len(_latency_buckets)
+        for n, bound in enumerate(_latency_buckets):
+            if elapsed < bound:
+                bucket = n
+                break
+        stats[3][bucket] += 1
+
+    def report(self):
+        """
+        Return a text report of the calls recorded, sorted by
+        decreasing total time.
+        """
+        stats = sorted(self.stats.items(), key=lambda x: (-x[1][2], x[0]))
+        # The description of the call comes last as it may be long.
+        lines = ['%8s %8s %10s' % ('Count', 'Repeats', 'Time')
+                 + ''.join(' %7s' % b for b in _latency_bucket_names)
+                 + ' Call']
+        for (method, name), (count, repeats, total_time, hist) in stats:
+            call = '%s(%s)' % (method, name) if name else method
+            lines.append('%8d %8d %10.6f' % (count, repeats, total_time)
+                         + ''.join(' %7d' % h for h in hist)
+                         + ' ' + call)
+        return '\n'.join(lines) + '\n'
+
+    def append_report(self, file_name):
+        """Append a report of the calls recorded to a file."""
+        with open(file_name, 'a', encoding='utf-8') as report_file:
+            report_file.write(self.report())
+
+
+class ProfilingDataSource(DataSource):
+
+    """
+    Subclass of DataSource that passes all calls on to another
+    DataSource, recording for each method and attribute name the
+    number of calls, how many repeat an earlier call with the same
+    arguments, the total time taken and a histogram of the time taken
+    by individual calls.
+    """
+
+    def __init__(self, datasource, report_file=None):
+        """
+        Initialise a ProfilingDataSource wrapping the given
+        DataSource.  If report_file is specified, a report is appended
+        to that file when the ProfilingDataSource is discarded (or on
+        exit, if it is still in use then).
+        """
+        self._ds = datasource
+        self._stats = _CallStats()
+        if report_file is not None:
+            weakref.finalize(self, self._stats.append_report, report_file)
+
+    def report(self):
+        """Return a text report of the calls recorded so far."""
+        return self._stats.report()
+
+    def _call(self, method, name, args):
+        # Calls raising exceptions, such as KeyError for attributes
+        # not available, are recorded as well.
+        start = time.perf_counter()
+        try:
+            return getattr(self._ds, method)(*args)
+        finally:
+            self._stats.record(method, name, args,
+                               time.perf_counter() - start)
+
+    def event_group_get_attr(self, name):
+        return self._call('event_group_get_attr', name, (name,))
+
+    def event_exists(self, event_id):
+        return self._call('event_exists', None, (event_id,))
+
+    def person_exists(self, person_id):
+        return self._call('person_exists', None, (person_id,))
+
+    def country_exists(self, country_id):
+        return self._call('country_exists', None, (country_id,))
+
+    def person_event_exists(self, person_id, event_id):
+        return self._call('person_event_exists', None,
+                          (person_id, event_id))
+
+    def country_event_exists(self, country_id, event_id):
+        return self._call('country_event_exists', None,
+                          (country_id, event_id))
+
+    def event_get_attr(self, event_id, name):
+        return self._call('event_get_attr', name, (event_id, name))
+
+    def event_have_attr(self, event_id, name):
+        return self._call('event_have_attr', name, (event_id, name))
+
+    def person_event_get_attr(self, person_id, country_id, event_id, name):
+        return self._call('person_event_get_attr', name,
+                          (person_id, country_id, event_id, name))
+
+    def person_event_get_attrs(self, event_id, keys, names):
+        return self._call('person_event_get_attrs', ','.join(names),
+                          (event_id, keys, names))
+
+    def person_event_have_attr(self, person_id, country_id, event_id, name):
+        return self._call('person_event_have_attr', name,
+                          (person_id, country_id, event_id, name))
+
+    def country_event_get_attr(self, country_id, event_id, name):
+        return self._call('country_event_get_attr', name,
+                          (country_id, event_id, name))
+
+    def country_event_get_attrs(self, event_id, country_ids, names):
+        return self._call('country_event_get_attrs', ','.join(names),
+                          (event_id, country_ids, names))
+
+    def country_event_have_attr(self, country_id, event_id, name):
+        return self._call('country_event_have_attr', name,
+                          (country_id, event_id, name))
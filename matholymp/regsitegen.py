@@ -101,7 +101,7 @@ class RegSiteGenerator(SiteGenerator):
                               ' database identifier\nfor the country.\n')
 
             e = self.event
-            country_list = sorted(e.country_list, key=lambda x: x.sort_key)
+            country_list = e.country_list_sorted
             for c in country_list:
                 url = c.flag_url
                 if url is not None:
@@ -125,7 +125,7 @@ class RegSiteGenerator(SiteGenerator):
                               'for the person.\n')
 
             e = self.event
-            person_list = sorted(e.person_list, key=lambda x: x.sort_key)
+            person_list = e.person_list_sorted
             for p in person_list:
                 url = p.badge_photo_url if for_badges else p.photo_url
                 if url is not None:
@@ -151,7 +151,7 @@ class RegSiteGenerator(SiteGenerator):
                               ' person.\n')
 
             e = self.event
-            person_list = sorted(e.person_list, key=lambda x: x.sort_key)
+            person_list = e.person_list_sorted
             for p in person_list:
                 url = p.consent_form_url
                 if url is not None:
@@ -175,7 +175,7 @@ class RegSiteGenerator(SiteGenerator):
                               ' person.\n')
 
             e = self.event
-            person_list = sorted(e.person_list, key=lambda x: x.sort_key)
+            person_list = e.person_list_sorted
             for p in person_list:
                 url = p.id_scan_url
                 if url is not None:
@@ -213,8 +213,7 @@ class RegSiteGenerator(SiteGenerator):
                                                            show_award=False)]
             ctext = ''
             if i < len(countries):
-                contestants = sorted(countries[i].contestant_list,
-                                     key=lambda x: x.sort_key)
+                contestants = countries[i].contestant_list_sorted
                 body_row_list = []
                 for p in contestants:
                     body_row_list.append(
@@ -445,7 +444,7 @@ class RegSiteGenerator(SiteGenerator):
         e = self.event
         normal_countries = sorted(e.normal_country_list,
                                   key=lambda x: x.sort_key)
-        people = sorted(e.person_list, key=lambda x: x.sort_key)
+        people = e.person_list_sorted
         normal_people = sorted(e.normal_person_list, key=lambda x: x.sort_key)
         staff = sorted(e.staff_list, key=lambda x: x.sort_key)
         text = ''
@@ -539,7 +538,7 @@ class RegSiteGenerator(SiteGenerator):
                                          have_id_scans,
                                          have_consent_ui):
         """Return the text of the registration status page for one country."""
-        people = sorted(country.person_list, key=lambda x: x.sort_key)
+        people = country.person_list_sorted
         text = ''
         text += self.missing_extra_roles_text(country)
         text += self.missing_country_details_text(country)
@@ -597,7 +597,7 @@ class NameBadgeAction(DocumentGenerateAction):
 
     def document_list(self, event):
         return ['badge-person%d.pdf' % p.person.id
-                for p in sorted(event.person_list, key=lambda x: x.sort_key)
+                for p in event.person_list_sorted
                 if not p.remote_participant]
 
     def zip_filename(self):
@@ -633,7 +633,7 @@ class InvitationLetterAction(DocumentGenerateAction):
 
     def document_list(self, event):
         return ['invitation-letter-person%d.pdf' % p.person.id
-                for p in sorted(event.person_list, key=lambda x: x.sort_key)
+                for p in event.person_list_sorted
                 if not p.remote_participant]
 
     def zip_filename(self):
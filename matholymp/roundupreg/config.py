@@ -59,7 +59,9 @@ __all__ = ['get_config_var', 'get_config_var_bool', 'get_config_var_int',
            'get_initial_room_types_non_contestant',
            'get_initial_room_types_contestant', 'get_contestant_genders',
            'get_invitation_letter_email', 'get_static_site_path',
-           'get_docgen_path']
+           'get_static_site_cache_path', 'get_static_site_snapshot_path',
+           'get_docgen_path',
+           'get_datasource_profile_path']
 
 
 def get_config_var(db, name):
@@ -352,6 +354,29 @@ def get_static_site_path(db):
     return get_config_var_path(db, 'MATHOLYMP_STATIC_SITE_DIRECTORY')
 
 
+def get_static_site_cache_path(db):
+    """
+    Return the path to the cache of parsed static site data, or None.
+    """
+    return get_config_var_path(db, 'MATHOLYMP_STATIC_SITE_CACHE')
+
+
+def get_static_site_snapshot_path(db):
+    """
+    Return the path to the snapshot of computed static site data, or
+    None.
+    """
+    return get_config_var_path(db, 'MATHOLYMP_STATIC_SITE_SNAPSHOT')
+
+
 def get_docgen_path(db):
     """Return the path to the document generation directory, or None."""
     return get_config_var_path(db, 'MATHOLYMP_DOCGEN_DIRECTORY')
+
+
+def get_datasource_profile_path(db):
+    """
+    Return the path to the file to which to append statistics of data
+    accesses for generated pages, or None.
+    """
+    return get_config_var_path(db, 'MATHOLYMP_DATASOURCE_PROFILE')
@@ -37,7 +37,9 @@ __all__ = ['RoundupSiteGenerator']
 import html
 
 from matholymp.data import EventGroup
-from matholymp.roundupreg.config import get_short_name
+from matholymp.profilesource import ProfilingDataSource
+from matholymp.roundupreg.config import get_short_name, \
+    get_datasource_profile_path
 from matholymp.roundupreg.roundupsource import RoundupDataSource
 from matholymp.regsitegen import RegSiteGenerator
 
@@ -72,7 +74,11 @@ class RoundupSiteGenerator(RegSiteGenerator):
                    int(db.config.ext['MATHOLYMP_DISPLAY_SCOREBOARD_ROWS']),
                'display_scoreboard_columns':
                    int(db.config.ext['MATHOLYMP_DISPLAY_SCOREBOARD_COLUMNS'])}
-        event_group = EventGroup(RoundupDataSource(db))
+        datasource = RoundupDataSource(db)
+        profile_path = get_datasource_profile_path(db)
+        if profile_path:
+            datasource = ProfilingDataSource(datasource, profile_path)
+        event_group = EventGroup(datasource)
         super().__init__(cfg, event_group)
 
     def link_for_country_at_event(self, country, link_body):
@@ -134,6 +134,30 @@ class RoundupDataSource(DataSource):
             return event_type(self._db)
         raise KeyError(name)
 
+    def _role_name(self, role, role_names):
+        """
+        Return the name of a role, given a dict caching the names of
+        roles already looked up.
+        """
+        if role not in role_names:
+            role_names[role] = self._db.matholymprole.get(role, 'name')
+        return role_names[role]
+
+    def _person_roles_attr(self, person_id, name, role_names):
+        """
+        Return the value of the primary_role or other_roles attribute
+        for a person (given as a string), given a dict caching the
+        names of roles already looked up.
+        """
+        primary_role = self._db.person.get(person_id, 'primary_role')
+        if name == 'primary_role':
+            return self._role_name(primary_role, role_names)
+        other_roles = self._db.person.get(person_id, 'other_roles')
+        if other_roles is None:
+            other_roles = []
+        return [self._role_name(i, role_names) for i in other_roles
+                if i != primary_role]
+
     def person_event_get_attr(self, person_id, country_id, event_id, name):
         person_id = str(person_id)
         if name == '_country_ids':
@@ -142,16 +166,8 @@ class RoundupDataSource(DataSource):
         assert country_id is not None
         if name == 'annual_url':
             return self._db.config.TRACKER_WEB + 'person' + person_id
-        elif name == 'primary_role':
-            primary_role = self._db.person.get(person_id, 'primary_role')
-            return self._db.matholymprole.get(primary_role, 'name')
-        elif name == 'other_roles':
-            other_roles = self._db.person.get(person_id, 'other_roles')
-            if other_roles is None:
-                other_roles = []
-            primary_role = self._db.person.get(person_id, 'primary_role')
-            other_roles = [i for i in other_roles if i != primary_role]
-            return [self._db.matholymprole.get(i, 'name') for i in other_roles]
+        elif name in ('primary_role', 'other_roles'):
+            return self._person_roles_attr(person_id, name, {})
         elif name == '_guide_for_ids':
             guide_for = self._db.person.get(person_id, 'guide_for')
             if guide_for is None:
@@ -382,6 +398,45 @@ class RoundupDataSource(DataSource):
             return self._db.person.get(person_id, 'departure_flight') or None
         raise KeyError(name)
 
+    def person_event_get_attrs(self, event_id, keys, names):
+        # The people are read from the database in a single query
+        # (filter_iter puts each person's node in the node cache
+        # before returning its id), and all the attributes requested
+        # are computed for each person while that node is cached,
+        # rather than reading each attribute for all the people in
+        # turn.  Role names are looked up once for all the people,
+        # rather than once for each person.
+        index = {str(person_id): n for n, (person_id, country_id)
+                 in enumerate(keys)}
+        role_names = {}
+        r = {name: [None] * len(keys) for name in names}
+        done = set()
+        for person_id in self._db.person.filter_iter(None, {}):
+            n = index.get(person_id)
+            if n is None:
+                continue
+            done.add(n)
+            country_id = keys[n][1]
+            for name in names:
+                if name in ('primary_role', 'other_roles'):
+                    value = self._person_roles_attr(person_id, name,
+                                                    role_names)
+                else:
+                    value = self.person_event_get_attr(person_id, country_id,
+                                                       event_id, name)
+                r[name][n] = value
+        if len(done) < len(keys):
+            # Not all the people given were found by filter_iter (for
+            # example, retired people); get their attributes
+            # individually.
+            rest = [n for n in range(len(keys)) if n not in done]
+            rest_r = super().person_event_get_attrs(
+                event_id, [keys[n] for n in rest], names)
+            for name in names:
+                for n, value in zip(rest, rest_r[name]):
+                    r[name][n] = value
+        return r
+
     def country_event_get_attr(self, country_id, event_id, name):
         country_id = str(country_id)
         if name == 'annual_url':
@@ -35,7 +35,8 @@ registration system.
 import os.path
 
 from matholymp.fileutil import file_extension, mime_type_map
-from matholymp.roundupreg.config import get_static_site_path
+from matholymp.roundupreg.config import get_static_site_path, \
+    get_static_site_cache_path, get_static_site_snapshot_path
 from matholymp.sitegen import read_sitegen_config, sitegen_event_group
 
 __all__ = ['static_site_event_group', 'static_site_file_data']
@@ -50,7 +51,9 @@ def static_site_event_group(db):
     if not static_site_path:
         return None
     cfg_data = read_sitegen_config(static_site_path)
-    return sitegen_event_group(static_site_path, cfg_data)
+    return sitegen_event_group(static_site_path, cfg_data,
+                               get_static_site_cache_path(db),
+                               snapshot_file=get_static_site_snapshot_path(db))
 
 
 def static_site_file_data(db, url):
@@ -52,6 +52,7 @@ from matholymp.data import EventGroup
 from matholymp.docgen import read_docgen_config, DocumentGenerator
 from matholymp.csvsource import CSVDataSource
 from matholymp.fileutil import read_utf8_csv, read_text_from_file
+from matholymp.profilesource import ProfilingDataSource
 
 __all__ = ['main']
 
@@ -73,6 +74,8 @@ def main():
     parser.add_argument('--day', help='day for papers')
     parser.add_argument('--exam-order',
                         help='file with order of contestants for exams')
+    parser.add_argument('--profile-datasource', metavar='FILE',
+                        help='append statistics of data accesses to FILE')
     parser.add_argument('type', help='type of document to output')
     parser.add_argument('id', help='object for which to output the document,'
                         ' or \'all\'')
@@ -94,9 +97,12 @@ def main():
     country_data = read_utf8_csv(os.path.join(cmdline_data['input_directory'],
                                               'countries.csv'))
 
-    all_data = EventGroup(CSVDataSource(config_data, None, [], country_data,
-                                        people_data,
-                                        cmdline_data['input_directory']))
+    datasource = CSVDataSource(config_data, None, [], country_data,
+                               people_data, cmdline_data['input_directory'])
+    if cmdline_data['profile_datasource']:
+        datasource = ProfilingDataSource(datasource,
+                                         cmdline_data['profile_datasource'])
+    all_data = EventGroup(datasource)
     event_data = all_data.event_map[config_data['event_number']]
     docgen = DocumentGenerator(config_data, event_data, templates_dir,
                                cmdline_data['problems_directory'],
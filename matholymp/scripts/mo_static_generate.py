@@ -43,8 +43,10 @@ import argparse
 import os
 
 import matholymp
+from matholymp.fileutil import OutputManifest, write_file_bundle, \
+    write_text_to_file
 from matholymp.sitegen import read_sitegen_config, sitegen_event_group, \
-    SiteGenerator
+    sitegen_write_sort_key_cache, SiteGenerator
 
 __all__ = ['main']
 
@@ -55,12 +57,69 @@ def main():
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument('--version', action='version',
                         version='%(prog)s ' + matholymp.__version__)
-    parser.parse_args()
+    parser.add_argument('--data-cache', metavar='FILE',
+                        help='cache parsed CSV data in FILE, and '
+                        'collation sort keys in FILE.collate')
+    parser.add_argument('--snapshot', metavar='FILE',
+                        help='save data with all derived values computed in '
+                        'FILE, and reuse it if the data is unchanged')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='generate the site using N processes')
+    parser.add_argument('--manifest', metavar='FILE',
+                        help='record the data used for each page in FILE, '
+                        'and only generate pages for which it has changed')
+    parser.add_argument('--full', action='store_true',
+                        help='generate all pages even if a manifest shows '
+                        'they are unchanged')
+    parser.add_argument('--output-manifest', metavar='FILE',
+                        help='record the sizes and hashes of files written '
+                        'in FILE, to avoid reading them when checking for '
+                        'changes')
+    parser.add_argument('--changed-files', metavar='FILE',
+                        help='write a list of files created, modified and '
+                        'deleted to FILE')
+    parser.add_argument('--bundle', metavar='FILE',
+                        help='write an archive of files created and '
+                        'modified to FILE')
+    parser.add_argument('--property-stats', action='store_true',
+                        help='print statistics of computed data values')
+    parser.add_argument('--profile-datasource', metavar='FILE',
+                        help='append statistics of data accesses to FILE')
+    args = vars(parser.parse_args())
+    if args['jobs'] < 1:
+        parser.error('number of jobs must be at least 1')
+    if args['bundle'] == '-' and args['property_stats']:
+        parser.error('--bundle - cannot be used with --property-stats, '
+                     'since both write to standard output')
 
     top_directory = os.getcwd()
 
     cfg_data = read_sitegen_config(top_directory)
-    all_data = sitegen_event_group(top_directory, cfg_data)
-
-    sitegen = SiteGenerator(cfg_data, all_data, top_directory)
-    sitegen.generate_site()
+    all_data = sitegen_event_group(top_directory, cfg_data,
+                                   args['data_cache'],
+                                   args['property_stats'],
+                                   args['profile_datasource'],
+                                   args['snapshot'])
+
+    if (args['output_manifest'] or args['changed_files']
+        or args['bundle']):
+        output_manifest = OutputManifest(args['output_manifest'],
+                                         top_directory)
+    else:
+        output_manifest = None
+    sitegen = SiteGenerator(cfg_data, all_data, top_directory,
+                            output_manifest)
+    sitegen.generate_site(args['jobs'], args['manifest'], args['full'])
+    if args['changed_files']:
+        changes = ''.join('%s %s\n' % (change, path)
+                          for path, change in output_manifest.changes())
+        write_text_to_file(changes, args['changed_files'])
+    if args['bundle']:
+        write_file_bundle(args['bundle'], top_directory,
+                          output_manifest.changed_files())
+    if output_manifest is not None:
+        output_manifest.save()
+    if args['data_cache']:
+        sitegen_write_sort_key_cache(args['data_cache'])
+    if args['property_stats']:
+        print(all_data.property_stats_report(), end='')
@@ -32,25 +32,80 @@ This module provides the SiteGenerator class that can be used to
 generate a whole website or individual pages or page fragments.
 """
 
+import array
+import gc
 import html
+import multiprocessing
 import os
 import os.path
+import pickle
 import re
 
-from matholymp.collate import coll_get_sort_key
+import matholymp
+from matholymp.collate import coll_get_sort_key, coll_read_sort_key_cache, \
+    coll_write_sort_key_cache
 from matholymp.csvsource import CSVDataSource
 from matholymp.data import EventGroup
 from matholymp.datetimeutil import date_range_html, date_to_ymd_iso, \
     time_to_hhmm
-from matholymp.fileutil import read_utf8_csv, write_utf8_csv, \
-    comma_join, write_bytes_to_file, write_text_to_file, read_text_from_file, \
-    read_config
-from matholymp.images import open_image_no_alpha, scale_image_to_width_jpeg, \
-    scale_image_to_width_png
+from matholymp.fileutil import read_utf8_csv, read_utf8_csv_cached, \
+    write_utf8_csv, comma_join, write_bytes_to_file, write_text_to_file, \
+    read_text_from_file, read_config, read_cache_file, write_cache_file, \
+    remove_output_file
+from matholymp.images import scale_image_file_to_widths
+from matholymp.profilesource import ProfilingDataSource
 
 __all__ = ['read_sitegen_config', 'sitegen_events_csv', 'sitegen_papers_csv',
            'sitegen_countries_csv', 'sitegen_people_csv',
-           'sitegen_event_group', 'SiteGenerator']
+           'sitegen_event_group', 'sitegen_write_sort_key_cache',
+           'SiteGenerator']
+
+
+# The number of items of a site, other than those whose inputs are
+# recorded, generated together by one process.
+_shard_size = 100
+
+# The kinds of items of a site whose inputs are recorded in a
+# manifest.
+_recorded_item_kinds = ('common', 'event', 'country', 'person')
+
+# Version of the format of manifests of inputs used in site
+# generation.
+_manifest_version = 2
+
+# The SiteGenerator used in a process generating items of a site in
+# parallel.
+_shard_generator = None
+
+
+def _init_shard_worker(generator):
+    """Initialise a process for generating items of a site."""
+    global _shard_generator
+    _shard_generator = generator
+
+
+def _generate_shard_in_worker(items, record):
+    """
+    Generate some items of a site in a worker process, returning the
+    results of generate_items_recording and any changes to the
+    OutputManifest.
+    """
+    ret = _shard_generator.generate_items_recording(items, record)
+    manifest = _shard_generator._output_manifest
+    return (ret, manifest.take_updates() if manifest is not None else None)
+
+
+def _make_thumbnails(task):
+    """
+    Make the thumbnails for one thumbnail task from site_thumbnails,
+    returning a list of pairs of the file name and contents of each
+    thumbnail.
+    """
+    source_filename, image_format, thumbs = task
+    thumb_bytes = scale_image_file_to_widths(
+        source_filename, [width for width, filename in thumbs], image_format)
+    return [(filename, contents)
+            for (width, filename), contents in zip(thumbs, thumb_bytes)]
 
 
 def read_sitegen_config(top_directory):
@@ -97,21 +152,87 @@ def sitegen_people_csv(top_directory, cfg_data):
     return os.path.join(top_directory, 'data', 'people.csv')
 
 
-def sitegen_event_group(top_directory, cfg_data):
-    """Return an EventGroup based on the static site data."""
+def sitegen_event_group(top_directory, cfg_data, cache_file=None,
+                        collect_stats=False, profile_file=None,
+                        snapshot_file=None):
+    """
+    Return an EventGroup based on the static site data.  If cache_file
+    is specified, the parsed contents of the CSV files are cached in
+    that file and reused as long as the CSV files are unchanged, and
+    collation sort keys saved by sitegen_write_sort_key_cache are
+    loaded.  If collect_stats is true, the EventGroup collects
+    statistics about computed values.  If profile_file is specified,
+    statistics of accesses to the underlying data are appended to
+    that file when the EventGroup is discarded.  If snapshot_file is
+    specified, a snapshot of the EventGroup with all values computed
+    is saved in that file and reused as long as the CSV files,
+    configuration and version of matholymp are unchanged; it is not
+    used if collect_stats or profile_file is specified, since
+    computing all values would make their statistics meaningless.
+    """
     events_csv = sitegen_events_csv(top_directory, cfg_data)
     papers_csv = sitegen_papers_csv(top_directory, cfg_data)
     countries_csv = sitegen_countries_csv(top_directory, cfg_data)
     people_csv = sitegen_people_csv(top_directory, cfg_data)
 
-    events_data = read_utf8_csv(events_csv)
-    countries_data = read_utf8_csv(countries_csv)
-    people_data = read_utf8_csv(people_csv)
-    papers_data = read_utf8_csv(papers_csv)
-
-    return EventGroup(CSVDataSource(cfg_data, events_data, papers_data,
-                                    countries_data, people_data,
-                                    top_directory))
+    if collect_stats or profile_file is not None:
+        snapshot_file = None
+    if snapshot_file is not None:
+        # The file status is obtained before reading the files, so
+        # any change made after that point will be detected next
+        # time.
+        csv_keys = []
+        for csv_file in (events_csv, papers_csv, countries_csv, people_csv):
+            st = os.stat(csv_file)
+            csv_keys.append((os.path.basename(csv_file), st.st_size,
+                             st.st_mtime_ns))
+        # Computed values may change between versions of matholymp,
+        # so a snapshot is only reused with the same version.
+        snapshot_key = (matholymp.__version__, os.path.abspath(top_directory),
+                        csv_keys, cfg_data)
+        try:
+            return EventGroup.read_snapshot(snapshot_file, snapshot_key)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            # A missing, outdated or corrupt snapshot is simply
+            # regenerated.
+            pass
+
+    if cache_file is None:
+        events_data = read_utf8_csv(events_csv)
+        countries_data = read_utf8_csv(countries_csv)
+        people_data = read_utf8_csv(people_csv)
+        papers_data = read_utf8_csv(papers_csv)
+    else:
+        (events_data, countries_data, people_data,
+         papers_data) = read_utf8_csv_cached([events_csv, countries_csv,
+                                              people_csv, papers_csv],
+                                             cache_file)
+        coll_read_sort_key_cache(_sort_key_cache_file(cache_file))
+
+    datasource = CSVDataSource(cfg_data, events_data, papers_data,
+                               countries_data, people_data, top_directory)
+    if profile_file is not None:
+        datasource = ProfilingDataSource(datasource, profile_file)
+    event_group = EventGroup(datasource, collect_stats=collect_stats)
+    if snapshot_file is not None:
+        try:
+            event_group.write_snapshot(snapshot_file, snapshot_key)
+        except OSError:
+            pass
+    return event_group
+
+
+def _sort_key_cache_file(cache_file):
+    """Return the file for collation sort keys for a given data cache."""
+    return cache_file + '.collate'
+
+
+def sitegen_write_sort_key_cache(cache_file):
+    """
+    Save the collation sort keys computed so far, for use by
+    sitegen_event_group with the same cache_file.
+    """
+    coll_write_sort_key_cache(_sort_key_cache_file(cache_file))
 
 
 class SiteGenerator:
@@ -122,19 +243,55 @@ class SiteGenerator:
     site is generated from it.
     """
 
-    def __init__(self, cfg, event_group, out_dir=None):
+    def __init__(self, cfg, event_group, out_dir=None, output_manifest=None):
         """
         Initialise a SiteGenerator from the given configuration
-        information and EventGroup.
+        information and EventGroup, optionally with an OutputManifest
+        in which to record files written.
         """
         self._cfg = cfg
         self._data = event_group
         self._out_dir = out_dir
+        self._output_manifest = output_manifest
         self._url_base_rel = re.sub('^https?://[^/]*', '',
                                     self._cfg['url_base'])
         if out_dir is not None:
             self._auto_out_dir = os.path.join(out_dir, cfg['short_name_url'],
                                               'auto')
+        self._file_checks = None
+        self._file_writes = None
+
+    def record_output(self, out_file_name):
+        """
+        Record a file as an output of the item being generated, if
+        dependencies are being recorded.
+        """
+        if self._file_writes is not None:
+            rel_path = os.path.relpath(out_file_name, self._out_dir)
+            self._file_writes.add(rel_path.replace(os.sep, '/'))
+
+    def write_text_output(self, out_text, out_file_name):
+        """
+        Write some UTF-8 text to a file in the output directory,
+        recording it as for record_output.
+        """
+        self.record_output(out_file_name)
+        write_text_to_file(out_text, out_file_name, self._output_manifest)
+
+    def remove_output(self, out_path):
+        """
+        Remove an output file, given its path relative to the output
+        directory as a list, and any directories left empty.
+        """
+        out_file_name = os.path.join(self._out_dir, *out_path)
+        remove_output_file(out_file_name, self._output_manifest)
+        top_dir = os.path.abspath(self._out_dir)
+        out_dir = os.path.dirname(os.path.abspath(out_file_name))
+        while out_dir != top_dir and os.path.isdir(out_dir):
+            if os.listdir(out_dir):
+                break
+            os.rmdir(out_dir)
+            out_dir = os.path.dirname(out_dir)
 
     def write_html_to_file(self, out_text, title, header, out_path):
         """Write HTML text to a file in standard template."""
@@ -147,12 +304,14 @@ class SiteGenerator:
         out_file_name = os.path.join(self._out_dir, *out_path)
         out_file_name = os.path.join(out_file_name,
                                      'index' + self._cfg['page_suffix'])
-        write_text_to_file(text, out_file_name)
+        self.write_text_output(text, out_file_name)
 
     def write_csv_to_file(self, csv_file_path, rows, keys):
         """Write a CSV file in the output directory."""
         csv_file_name = os.path.join(self._out_dir, *csv_file_path)
-        write_utf8_csv(csv_file_name, rows, keys)
+        self.record_output(csv_file_name)
+        write_utf8_csv(csv_file_name, rows, keys,
+                       manifest=self._output_manifest)
 
     def _attr_text(self, attrs):
         nattrs = {}
@@ -510,6 +669,20 @@ class SiteGenerator:
         """Generate a link to the main page for a given country."""
         return self.link_for_page(self.path_for_country(country), link_body)
 
+    def path_for_country_medal_table(self):
+        """
+        Return the path (a list) of the directory of the medal table
+        of countries.
+        """
+        p = self.path_for_countries()
+        p.append('medals')
+        return p
+
+    def link_for_country_medal_table(self, link_body):
+        """Generate a link to the medal table of countries."""
+        return self.link_for_page(self.path_for_country_medal_table(),
+                                  link_body)
+
     def path_for_people(self):
         """Return the path (a list) of the directory of people."""
         return ['people']
@@ -596,7 +769,7 @@ class SiteGenerator:
             out_list.append(text)
         out_list.reverse()
         out_text = '\n'.join(out_list) + '\n'
-        write_text_to_file(out_text, sidebar_out)
+        self.write_text_output(out_text, sidebar_out)
 
     def generate_contact_out(self):
         """Generate HTML text for contact details."""
@@ -613,7 +786,7 @@ class SiteGenerator:
                         % (short_name, contact))
                 out_list.append(text)
         out_text = '\n'.join(out_list) + '\n'
-        write_text_to_file(out_text, contact_out)
+        self.write_text_output(out_text, contact_out)
 
     def generate_events_summary(self):
         """Generate a summmary of all events."""
@@ -697,9 +870,12 @@ class SiteGenerator:
     def generate_countries_summary(self):
         """Generate a summary of all countries."""
         text = ''
-        text += ('<p>Details of all countries at all %s may also be'
-                 ' %s in CSV format.</p>\n'
-                 % (html.escape(self._data.short_name_plural),
+        mttxt = ('medal table of countries at all %s'
+                 % html.escape(self._data.short_name_plural))
+        text += ('<p>A %s is also available.  Details of all countries at'
+                 ' all %s may also be %s in CSV format.</p>\n'
+                 % (self.link_for_country_medal_table(mttxt),
+                    html.escape(self._data.short_name_plural),
                     self.link_for_data_countries('downloaded')))
         head_row = [self.html_th('Code'),
                     self.html_th('Name')]
@@ -714,7 +890,7 @@ class SiteGenerator:
              self.html_th('Host')])
         head_row_list = [self.html_tr_list(head_row)]
         body_row_list = []
-        countries = sorted(self._data.country_list, key=lambda x: x.sort_key)
+        countries = self._data.country_list_sorted
         for c in countries:
             first_c = c.participation_list[0]
             last_c = c.participation_list[-1]
@@ -737,6 +913,41 @@ class SiteGenerator:
         header = 'Countries'
         self.write_html_to_file(text, title, header, self.path_for_countries())
 
+    def generate_country_medal_table(self):
+        """Generate medal table of countries at all events."""
+        text = ''
+        head_row = [self.html_th_scores('Code'),
+                    self.html_th_scores('Name'),
+                    self.html_th_scores('G', title='Gold'),
+                    self.html_th_scores('S', title='Silver'),
+                    self.html_th_scores('B', title='Bronze')]
+        if self._data.honourable_mentions_available:
+            head_row.extend([self.html_th_scores('HM',
+                                                 title='Honourable Mention')])
+        head_row.extend([self.html_th_scores('Contestants'),
+                         self.html_th_scores(
+                             '#', title=('Number of %s'
+                                         % self._data.short_name_plural))])
+        head_row_list = [self.html_tr_list(head_row)]
+        body_row_list = []
+        for (c, num_awards, num_contestants,
+             num_participations) in self._data.country_stats.medal_table():
+            row = [self.link_for_country(c, html.escape(c.code)),
+                   self.link_for_country(c, html.escape(c.name)),
+                   str(num_awards['Gold Medal']),
+                   str(num_awards['Silver Medal']),
+                   str(num_awards['Bronze Medal'])]
+            if self._data.honourable_mentions_available:
+                row.extend([str(num_awards['Honourable Mention'])])
+            row.extend([str(num_contestants), str(num_participations)])
+            body_row_list.append(self.html_tr_td_scores_list(row))
+        text += self.html_table_thead_tbody_list(head_row_list, body_row_list)
+        text += '\n'
+        title = 'Medal Table'
+        header = 'Medal Table'
+        self.write_html_to_file(text, title, header,
+                                self.path_for_country_medal_table())
+
     def generate_people_summary(self):
         """Generate a summary of all people."""
         text = ''
@@ -960,7 +1171,7 @@ class SiteGenerator:
             head_row.extend([html.escape(self._cfg['official_desc'])])
         head_row_list = [self.html_tr_th_list(head_row)]
         body_row_list = []
-        countries = sorted(e.country_list, key=lambda x: x.sort_key)
+        countries = e.country_list_sorted
         for c in countries:
             row = [self.link_for_country_at_event(c, html.escape(c.code)),
                    self.link_for_country_at_event(c, html.escape(c.name))]
@@ -979,10 +1190,10 @@ class SiteGenerator:
     def event_people_table(self, e):
         """Generate the table of people at one event."""
         ctext_list = []
-        countries = sorted(e.country_list, key=lambda x: x.sort_key)
+        countries = e.country_list_sorted
         for c in countries:
             text = ''
-            people = sorted(c.person_list, key=lambda x: x.sort_key)
+            people = c.person_list_sorted
             cl = self.link_for_country_at_event(c,
                                                 html.escape(c.name_with_code))
             text += '<h2>%s</h2>\n' % cl
@@ -1019,10 +1230,10 @@ class SiteGenerator:
         """Generate the summary table of people at one event, with photos."""
         person_entries = []
         row_len = 6
-        countries = sorted(e.country_list, key=lambda x: x.sort_key)
+        countries = e.country_list_sorted
         for c in countries:
             text = ''
-            people = sorted(c.person_list, key=lambda x: x.sort_key)
+            people = c.person_list_sorted
             cl = self.link_for_country_at_event(c,
                                                 html.escape(c.name_with_code))
             text += '<h2>%s</h2>\n' % cl
@@ -1283,8 +1494,7 @@ class SiteGenerator:
     def scoreboard_text(self, e):
         """Return the main text of the scoreboard for one event."""
         text = ''
-        countries = e.country_with_contestants_list
-        contestants = sorted(e.contestant_list, key=lambda x: x.sort_key)
+        contestants = e.contestant_list_sorted
         num_problems = e.num_problems
 
         text += '<h2>Scores by contestant code</h2>\n'
@@ -1297,8 +1507,7 @@ class SiteGenerator:
 
         text += '<h2>Ranked scores</h2>\n'
         body_row_list = []
-        rank_sorted_contestants = sorted(contestants, key=lambda x: x.rank)
-        for p in rank_sorted_contestants:
+        for p in e.contestants_by_rank:
             body_row_list.append(self.person_scoreboard_row(p))
         text += self.html_table_thead_tbody_list(head_row_list, body_row_list)
         text += '\n'
@@ -1446,11 +1655,8 @@ class SiteGenerator:
 
         text += '<h2>Country results</h2>\n'
         head_row_list = [self.country_scoreboard_header(e, None)]
-        rank_sorted_countries = sorted(countries, key=lambda x: x.sort_key)
-        rank_sorted_countries = sorted(rank_sorted_countries,
-                                       key=lambda x: x.rank)
         body_row_list = []
-        for c in rank_sorted_countries:
+        for c in e.countries_by_rank:
             body_row_list.append(self.country_scoreboard_row(e, c))
         text += self.html_table_thead_tbody_list(head_row_list, body_row_list)
         text += '\n'
@@ -1474,9 +1680,7 @@ class SiteGenerator:
         text = ''
         extra_dir = '/'.join(self.path_for_event(e))
         text += self._cfg['scoreboard_include_extra'] % {'dir': extra_dir}
-        rss_file = os.path.join(self._out_dir,
-                                *self.path_for_event_scores_rss(e))
-        if os.access(rss_file, os.F_OK):
+        if self.output_exists(self.path_for_event_scores_rss(e)):
             rss_note = ('  An %s is also available.'
                         % self.link_for_event_scores_rss(e, 'RSS feed of the'
                                                          ' scores as they were'
@@ -1522,8 +1726,8 @@ class SiteGenerator:
                                        'redirects-%d' % e.id)
         text = ''
         base_url = ''
-        countries = sorted(e.country_list, key=lambda x: x.sort_key)
-        people = sorted(e.person_list, key=lambda x: x.sort_key)
+        countries = e.country_list_sorted
+        people = e.person_list_sorted
         for c in countries:
             src_url = c.annual_url
             if src_url:
@@ -1588,14 +1792,14 @@ class SiteGenerator:
         src_url = base_url
         dest_path = self.path_for_event_countries(e)
         text += self.generate_redirect_page(src_url, '', dest_path)
-        write_text_to_file(text, e_redirects_out)
+        self.write_text_output(text, e_redirects_out)
 
     def country_event_scores_table(self, c, show_rank=True):
         """
         Generate the table of contestant scores for one country at one
         event, given that this country has contestants.
         """
-        c_contestants = sorted(c.contestant_list, key=lambda x: x.sort_key)
+        c_contestants = c.contestant_list_sorted
         head_row_list = [self.person_scoreboard_header(c.event,
                                                        show_rank=show_rank)]
         body_row_list = []
@@ -1608,9 +1812,7 @@ class SiteGenerator:
     def country_event_people_table(self, c, show_photos):
         """Generate the table of people for one country at one event."""
         text = ''
-        c_people = sorted(c.person_list, key=lambda x: x.sort_key)
-        c_guides = sorted(c.guide_list, key=lambda x: x.sort_key)
-        c_people.extend(c_guides)
+        c_people = c.person_list_sorted + c.guide_list_sorted
         hrow = ['Given Name', 'Family Name', 'Role']
         if show_photos:
             hrow.append('Photo')
@@ -1687,19 +1889,47 @@ class SiteGenerator:
         self.write_html_to_file(text, title, header,
                                 self.path_for_country_at_event(c))
 
-    def generate_one_event_country_flag_thumb(self, c):
-        """Generate a flag thumbnail for one country at one event."""
-        flag_filename = c.flag_filename
-        if flag_filename and os.access(flag_filename, os.F_OK):
-            flag_thumb_filename = (c.flag_thumb_filename
-                                   % {'width':
-                                      self.country_flag_thumb_width()})
+    def _thumbnail_task(self, source_filename, thumb_filename, image_format,
+                        widths):
+        """
+        Return the thumbnail task (as described for site_thumbnails)
+        for one source image, or None if there are no thumbnails to
+        make.
+        """
+        if not source_filename or not os.access(source_filename, os.F_OK):
+            return None
+        thumbs = []
+        for width in widths:
+            filename = thumb_filename % {'width': width}
             # Image scaling is slow, so do not do it if the thumbnail
             # already exists.
-            if not os.access(flag_thumb_filename, os.F_OK):
-                thumb_bytes = scale_image_to_width_png(open_image_no_alpha(
-                    flag_filename), self.country_flag_thumb_width())
-                write_bytes_to_file(thumb_bytes, flag_thumb_filename)
+            if not os.access(filename, os.F_OK):
+                thumbs.append((width, filename))
+        if not thumbs:
+            return None
+        return (source_filename, image_format, tuple(thumbs))
+
+    def event_country_flag_thumb_task(self, c):
+        """
+        Return the thumbnail task for the flag of one country at one
+        event, or None if there is nothing to do.
+        """
+        return self._thumbnail_task(c.flag_filename, c.flag_thumb_filename,
+                                    'PNG', (self.country_flag_thumb_width(),))
+
+    def write_thumbnails(self, thumbnails):
+        """
+        Write thumbnails, given a list of pairs of file name and
+        contents.
+        """
+        for filename, contents in thumbnails:
+            write_bytes_to_file(contents, filename, self._output_manifest)
+
+    def generate_one_event_country_flag_thumb(self, c):
+        """Generate a flag thumbnail for one country at one event."""
+        task = self.event_country_flag_thumb_task(c)
+        if task is not None:
+            self.write_thumbnails(_make_thumbnails(task))
 
     def generate_one_country_page(self, cd):
         """Generate main page for one country."""
@@ -1824,21 +2054,25 @@ class SiteGenerator:
         header = title
         self.write_html_to_file(text, title, header, self.path_for_person(pd))
 
+    def person_event_photo_thumb_task(self, p):
+        """
+        Return the thumbnail task for the photo of one person at one
+        event, or None if there is nothing to do.
+        """
+        widths = []
+        for width in (self.summary_photo_thumb_width(),
+                      self.country_photo_thumb_width(),
+                      self.person_photo_thumb_width()):
+            if width not in widths:
+                widths.append(width)
+        return self._thumbnail_task(p.photo_filename, p.photo_thumb_filename,
+                                    'JPEG', widths)
+
     def generate_one_person_event_photo_thumb(self, p):
         """Generate photo thumbnails for one person at one event."""
-        photo_filename = p.photo_filename
-        if photo_filename and os.access(photo_filename, os.F_OK):
-            widths = (self.summary_photo_thumb_width(),
-                      self.country_photo_thumb_width(),
-                      self.person_photo_thumb_width())
-            for width in widths:
-                filename = p.photo_thumb_filename % {'width': width}
-                # Image scaling is slow, so do not do it if the
-                # thumbnail already exists.
-                if not os.access(filename, os.F_OK):
-                    thumb_bytes = scale_image_to_width_jpeg(
-                        open_image_no_alpha(photo_filename), width)
-                    write_bytes_to_file(thumb_bytes, filename)
+        task = self.person_event_photo_thumb_task(p)
+        if task is not None:
+            self.write_thumbnails(_make_thumbnails(task))
 
     def generate_events_csv(self):
         """Generate the CSV file for all events."""
@@ -2099,8 +2333,7 @@ class SiteGenerator:
 
     def generate_countries_csv(self):
         """Generate the CSV file for all countries."""
-        countries_sorted = sorted(self._data.country_event_list,
-                                  key=lambda x: x.sort_key)
+        countries_sorted = self._data.country_event_list_sorted
         countries_data_output = [self.country_csv_data(c, None)
                                  for c in countries_sorted]
         countries_columns = self.countries_csv_columns(None)
@@ -2113,7 +2346,7 @@ class SiteGenerator:
         Return a tuple of the data and column headers for the CSV file
         for countries at one event.
         """
-        e_countries_sorted = sorted(e.country_list, key=lambda x: x.sort_key)
+        e_countries_sorted = e.country_list_sorted
         e_countries_data_output = [self.country_csv_data(
             c, e, reg_system=reg_system, private_data=private_data)
                                    for c in e_countries_sorted]
@@ -2303,8 +2536,7 @@ class SiteGenerator:
 
     def generate_people_csv(self):
         """Generate the CSV file for all peoples."""
-        people_sorted = sorted(self._data.person_event_list,
-                               key=lambda x: x.sort_key)
+        people_sorted = self._data.person_event_list_sorted
         people_data_output = [
             self.person_csv_data(
                 p, num_problems=self._data.max_num_problems,
@@ -2324,7 +2556,7 @@ class SiteGenerator:
         Return a tuple of the data and column headers for the CSV file
         for people at one event.
         """
-        e_people_sorted = sorted(e.person_list, key=lambda x: x.sort_key)
+        e_people_sorted = e.person_list_sorted
         e_people_data_output = [self.person_csv_data(p, reg_system=reg_system,
                                                      private_data=private_data,
                                                      show_scores=show_scores)
@@ -2361,7 +2593,7 @@ class SiteGenerator:
         Return a tuple of the data and column headers for the CSV file
         for scores at one event.
         """
-        e_people_sorted = sorted(e.contestant_list, key=lambda x: x.sort_key)
+        e_people_sorted = e.contestant_list_sorted
         e_scores_data_output = [self.person_csv_data(p, scores_only=True,
                                                      reg_system=reg_system)
                                 for p in e_people_sorted]
@@ -2376,25 +2608,79 @@ class SiteGenerator:
         self.write_csv_to_file(self.path_for_event_scores_csv(e),
                                data[0], data[1])
 
-    def generate_site(self):
-        """Generate the complete static site."""
-        self.generate_sidebar_out()
-        self.generate_contact_out()
-        self.generate_events_summary()
-        self.generate_countries_summary()
-        self.generate_people_summary()
-        self.generate_hall_of_fame()
-
+    def site_items(self):
+        """
+        Return a list of the items into which generation of the
+        complete static site is divided.  Each item is a tuple
+        describing part of the site, generated by generate_item, that
+        does not depend on any other item.
+        """
+        items = [('common',)]
         for e in self._data.event_list:
+            items.append(('event_extra', e.id))
+            items.append(('event', e.id))
+        items.extend(('country', c.id) for c in self._data.country_list)
+        items.extend(('person', p.id) for p in self._data.person_list)
+        return items
+
+    def site_thumbnails(self):
+        """
+        Return a list of the thumbnail tasks for the static site, made
+        separately from the items from site_items.  Each task is a
+        tuple of the file name of a source image, the format of its
+        thumbnails ('JPEG' or 'PNG') and a tuple of pairs of width and
+        file name of each thumbnail to be made from it; all the
+        thumbnails are made from a single decoding of the source
+        image.  Only thumbnails that do not already exist are
+        included.
+        """
+        tasks = []
+        # Flags and photos may be shared between events; each source
+        # image is handled by only one task.
+        seen = set()
+        for c in self._data.country_event_list:
+            if (c.flag_thumb_filename is not None
+                and c.flag_thumb_filename not in seen):
+                seen.add(c.flag_thumb_filename)
+                task = self.event_country_flag_thumb_task(c)
+                if task is not None:
+                    tasks.append(task)
+        for p in self._data.person_event_list:
+            if (p.photo_thumb_filename is not None
+                and p.photo_thumb_filename not in seen):
+                seen.add(p.photo_thumb_filename)
+                task = self.person_event_photo_thumb_task(p)
+                if task is not None:
+                    tasks.append(task)
+        return tasks
+
+    def generate_item(self, item):
+        """Generate one item of the static site, from site_items."""
+        kind = item[0]
+        if kind == 'common':
+            self.generate_sidebar_out()
+            self.generate_contact_out()
+            self.generate_events_summary()
+            self.generate_countries_summary()
+            self.generate_country_medal_table()
+            self.generate_people_summary()
+            self.generate_hall_of_fame()
+            self.generate_events_csv()
+            self.generate_countries_csv()
+            self.generate_people_csv()
+        elif kind == 'event_extra':
+            e = self._data.event_map[item[1]]
             e_extra = os.path.join(self._out_dir, *self.path_for_event(e))
             e_extra = os.path.join(e_extra, 'extra' + self._cfg['page_suffix'])
             if not os.access(e_extra, os.F_OK):
-                write_text_to_file('', e_extra)
+                self.write_text_output('', e_extra)
             s_extra = os.path.join(self._out_dir, *self.path_for_event(e))
             s_extra = os.path.join(
                 s_extra, 'scoreboard-extra' + self._cfg['page_suffix'])
             if not os.access(s_extra, os.F_OK):
-                write_text_to_file('', s_extra)
+                self.write_text_output('', s_extra)
+        elif kind == 'event':
+            e = self._data.event_map[item[1]]
             self.generate_one_event_summary(e)
             if e.num_contestants:
                 self.generate_one_event_countries_summary(e)
@@ -2404,22 +2690,246 @@ class SiteGenerator:
                 self.generate_one_event_redirects(e)
                 for c in e.country_list:
                     self.generate_one_event_country_page(c)
-                    self.generate_one_event_country_flag_thumb(c)
+                self.generate_one_event_countries_csv(e)
+                self.generate_one_event_people_csv(e)
+                self.generate_one_event_scores_csv(e)
+        elif kind == 'country':
+            self.generate_one_country_page(self._data.country_map[item[1]])
+        elif kind == 'person':
+            self.generate_one_person_page(self._data.person_map[item[1]])
+        else:
+            raise ValueError('unknown site item %s' % repr(item))
 
-        for c in self._data.country_list:
-            self.generate_one_country_page(c)
+    def output_exists(self, out_path):
+        """
+        Return whether an output file exists, given its path relative
+        to the output directory as a list, recording the check as an
+        input to the item being generated if dependencies are being
+        recorded.
+        """
+        exists = os.access(os.path.join(self._out_dir, *out_path), os.F_OK)
+        if self._file_checks is not None:
+            self._file_checks['/'.join(out_path)] = exists
+        return exists
 
-        for p in self._data.person_list:
-            self.generate_one_person_page(p)
-            for pe in p.participation_list:
-                self.generate_one_person_event_photo_thumb(pe)
+    def generate_items_recording(self, items, record):
+        """
+        Generate some items of the static site, returning a list of
+        the inputs and outputs of each item (as a tuple of a list of
+        attributes accessed, as returned by EventGroup.take_accesses,
+        a dict of results of output_exists and a sorted list of the
+        paths of files written, relative to the output directory and
+        using '/' as a separator) if record is true, or None
+        otherwise.
+        """
+        if not record:
+            for item in items:
+                self.generate_item(item)
+            return None
+        ret = []
+        for item in items:
+            self._data.take_accesses()
+            self._file_checks = {}
+            self._file_writes = set()
+            try:
+                self.generate_item(item)
+                ret.append((self._data.take_accesses(), self._file_checks,
+                            sorted(self._file_writes)))
+            finally:
+                self._file_checks = None
+                self._file_writes = None
+        return ret
+
+    def _manifest_site_key(self):
+        """
+        Return a value that is the same between runs of site
+        generation if the results for unchanged inputs are the same.
+        """
+        return (matholymp.__version__, os.path.abspath(self._out_dir),
+                self._cfg)
 
-        self.generate_events_csv()
-        self.generate_countries_csv()
-        self.generate_people_csv()
+    def _changed_items(self, items, manifest, digests):
+        """
+        Return the items of the site that need generating, given the
+        manifest from a previous run, filling in the dict of digests
+        for the inputs in the manifest.
+        """
+        changed = set()
+        for n, (key, name) in enumerate(manifest['inputs']):
+            digest = self._data.attribute_digest(key, name)
+            digests[(key, name)] = digest
+            if digest is None or digest != manifest['digests'][n]:
+                changed.add(n)
+        ret = []
+        for item in items:
+            if item[0] not in _recorded_item_kinds:
+                ret.append(item)
+                continue
+            old = manifest['items'].get(item)
+            if (old is None
+                or any(n in changed for n in old[0])
+                or any(self.output_exists(path.split('/')) != exists
+                       for path, exists in old[1].items())):
+                ret.append(item)
+        return ret
+
+    def _item_records(self, items, manifest, records):
+        """
+        Return a dict mapping each item of the site whose inputs are
+        recorded to its inputs and outputs, as returned by
+        generate_items_recording, from the records for the items
+        generated in this run and the manifest for the others.
+        """
+        item_records = {}
+        for item in items:
+            if item[0] not in _recorded_item_kinds:
+                continue
+            if item in records:
+                item_records[item] = records[item]
+            else:
+                old_inputs, old_checks, old_outputs = manifest['items'][item]
+                item_records[item] = ([manifest['inputs'][n]
+                                       for n in old_inputs], old_checks,
+                                      old_outputs)
+        return item_records
 
-        for e in self._data.event_list:
-            if e.num_contestants:
-                self.generate_one_event_countries_csv(e)
-                self.generate_one_event_people_csv(e)
-                self.generate_one_event_scores_csv(e)
+    def _remove_old_outputs(self, manifest, item_records):
+        """
+        Remove the files written for items of the site in the run that
+        wrote the manifest that were not written for any item in this
+        run, such as pages for people no longer in the data.
+        """
+        new_outputs = set()
+        for accesses, checks, outputs in item_records.values():
+            new_outputs.update(outputs)
+        old_outputs = set()
+        for accesses, checks, outputs in manifest['items'].values():
+            old_outputs.update(outputs)
+        for path in sorted(old_outputs - new_outputs):
+            self.remove_output(path.split('/'))
+
+    def _write_manifest(self, manifest_file, item_records, digests):
+        """
+        Write the manifest of the inputs and outputs of each item of
+        the site.
+        """
+        inputs = []
+        input_index = {}
+        new_items = {}
+        for item, (accesses, checks, outputs) in item_records.items():
+            indices = array.array('L')
+            for access in accesses:
+                n = input_index.get(access)
+                if n is None:
+                    n = len(inputs)
+                    input_index[access] = n
+                    inputs.append(access)
+                indices.append(n)
+            new_items[item] = (indices, checks, outputs)
+        for access in inputs:
+            if access not in digests:
+                digests[access] = self._data.attribute_digest(*access)
+        write_cache_file(manifest_file,
+                         {'version': _manifest_version,
+                          'out_dir': os.path.abspath(self._out_dir),
+                          'site': self._manifest_site_key(),
+                          'inputs': inputs,
+                          'digests': [digests[access] for access in inputs],
+                          'items': new_items})
+
+    def generate_site(self, jobs=1, manifest_file=None, full=False):
+        """
+        Generate the complete static site.  If jobs is more than 1,
+        that many processes forked from this one generate items of the
+        site in parallel, after the EventGroup is materialized so that
+        they share all the computed data, and then make thumbnails in
+        parallel; this is only supported on systems where processes
+        can be forked.  If manifest_file is specified, the values from
+        the data used to generate each page, and the files written,
+        are recorded in that file; in subsequent runs, only pages for
+        which those values have changed are generated, unless full is
+        true, and files from the previous run that are no longer part
+        of the site are removed.
+        """
+        all_items = self.site_items()
+        items = all_items
+        old_manifest = None
+        manifest = None
+        digests = {}
+        if manifest_file is not None:
+            old_manifest = read_cache_file(manifest_file, _manifest_version)
+            if (old_manifest is not None
+                and old_manifest['out_dir'] != os.path.abspath(self._out_dir)):
+                old_manifest = None
+            if (old_manifest is not None and not full
+                and old_manifest['site'] == self._manifest_site_key()):
+                manifest = old_manifest
+                items = self._changed_items(items, manifest, digests)
+        record = manifest_file is not None
+        if record:
+            # Values are computed before recording starts where
+            # possible, since that is faster without recording.
+            if not self._data.materialized:
+                self._data.materialize()
+            self._data.record_accesses()
+        # Items whose inputs are recorded are generated one at a time,
+        # and others in groups of _shard_size.
+        shards = []
+        for item in items:
+            if (item[0] in _recorded_item_kinds
+                or not shards
+                or shards[-1][-1][0] in _recorded_item_kinds
+                or len(shards[-1]) >= _shard_size):
+                shards.append([item])
+            else:
+                shards[-1].append(item)
+        if jobs <= 1:
+            results = [self.generate_items_recording(shard, record)
+                       for shard in shards]
+            # Accesses made in finding the thumbnails to make are not
+            # part of the inputs of any item.
+            if record:
+                self._data.record_accesses(False)
+            for task in self.site_thumbnails():
+                self.write_thumbnails(_make_thumbnails(task))
+        else:
+            if 'fork' not in multiprocessing.get_all_start_methods():
+                raise ValueError('parallel site generation not supported')
+            if not self._data.materialized:
+                self._data.materialize()
+            # Objects that already exist are never freed in the worker
+            # processes, so exclude them from garbage collection to
+            # avoid copying the memory they use into each process.
+            gc.freeze()
+            try:
+                ctx = multiprocessing.get_context('fork')
+                with ctx.Pool(jobs, _init_shard_worker, (self,)) as pool:
+                    shard_results = pool.starmap(_generate_shard_in_worker,
+                                                 [(shard, record)
+                                                  for shard in shards],
+                                                 chunksize=1)
+                    results = []
+                    for result, manifest_updates in shard_results:
+                        results.append(result)
+                        if manifest_updates is not None:
+                            self._output_manifest.apply_updates(
+                                manifest_updates)
+                    if record:
+                        self._data.record_accesses(False)
+                    # Thumbnails are written by this process, in a
+                    # fixed order, as they are made.
+                    for thumbnails in pool.imap(_make_thumbnails,
+                                                self.site_thumbnails()):
+                        self.write_thumbnails(thumbnails)
+            finally:
+                gc.unfreeze()
+        if record:
+            records = {}
+            for shard, result in zip(shards, results):
+                for item, item_inputs in zip(shard, result):
+                    if item[0] in _recorded_item_kinds:
+                        records[item] = item_inputs
+            item_records = self._item_records(all_items, manifest, records)
+            if old_manifest is not None:
+                self._remove_old_outputs(old_manifest, item_records)
+            self._write_manifest(manifest_file, item_records, digests)
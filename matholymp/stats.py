@@ -33,17 +33,48 @@ This module provides statistics support for matholymp use.
 
 import math
 
-__all__ = ['mean_std_dev', 'corr_coeff']
+__all__ = ['mean_std_dev', 'corr_coeff', 'corr_coeff_matrix',
+           'MeanStdDevAccumulator', 'CorrCoeffAccumulator']
 
 # These functions do everything with integers before the final
 # division and square root, to reduce the chance of floating-point
-# rounding affecting the final textual output.
+# rounding affecting the final textual output.  Because the sums are
+# exact integers, n * s2 - s * s involves no cancellation error
+# however large the sums get; only the final conversion to float
+# rounds.  The accumulator classes keep the same exact sums, so they
+# give identical results to the functions operating on whole lists,
+# and can also remove values and be merged without any loss of
+# accuracy (which would not be the case for floating-point
+# Welford-style updates).
 
 
 def _sum_sq(data):
     return sum([x * x for x in data])
 
 
+def _mean_std_dev_sums(n, s, s2):
+    """
+    Return the mean and standard deviation given the number of values,
+    their sum and the sum of their squares.
+    """
+    mean = float(s) / float(n)
+    std_dev = math.sqrt(float(n * s2 - s * s) / float(n * n))
+    return (mean, std_dev)
+
+
+def _corr_coeff_sums(n, sx, sx2, sy, sy2, sxy):
+    """
+    Return the correlation coefficient given the number of pairs, the
+    sums and sums of squares of each variable and the sum of
+    products, or None if either variable is constant.
+    """
+    num = n * sxy - sx * sy
+    den2 = (n * sx2 - sx * sx) * (n * sy2 - sy * sy)
+    if den2 == 0:
+        return None
+    return float(num) / math.sqrt(float(den2))
+
+
 def mean_std_dev(data):
     """
     Return the mean and standard deviation of a list of integers, or
@@ -53,11 +84,7 @@ def mean_std_dev(data):
     n = len(data)
     if n == 0:
         return None
-    s = sum(data)
-    s2 = _sum_sq(data)
-    mean = float(s) / float(n)
-    std_dev = math.sqrt(float(n * s2 - s * s) / float(n * n))
-    return (mean, std_dev)
+    return _mean_std_dev_sums(n, sum(data), _sum_sq(data))
 
 
 def corr_coeff(data):
@@ -72,13 +99,148 @@ def corr_coeff(data):
         return None
     xdata = [d[0] for d in data]
     ydata = [d[1] for d in data]
-    sx = sum(xdata)
-    sx2 = _sum_sq(xdata)
-    sy = sum(ydata)
-    sy2 = _sum_sq(ydata)
-    sxy = sum([d[0] * d[1] for d in data])
-    num = n * sxy - sx * sy
-    den2 = (n * sx2 - sx * sx) * (n * sy2 - sy * sy)
-    if den2 == 0:
-        return None
-    return float(num) / math.sqrt(float(den2))
+    return _corr_coeff_sums(n, sum(xdata), _sum_sq(xdata), sum(ydata),
+                            _sum_sq(ydata), sum([d[0] * d[1] for d in data]))
+
+
+def corr_coeff_matrix(columns):
+    """
+    Return a list of lists giving the correlation coefficient of each
+    pair of a list of columns of integers (all of the same length),
+    as computed by corr_coeff for the pairs of values from those two
+    columns.  The sums needed are accumulated in a single pass over
+    the rows, and each pair of columns is only considered once.
+    """
+    ncols = len(columns)
+    # sums[i][j], for i <= j, is [n, sx, sx2, sy, sy2, sxy] for
+    # column i as x and column j as y.
+    sums = [[[0, 0, 0, 0, 0, 0] for j in range(ncols)] for i in range(ncols)]
+    for row in zip(*columns):
+        known = [(i, x) for i, x in enumerate(row) if x is not None]
+        for k, (i, x) in enumerate(known):
+            sums_i = sums[i]
+            for j, y in known[k:]:
+                acc = sums_i[j]
+                acc[0] += 1
+                acc[1] += x
+                acc[2] += x * x
+                acc[3] += y
+                acc[4] += y * y
+                acc[5] += x * y
+    r = [[None for j in range(ncols)] for i in range(ncols)]
+    for i in range(ncols):
+        for j in range(i, ncols):
+            acc = sums[i][j]
+            if acc[0]:
+                r[i][j] = _corr_coeff_sums(*acc)
+                r[j][i] = r[i][j]
+    return r
+
+
+class MeanStdDevAccumulator:
+
+    """
+    A MeanStdDevAccumulator accumulates integer values one at a time
+    to compute their mean and standard deviation as mean_std_dev
+    does.  Values may be removed again, and accumulators for
+    different sets of values may be merged.
+    """
+
+    def __init__(self, data=()):
+        """Initialise a MeanStdDevAccumulator with the given values."""
+        self.n = 0
+        self.s = 0
+        self.s2 = 0
+        for x in data:
+            self.add(x)
+
+    def add(self, x):
+        """Add a value; a value of None is ignored."""
+        if x is not None:
+            self.n += 1
+            self.s += x
+            self.s2 += x * x
+
+    def remove(self, x):
+        """
+        Remove a value previously added; a value of None is ignored.
+        """
+        if x is not None:
+            if self.n == 0:
+                raise ValueError('no values to remove')
+            self.n -= 1
+            self.s -= x
+            self.s2 -= x * x
+
+    def add_sums(self, n, s, s2):
+        """
+        Add values given their number, their sum and the sum of their
+        squares.
+        """
+        self.n += n
+        self.s += s
+        self.s2 += s2
+
+    def merge(self, other):
+        """Add all the values from another MeanStdDevAccumulator."""
+        self.add_sums(other.n, other.s, other.s2)
+
+    def result(self):
+        """
+        Return the mean and standard deviation of the values, or None
+        if there are no values.
+        """
+        if self.n == 0:
+            return None
+        return _mean_std_dev_sums(self.n, self.s, self.s2)
+
+
+class CorrCoeffAccumulator:
+
+    """
+    A CorrCoeffAccumulator accumulates pairs of integer values one at
+    a time to compute their correlation coefficient as corr_coeff
+    does.  Pairs may be removed again, and accumulators for different
+    sets of pairs may be merged.
+    """
+
+    def __init__(self, data=()):
+        """Initialise a CorrCoeffAccumulator with the given pairs."""
+        self.x = MeanStdDevAccumulator()
+        self.y = MeanStdDevAccumulator()
+        self.sxy = 0
+        for x, y in data:
+            self.add(x, y)
+
+    def add(self, x, y):
+        """Add a pair; a pair with either value None is ignored."""
+        if x is not None and y is not None:
+            self.x.add(x)
+            self.y.add(y)
+            self.sxy += x * y
+
+    def remove(self, x, y):
+        """
+        Remove a pair previously added; a pair with either value None
+        is ignored.
+        """
+        if x is not None and y is not None:
+            self.x.remove(x)
+            self.y.remove(y)
+            self.sxy -= x * y
+
+    def merge(self, other):
+        """Add all the pairs from another CorrCoeffAccumulator."""
+        self.x.merge(other.x)
+        self.y.merge(other.y)
+        self.sxy += other.sxy
+
+    def result(self):
+        """
+        Return the correlation coefficient of the pairs, or None if
+        there are no pairs or either variable is constant.
+        """
+        if self.x.n == 0:
+            return None
+        return _corr_coeff_sums(self.x.n, self.x.s, self.x.s2, self.y.s,
+                                self.y.s2, self.sxy)
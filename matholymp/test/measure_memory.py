@@ -0,0 +1,224 @@
+# Measure the memory used by the matholymp data model.
+
+# Copyright 2014-2025 Joseph Samuel Myers.
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see
+# <https://www.gnu.org/licenses/>.
+
+# Additional permission under GNU GPL version 3 section 7:
+
+# If you modify this program, or any covered work, by linking or
+# combining it with the OpenSSL project's OpenSSL library (or a
+# modified version of that library), containing parts covered by the
+# terms of the OpenSSL or SSLeay licenses, the licensors of this
+# program grant you additional permission to convey the resulting
+# work.  Corresponding Source for a non-source form of such a
+# combination shall include the source code for the parts of OpenSSL
+# used as well as that of the covered work.
+
+"""
+Measure the memory and time used in generating a synthetic static
+site, and the memory used by the caches of values computed from the
+data.  Run as:
+
+    python3 -m matholymp.test.measure_memory [--events N]
+        [--countries N] [--contestants N]
+
+from the top directory of the matholymp source tree.  The memory
+retained by the EventGroup after generating the site, the peak memory
+use and the time taken are as reported by tracemalloc (which slows
+down execution), so are best compared between runs on the same
+system, for example before and after a change.  The memory used by
+the caches of computed values is also compared with that which dicts
+mapping attribute names to the same values would use.
+"""
+
+import argparse
+import gc
+import os
+import os.path
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from matholymp.data import _cache_lookup, _not_cached
+from matholymp.fileutil import write_utf8_csv
+from matholymp.sitegen import read_sitegen_config, sitegen_event_group, \
+    SiteGenerator
+
+__all__ = ['make_site', 'cache_sizes', 'measure_site', 'main']
+
+
+def make_site(top_directory, num_events, num_countries, num_contestants):
+    """
+    Create the configuration and data for a static site with the given
+    numbers of events, countries at each event and contestants from
+    each country (with a leader and deputy for each country), using
+    the configuration and page template from the basic test of
+    mo-static-generate.
+    """
+    mod_dir = os.path.dirname(os.path.abspath(__file__))
+    test_in_dir = os.path.join(os.path.dirname(os.path.dirname(mod_dir)),
+                               'test-data', 'mo-static-generate', 'basic',
+                               'in')
+    for f in ('staticsite.cfg', 'page-template'):
+        shutil.copy(os.path.join(test_in_dir, f), top_directory)
+    data_dir = os.path.join(top_directory, 'data')
+    os.mkdir(data_dir)
+    num_problems = 6
+    problem_keys = ['P%d' % (n + 1) for n in range(num_problems)]
+    events = []
+    countries = []
+    people = []
+    for e in range(1, num_events + 1):
+        row = {'Number': str(e), 'Year': str(2000 + e),
+               'Country Number': '1', 'Country': 'Country 1',
+               'Country Name In': 'Country 1', 'City': 'City %d' % e,
+               'Event Type': 'in-person',
+               'Start Date': '%d-04-01' % (2000 + e),
+               'End Date': '%d-04-02' % (2000 + e),
+               'Home Page URL': '', 'Contact Name': '', 'Contact Email': '',
+               'Number of Exams': '2',
+               'Number of Problems': str(num_problems),
+               'Gold Boundary': '30', 'Silver Boundary': '20',
+               'Bronze Boundary': '10'}
+        for k in problem_keys:
+            row[k + ' Max'] = '7'
+        events.append(row)
+        for c in range(1, num_countries + 1):
+            code = 'C%d' % c
+            countries.append({'XMO Number': str(e), 'Country Number': str(c),
+                              'Annual URL': '', 'Code': code,
+                              'Name': 'Country %d' % c, 'Flag URL': '',
+                              'Normal': 'Yes'})
+            roles = (['Leader', 'Deputy Leader']
+                     + ['Contestant %d' % (n + 1)
+                        for n in range(num_contestants)])
+            for n, role in enumerate(roles):
+                pid = (c - 1) * len(roles) + n + 1
+                row = {'XMO Number': str(e), 'Country Number': str(c),
+                       'Person Number': str(pid), 'Annual URL': '',
+                       'Country Name': 'Country %d' % c,
+                       'Country Code': code, 'Primary Role': role,
+                       'Other Roles': '', 'Guide For': '',
+                       'Contestant Code': '', 'Contestant Age': '',
+                       'Given Name': 'Given %d' % pid,
+                       'Family Name': 'Family %d' % pid, 'Total': '',
+                       'Award': '', 'Extra Awards': '', 'Photo URL': ''}
+                for k in problem_keys:
+                    row[k] = ''
+                if role.startswith('Contestant '):
+                    scores = [(pid * (k + 3) + e) % 8
+                              for k in range(num_problems)]
+                    total = sum(scores)
+                    row['Contestant Code'] = '%s%d' % (code, n - 1)
+                    row['Contestant Age'] = str(15 + pid % 4)
+                    for k, s in zip(problem_keys, scores):
+                        row[k] = str(s)
+                    row['Total'] = str(total)
+                    if total >= 30:
+                        row['Award'] = 'Gold Medal'
+                    elif total >= 20:
+                        row['Award'] = 'Silver Medal'
+                    elif total >= 10:
+                        row['Award'] = 'Bronze Medal'
+                people.append(row)
+    write_utf8_csv(os.path.join(data_dir, 'xmos.csv'), events,
+                   list(events[0].keys()))
+    write_utf8_csv(os.path.join(data_dir, 'countries.csv'), countries,
+                   list(countries[0].keys()))
+    write_utf8_csv(os.path.join(data_dir, 'people.csv'), people,
+                   list(people[0].keys()))
+    write_utf8_csv(os.path.join(data_dir, 'papers.csv'), [],
+                   ['XMO Number', 'Day', 'Language', 'Description', 'URL'])
+
+
+def cache_sizes(event_group):
+    """
+    Return the number of objects in an EventGroup, the number of
+    values cached for them, the memory used by their caches and the
+    memory that would be used by dicts mapping attribute names to the
+    values cached.
+    """
+    num_objects = 0
+    num_values = 0
+    cache_size = 0
+    dict_size = 0
+    for obj in event_group._all_objects():
+        num_objects += 1
+        cached = {}
+        for name, index in type(obj)._cache_index.items():
+            value = _cache_lookup(obj, index)
+            if value is not _not_cached:
+                cached[name] = value
+        num_values += len(cached)
+        cache_size += sys.getsizeof(obj._cache)
+        dict_size += sys.getsizeof(cached)
+    return num_objects, num_values, cache_size, dict_size
+
+
+def measure_site(top_directory):
+    """
+    Generate the static site in the given directory, returning a dict
+    of measurements.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    cfg_data = read_sitegen_config(top_directory)
+    event_group = sitegen_event_group(top_directory, cfg_data)
+    SiteGenerator(cfg_data, event_group, top_directory).generate_site()
+    elapsed = time.perf_counter() - start_time
+    gc.collect()
+    with_event_group, peak = tracemalloc.get_traced_memory()
+    num_objects, num_values, cache_size, dict_size = cache_sizes(event_group)
+    del event_group
+    gc.collect()
+    without_event_group = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {'retained': with_event_group - without_event_group,
+            'peak': peak,
+            'time': elapsed,
+            'objects': num_objects,
+            'values': num_values,
+            'cache_size': cache_size,
+            'dict_size': dict_size}
+
+
+def main():
+    """Run the measurements for the command-line arguments given."""
+    parser = argparse.ArgumentParser(description='Measure the memory used '
+                                     'in generating a synthetic static site.')
+    parser.add_argument('--events', type=int, default=20,
+                        help='number of events')
+    parser.add_argument('--countries', type=int, default=60,
+                        help='number of countries at each event')
+    parser.add_argument('--contestants', type=int, default=6,
+                        help='number of contestants from each country')
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        make_site(temp_dir, args.events, args.countries, args.contestants)
+        r = measure_site(temp_dir)
+    print('Memory retained by EventGroup: %.2f MB' % (r['retained'] / 1e6))
+    print('Peak memory: %.2f MB' % (r['peak'] / 1e6))
+    print('Time: %.1f s' % r['time'])
+    print('Objects: %d, cached values: %d' % (r['objects'], r['values']))
+    print('Caches: %.2f MB (as dicts: %.2f MB)'
+          % (r['cache_size'] / 1e6, r['dict_size'] / 1e6))
+
+
+if __name__ == '__main__':
+    main()
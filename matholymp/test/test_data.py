@@ -0,0 +1,583 @@
+# Test the matholymp data model.
+
+# Copyright 2014-2025 Joseph Samuel Myers.
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see
+# <https://www.gnu.org/licenses/>.
+
+# Additional permission under GNU GPL version 3 section 7:
+
+# If you modify this program, or any covered work, by linking or
+# combining it with the OpenSSL project's OpenSSL library (or a
+# modified version of that library), containing parts covered by the
+# terms of the OpenSSL or SSLeay licenses, the licensors of this
+# program grant you additional permission to convey the resulting
+# work.  Corresponding Source for a non-source form of such a
+# combination shall include the source code for the parts of OpenSSL
+# used as well as that of the covered work.
+
+"""
+Tests for matholymp.data.
+"""
+
+import fractions
+import itertools
+import os.path
+import sys
+import tempfile
+import unittest
+
+import matholymp
+from matholymp.data import EventGroup, PersonEvent, _cache_lookup, \
+    _not_cached
+from matholymp.datasource import DataSource
+from matholymp.sitegen import read_sitegen_config, sitegen_event_group
+from matholymp.stats import mean_std_dev
+from matholymp.test.measure_memory import make_site, measure_site
+
+__all__ = ['load_event_group', 'MedalBoundaryTestCase',
+           'CountryStatsCubeTestCase', 'PrefetchTestCase', 'UpdateTestCase',
+           'CacheMemoryTestCase', 'MaterializeTestCase', 'SnapshotTestCase',
+           'RecordAccessesTestCase']
+
+
+def load_event_group(case, **kwargs):
+    """
+    Return an EventGroup for the input data of a test of
+    mo-static-generate.
+    """
+    mod_dir = os.path.dirname(os.path.abspath(__file__))
+    top_dir = os.path.dirname(os.path.dirname(mod_dir))
+    in_dir = os.path.join(top_dir, 'test-data', 'mo-static-generate', case,
+                          'in')
+    return sitegen_event_group(in_dir, read_sitegen_config(in_dir), **kwargs)
+
+
+class MedalBoundaryTestCase(unittest.TestCase):
+
+    """
+    Test medal counts for hypothetical medal boundaries, compared with
+    counting contestants directly.
+    """
+
+    def setUp(self):
+        self.event_group = load_event_group('official')
+
+    def events(self):
+        """Return the events with contestants."""
+        return [e for e in self.event_group.event_list
+                if e.num_contestants]
+
+    @staticmethod
+    def count_medals(people, gold, silver, bronze):
+        """Count the medals for the given people directly."""
+        r = {'Gold Medal': 0, 'Silver Medal': 0, 'Bronze Medal': 0}
+        for p in people:
+            if p.total_score >= gold:
+                r['Gold Medal'] += 1
+            elif p.total_score >= silver:
+                r['Silver Medal'] += 1
+            elif p.total_score >= bronze:
+                r['Bronze Medal'] += 1
+        return r
+
+    def boundaries(self, e):
+        """Return all triples of boundaries in order for an event."""
+        scores = range(e.marks_total + 2)
+        return [(g, s, b) for g, s, b in itertools.product(scores, repeat=3)
+                if g >= s >= b]
+
+    def test_medal_counts(self):
+        """Test Event.medal_counts."""
+        for e in self.events():
+            official = [p for p in e.contestant_list
+                        if p.country.is_official]
+            for g, s, b in self.boundaries(e):
+                self.assertEqual(e.medal_counts(g, s, b),
+                                 self.count_medals(e.contestant_list,
+                                                   g, s, b))
+                self.assertEqual(e.medal_counts(g, s, b, official=True),
+                                 self.count_medals(official, g, s, b))
+            self.assertRaises(ValueError, e.medal_counts, 1, 2, 0)
+
+    def test_country_medal_counts(self):
+        """Test Event.country_medal_counts."""
+        for e in self.events():
+            for g, s, b in self.boundaries(e):
+                counts = e.country_medal_counts(g, s, b)
+                self.assertEqual(set(counts),
+                                 set(e.country_with_contestants_list))
+                for c, c_counts in counts.items():
+                    self.assertEqual(c_counts,
+                                     self.count_medals(c.contestant_list,
+                                                       g, s, b))
+
+    def test_min_medal_boundaries(self):
+        """Test Event.min_medal_boundaries."""
+        for e in self.events():
+            for ratios, fraction, official in (
+                    ((1, 2, 3), fractions.Fraction(1, 2), False),
+                    ((1, 2, 3), fractions.Fraction(1, 2), True),
+                    ((1, 1, 1), fractions.Fraction(2, 3), False),
+                    ((0, 1, 0), 1, False)):
+                if official:
+                    people = [p for p in e.contestant_list
+                              if p.country.is_official]
+                else:
+                    people = e.contestant_list
+                limits = [len(people) * fractions.Fraction(fraction)
+                          * sum(ratios[:n + 1]) / sum(ratios)
+                          for n in range(3)]
+                valid = []
+                for g, s, b in self.boundaries(e):
+                    counts = self.count_medals(people, g, s, b)
+                    cum = itertools.accumulate([counts['Gold Medal'],
+                                                counts['Silver Medal'],
+                                                counts['Bronze Medal']])
+                    if all(c <= limit for c, limit in zip(cum, limits)):
+                        valid.append((g, s, b))
+                bounds = e.min_medal_boundaries(ratios, fraction, official)
+                self.assertEqual(valid,
+                                 [t for t in self.boundaries(e)
+                                  if all(x >= y for x, y in zip(t, bounds))])
+                self.assertIn(bounds, valid)
+            self.assertRaises(ValueError, e.min_medal_boundaries, (1, 2))
+            self.assertRaises(ValueError, e.min_medal_boundaries, (1, -1, 3))
+            self.assertRaises(ValueError, e.min_medal_boundaries, (0, 0, 0))
+
+
+class CountryStatsCubeTestCase(unittest.TestCase):
+
+    """Test CountryStatsCube against statistics computed directly."""
+
+    def test_problem_mean_std_dev(self):
+        """Test CountryStatsCube.problem_mean_std_dev."""
+        event_group = load_event_group('two-years')
+        cube = event_group.country_stats
+        for c in event_group.country_list:
+            for e in event_group.event_list:
+                people = [p for p in e.contestant_list
+                          if p.country.country == c]
+                for n in range(e.num_problems):
+                    self.assertEqual(
+                        cube.problem_mean_std_dev(c, e, n),
+                        mean_std_dev([p.problem_scores[n] for p in people]))
+                self.assertEqual(
+                    cube.problem_mean_std_dev(c, e),
+                    mean_std_dev([s for p in people
+                                  for s in p.problem_scores]))
+        self.assertEqual(
+            cube.problem_mean_std_dev(),
+            mean_std_dev([s for e in event_group.event_list
+                          for p in e.contestant_list
+                          for s in p.problem_scores]))
+
+
+class PrefetchTestCase(unittest.TestCase):
+
+    """Test values fetched from the DataSource along with others."""
+
+    def test_prefetch_stats(self):
+        """Test statistics for prefetched values."""
+        event_group = load_event_group('two-years', collect_stats=True)
+        num_people = 0
+        for e in event_group.event_list:
+            num_people += len(e.person_list)
+        stats = event_group.property_stats()
+        self.assertEqual(stats[('PersonEvent', 'primary_role')][:2],
+                         (0, num_people))
+        for e in event_group.event_list:
+            for p in e.person_list:
+                self.assertEqual(p.primary_role,
+                                 event_group._ds.person_event_get_attr(
+                                     p.person.id, p.country.country.id,
+                                     e.id, 'primary_role'))
+        stats = event_group.property_stats()
+        self.assertEqual(stats[('PersonEvent', 'primary_role')][:2],
+                         (num_people, num_people))
+
+
+class _ChangedScoresDataSource(DataSource):
+
+    """
+    A DataSource passing calls to another DataSource, except for the
+    scores of contestants whose scores have been changed, for whom
+    the awards are not checked.
+    """
+
+    def __init__(self, datasource):
+        self._ds = datasource
+        self.scores = {}
+
+    def event_group_get_attr(self, name):
+        return self._ds.event_group_get_attr(name)
+
+    def event_exists(self, event_id):
+        return self._ds.event_exists(event_id)
+
+    def person_exists(self, person_id):
+        return self._ds.person_exists(person_id)
+
+    def country_exists(self, country_id):
+        return self._ds.country_exists(country_id)
+
+    def person_event_exists(self, person_id, event_id):
+        return self._ds.person_event_exists(person_id, event_id)
+
+    def country_event_exists(self, country_id, event_id):
+        return self._ds.country_event_exists(country_id, event_id)
+
+    def event_get_attr(self, event_id, name):
+        return self._ds.event_get_attr(event_id, name)
+
+    def event_have_attr(self, event_id, name):
+        return self._ds.event_have_attr(event_id, name)
+
+    def person_event_get_attr(self, person_id, country_id, event_id, name):
+        key = (person_id, country_id, event_id)
+        if name == 'problem_scores' and key in self.scores:
+            return list(self.scores[key])
+        return self._ds.person_event_get_attr(person_id, country_id,
+                                              event_id, name)
+
+    def person_event_have_attr(self, person_id, country_id, event_id, name):
+        if (person_id, country_id, event_id) in self.scores:
+            return False
+        return self._ds.person_event_have_attr(person_id, country_id,
+                                               event_id, name)
+
+    def country_event_get_attr(self, country_id, event_id, name):
+        return self._ds.country_event_get_attr(country_id, event_id, name)
+
+    def country_event_have_attr(self, country_id, event_id, name):
+        return self._ds.country_event_have_attr(country_id, event_id, name)
+
+
+class UpdateTestCase(unittest.TestCase):
+
+    """Test discarding cached values after data changes."""
+
+    names = ('given_name', 'problem_scores', 'total_score', 'award', 'rank')
+
+    def values(self, event_group):
+        """Return the values of some attributes of all contestants."""
+        return {(p.person.id, p.event.id): tuple(getattr(p, n)
+                                                 for n in self.names)
+                for e in event_group.event_list
+                for p in e.contestant_list}
+
+    def cached(self, event_group):
+        """Return the set of attributes of contestants with cached values."""
+        return {(p.person.id, p.event.id, n)
+                for e in event_group.event_list
+                for p in e.contestant_list
+                for n in self.names
+                if _cache_lookup(p, p._cache_index[n]) is not _not_cached}
+
+    def test_update_person_event(self):
+        """Test update_person_event."""
+        ds = _ChangedScoresDataSource(load_event_group('two-years')._ds)
+        event_group = EventGroup(ds, track_dependencies=True)
+        self.values(event_group)
+        self.assertRaises(ValueError,
+                          EventGroup(ds).update_person_event, 1, 1, 1,
+                          ['problem_scores'])
+        e = event_group.event_list[-1]
+        p = e.contestant_list[0]
+        key = (p.person.id, p.country.country.id, e.id)
+        num_dependents = None
+        for n in range(3):
+            ds.scores[key] = [0] * e.num_problems
+            ds.scores[key][0] = n
+            event_group.update_person_event(*key, ['problem_scores'])
+            # Values depending on the changed scores are discarded:
+            # the scores, total score and award of that contestant,
+            # and the ranks of all contestants at that event; other
+            # values are kept.
+            expected = {(c.person.id, e.id, 'rank')
+                        for c in e.contestant_list}
+            expected.update({(p.person.id, e.id, name)
+                             for name in ('problem_scores', 'total_score',
+                                          'award')})
+            cached = self.cached(event_group)
+            self.assertEqual(cached & expected, set())
+            # Dependencies are only recorded for cached values.
+            tracker = event_group._tracker
+            for deps in tracker._dependents.values():
+                for obj, name in deps:
+                    self.assertIsNot(
+                        _cache_lookup(obj, obj._cache_index[name]),
+                        _not_cached)
+            self.assertEqual(
+                cached | expected,
+                {(c.person.id, c.event.id, name)
+                 for f in event_group.event_list
+                 for c in f.contestant_list
+                 for name in self.names})
+            self.assertEqual(self.values(event_group),
+                             self.values(EventGroup(ds)))
+            self.assertEqual(p.total_score, n)
+            # Records of dependencies are replaced, not accumulated,
+            # when values are recomputed.
+            self.assertEqual(tracker._dependents.keys(),
+                             {k for deps in tracker._prerequisites.values()
+                              for k in deps})
+            if num_dependents is None:
+                num_dependents = sum(len(v) for v in
+                                     tracker._dependents.values())
+            else:
+                self.assertEqual(sum(len(v) for v in
+                                     tracker._dependents.values()),
+                                 num_dependents)
+
+
+class CacheMemoryTestCase(unittest.TestCase):
+
+    """Test the memory used by caches of attribute values."""
+
+    def test_cache_size(self):
+        """Test caches only use memory for the values cached."""
+        event_group = load_event_group('two-years')
+        people = [p for e in event_group.event_list for p in e.person_list]
+        # Only the prefetched values are cached for each person.
+        prefetch_len = 1 + max(PersonEvent._cache_index[name]
+                               for name in PersonEvent._prefetch_names)
+        full_size = sys.getsizeof([_not_cached]
+                                  * len(PersonEvent._cache_names))
+        for p in people:
+            self.assertEqual(len(p._cache), prefetch_len)
+        self.assertLess(sum(sys.getsizeof(p._cache) for p in people),
+                        len(people) * full_size / 3)
+        for p in people:
+            p.sort_key
+            self.assertEqual(len(p._cache),
+                             1 + PersonEvent._cache_index['sort_key'])
+            self.assertIsNot(_cache_lookup(
+                p, PersonEvent._cache_index['given_name']), _not_cached)
+
+    def test_measure_memory(self):
+        """Test the memory measurements of measure_memory."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            make_site(temp_dir, 2, 3, 2)
+            r = measure_site(temp_dir)
+        # An EventGroup, 2 events, 12 people, 3 countries, 24
+        # participations by people and 6 by countries.
+        self.assertEqual(r['objects'], 48)
+        self.assertGreater(r['retained'], 0)
+        self.assertGreaterEqual(r['peak'], r['retained'])
+        self.assertLess(r['cache_size'], r['dict_size'])
+
+
+class MaterializeTestCase(unittest.TestCase):
+
+    """Test EventGroup.materialize."""
+
+    names = ('given_name', 'name', 'primary_role', 'problem_scores',
+             'total_score', 'award', 'rank', 'sort_key')
+
+    def values(self, event_group):
+        """Return the values of some attributes of all contestants."""
+        return {(p.person.id, p.event.id): tuple(getattr(p, n)
+                                                 for n in self.names)
+                for e in event_group.event_list
+                for p in e.contestant_list}
+
+    def test_materialize(self):
+        """Test accessing attributes after materialize."""
+        expected = self.values(load_event_group('two-years'))
+        event_group = load_event_group('two-years')
+        event_group.materialize()
+        self.assertTrue(event_group.materialized)
+        caches = [p._cache for p in event_group.person_event_list]
+        self.assertEqual(self.values(event_group), expected)
+        # Registration-only attributes, not computed by materialize,
+        # give the same errors as before materialize.
+        p = event_group.person_event_list[0]
+        self.assertRaises(KeyError, getattr, p, 'diet')
+        self.assertRaises(ValueError, event_group.update_event_group,
+                          ['short_name'])
+        self.assertRaises(ValueError, event_group.materialize)
+        self.assertRaises(ValueError,
+                          load_event_group('two-years').materialize,
+                          {'PersonEvent': ['no_such_attribute']})
+        self.assertEqual([p._cache for p in event_group.person_event_list],
+                         caches)
+
+    def test_materialize_props(self):
+        """Test accessing attributes not computed by materialize."""
+        expected = self.values(load_event_group('two-years'))
+        event_group = load_event_group('two-years', collect_stats=True)
+        event_group.materialize({'PersonEvent': ['given_name']})
+        self.assertEqual(self.values(event_group), expected)
+        stats = event_group.property_stats()
+        self.assertEqual(self.values(event_group), expected)
+        # Values not computed by materialize are computed again on
+        # each access, rather than being cached.
+        new_stats = event_group.property_stats()
+        key = ('PersonEvent', 'total_score')
+        self.assertGreater(new_stats[key][1], stats[key][1])
+        key = ('PersonEvent', 'given_name')
+        self.assertEqual(new_stats[key][1], stats[key][1])
+        self.assertGreater(new_stats[key][0], stats[key][0])
+
+    def test_materialize_error(self):
+        """Test materialize with values that cannot be computed."""
+        expected = self.values(load_event_group('duplicate-code'))
+        event_group = load_event_group('duplicate-code')
+        event_group.materialize()
+        # Errors in computing values are only raised when those
+        # values are accessed, as without materialize.
+        e = event_group.event_list[0]
+        self.assertRaisesRegex(ValueError, 'duplicate contestant code DEF1',
+                               getattr, e, 'contestant_map')
+        self.assertEqual(self.values(event_group), expected)
+
+
+class SnapshotTestCase(unittest.TestCase):
+
+    """Test EventGroup snapshots used by sitegen_event_group."""
+
+    names = MaterializeTestCase.names
+
+    values = MaterializeTestCase.values
+
+    def setUp(self):
+        self.temp_dir_td = tempfile.TemporaryDirectory()
+        self.snapshot_file = os.path.join(self.temp_dir_td.name, 'snapshot')
+
+    def tearDown(self):
+        self.temp_dir_td.cleanup()
+
+    def test_snapshot(self):
+        """Test writing and reading a snapshot."""
+        expected = self.values(load_event_group('two-years'))
+        event_group = load_event_group('two-years',
+                                       snapshot_file=self.snapshot_file)
+        self.assertTrue(os.access(self.snapshot_file, os.F_OK))
+        # Writing the snapshot does not make the EventGroup read-only.
+        self.assertFalse(event_group.materialized)
+        p = event_group.person_event_list[0]
+        index = PersonEvent._cache_index['diet']
+        self.assertRaises(KeyError, getattr, p, 'diet')
+        self.assertIs(_cache_lookup(p, index), _not_cached)
+        self.assertEqual(self.values(event_group), expected)
+        event_group = load_event_group('two-years',
+                                       snapshot_file=self.snapshot_file)
+        self.assertTrue(event_group.materialized)
+        self.assertEqual(self.values(event_group), expected)
+        p = event_group.person_event_list[0]
+        self.assertRaises(ValueError, getattr, p, 'diet')
+
+    def test_snapshot_corrupt(self):
+        """Test a corrupt snapshot is regenerated."""
+        expected = self.values(load_event_group('two-years'))
+        load_event_group('two-years', snapshot_file=self.snapshot_file)
+        with open(self.snapshot_file, 'rb') as snapshot_file:
+            contents = snapshot_file.read()
+        for bad in (b'', b'not a pickle', contents[:len(contents) // 2]):
+            with open(self.snapshot_file, 'wb') as snapshot_file:
+                snapshot_file.write(bad)
+            event_group = load_event_group('two-years',
+                                           snapshot_file=self.snapshot_file)
+            self.assertFalse(event_group.materialized)
+            self.assertEqual(self.values(event_group), expected)
+            with open(self.snapshot_file, 'rb') as snapshot_file:
+                self.assertEqual(snapshot_file.read(), contents)
+
+    def test_snapshot_version(self):
+        """Test a snapshot from another matholymp version is not used."""
+        load_event_group('two-years', snapshot_file=self.snapshot_file)
+        old_version = matholymp.__version__
+        try:
+            matholymp.__version__ = old_version + '.other'
+            event_group = load_event_group('two-years',
+                                           snapshot_file=self.snapshot_file)
+            self.assertFalse(event_group.materialized)
+            event_group = load_event_group('two-years',
+                                           snapshot_file=self.snapshot_file)
+            self.assertTrue(event_group.materialized)
+        finally:
+            matholymp.__version__ = old_version
+        event_group = load_event_group('two-years',
+                                       snapshot_file=self.snapshot_file)
+        self.assertFalse(event_group.materialized)
+
+
+class RecordAccessesTestCase(unittest.TestCase):
+
+    """Test recording accesses to the data and digests of values."""
+
+    def test_take_accesses(self):
+        """Test the accesses recorded."""
+        event_group = load_event_group('two-years')
+        event_group.record_accesses()
+        self.assertEqual(event_group.take_accesses(), [])
+        e = event_group.event_map[2]
+        self.assertEqual(event_group.take_accesses(),
+                         [(('EventGroup',), ('event_map', 2))])
+        # Accesses from methods are recorded, but not those made in
+        # computing cached values.
+        ranks = e.rank_contestants()
+        accesses = event_group.take_accesses()
+        self.assertEqual(accesses[0], (('Event', 2), '_contestants_by_score'))
+        self.assertEqual(
+            set(accesses[1:]),
+            {(('PersonEvent', p.person.id, p.country.country.id, 2),
+              'total_score')
+             for p, rank in ranks})
+        self.assertEqual(len(e.person_map), len(e.person_map))
+        self.assertEqual(event_group.take_accesses(),
+                         [(('Event', 2), ('person_map',))])
+        e.country_map.get(12345)
+        self.assertEqual(event_group.take_accesses(),
+                         [(('Event', 2), ('country_map', 12345))])
+        event_group.record_accesses(False)
+        self.assertRaises(ValueError, event_group.take_accesses)
+
+    def test_attribute_digest(self):
+        """Test attribute_digest."""
+        ds = _ChangedScoresDataSource(load_event_group('two-years')._ds)
+        event_group = EventGroup(ds)
+        e = event_group.event_list[-1]
+        p = e.contestant_list[0]
+        key = (p.person.id, p.country.country.id, e.id)
+        names = [(('EventGroup',), 'country_stats'),
+                 (('EventGroup',), ('event_map', e.id)),
+                 (('EventGroup',), ('event_map', 12345)),
+                 (('Event', e.id), ('person_map',)),
+                 (('Event', e.id), 'paper_list'),
+                 (('PersonEvent',) + key, 'total_score'),
+                 (('Event', e.id), '_contestants_by_score')]
+        digests = [event_group.attribute_digest(*name) for name in names]
+        self.assertNotIn(None, digests)
+        self.assertEqual(digests,
+                         [EventGroup(ds).attribute_digest(*name)
+                          for name in names])
+        ds.scores[key] = [7] * e.num_problems
+        new_digests = [EventGroup(ds).attribute_digest(*name)
+                       for name in names]
+        self.assertNotEqual(new_digests[0], digests[0])
+        self.assertEqual(new_digests[1:5], digests[1:5])
+        self.assertNotEqual(new_digests[5], digests[5])
+        self.assertNotEqual(new_digests[6], digests[6])
+        # Attributes with no value for an object, and objects that do
+        # not exist, have no digest.
+        leader = [p for p in e.person_list if not p.is_contestant][0]
+        leader_key = ('PersonEvent', leader.person.id,
+                      leader.country.country.id, e.id)
+        self.assertIsNone(event_group.attribute_digest(leader_key,
+                                                       'total_score'))
+        self.assertIsNone(event_group.attribute_digest(leader_key, 'diet'))
+        self.assertIsNone(event_group.attribute_digest(('Event', 12345),
+                                                       'short_name'))
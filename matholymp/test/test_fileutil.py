@@ -0,0 +1,289 @@
+# Test matholymp file access support.
+
+# Copyright 2014-2025 Joseph Samuel Myers.
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see
+# <https://www.gnu.org/licenses/>.
+
+# Additional permission under GNU GPL version 3 section 7:
+
+# If you modify this program, or any covered work, by linking or
+# combining it with the OpenSSL project's OpenSSL library (or a
+# modified version of that library), containing parts covered by the
+# terms of the OpenSSL or SSLeay licenses, the licensors of this
+# program grant you additional permission to convey the resulting
+# work.  Corresponding Source for a non-source form of such a
+# combination shall include the source code for the parts of OpenSSL
+# used as well as that of the covered work.
+
+"""
+Tests for matholymp.fileutil.
+"""
+
+import copy
+import os
+import os.path
+import pickle
+import tempfile
+import threading
+import unittest
+
+from matholymp.fileutil import read_utf8_csv, read_utf8_csv_cached, \
+    read_cache_file, write_cache_file, write_utf8_csv, OutputManifest
+
+__all__ = ['CacheFileTestCase', 'OutputManifestTestCase']
+
+
+class CacheFileTestCase(unittest.TestCase):
+
+    """Test cache files and cached reading of CSV files."""
+
+    def setUp(self):
+        self.temp_dir_td = tempfile.TemporaryDirectory()
+        self.temp_dir = self.temp_dir_td.name
+        self.cache_file = os.path.join(self.temp_dir, 'cache')
+        self.csv_files = [os.path.join(self.temp_dir, 'a.csv'),
+                          os.path.join(self.temp_dir, 'b.csv')]
+        self.write_csv(0, 'x', '1')
+        self.write_csv(1, 'y', '2')
+
+    def tearDown(self):
+        self.temp_dir_td.cleanup()
+
+    def write_csv(self, n, key, value, times=None):
+        """Write one of the CSV files, optionally setting its times."""
+        write_utf8_csv(self.csv_files[n], [{key: value}], [key])
+        if times is not None:
+            os.utime(self.csv_files[n], ns=times)
+
+    def read_cached(self):
+        """Read the CSV files using the cache."""
+        return read_utf8_csv_cached(self.csv_files, self.cache_file)
+
+    def expected(self):
+        """Return the current contents of the CSV files."""
+        return [read_utf8_csv(f) for f in self.csv_files]
+
+    def test_csv_cached(self):
+        """Test that cached contents are used for unchanged files."""
+        self.assertEqual(self.read_cached(), self.expected())
+        self.assertTrue(os.access(self.cache_file, os.F_OK))
+        # A change that keeps the size and modification time is not
+        # detected, showing that the cached contents are used.
+        st = os.stat(self.csv_files[0])
+        self.write_csv(0, 'x', '3', (st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(self.read_cached(),
+                         [[{'x': '1'}], [{'y': '2'}]])
+
+    def test_csv_cached_changed(self):
+        """Test that changed files are read again."""
+        self.read_cached()
+        st = os.stat(self.csv_files[1])
+        # Same size, different modification time.
+        self.write_csv(1, 'y', '3',
+                       (st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.read_cached(), self.expected())
+        # Different size, same modification time.
+        st = os.stat(self.csv_files[0])
+        self.write_csv(0, 'x', '10', (st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(self.read_cached(), self.expected())
+        self.assertEqual(self.expected(), [[{'x': '10'}], [{'y': '3'}]])
+        # Only the modification time changed.
+        st = os.stat(self.csv_files[0])
+        os.utime(self.csv_files[0],
+                 ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.read_cached(), self.expected())
+
+    def test_csv_cached_corrupt(self):
+        """Test that a corrupt or mismatched cache is ignored."""
+        with open(self.cache_file, 'wb') as f:
+            f.write(b'not a cache')
+        self.assertEqual(self.read_cached(), self.expected())
+        self.assertEqual(read_utf8_csv_cached(self.csv_files[:1],
+                                              self.cache_file),
+                         self.expected()[:1])
+        self.assertEqual(self.read_cached(), self.expected())
+
+    def test_cache_file_version(self):
+        """Test that a cache for a different version is ignored."""
+        write_cache_file(self.cache_file, {'version': 1, 'data': 2})
+        self.assertEqual(read_cache_file(self.cache_file, 1),
+                         {'version': 1, 'data': 2})
+        self.assertIsNone(read_cache_file(self.cache_file, 2))
+        self.assertIsNone(read_cache_file(self.cache_file + 'x', 1))
+
+    def test_cache_file_threads(self):
+        """Test writing the same cache file from several threads."""
+        data = [str(i) for i in range(200000)]
+
+        bad = []
+
+        def write(n):
+            for i in range(5):
+                write_cache_file(self.cache_file,
+                                 {'version': 1, 'n': n, 'data': data})
+                cache = read_cache_file(self.cache_file, 1)
+                if cache is None or cache['data'] != data:
+                    bad.append(n)
+
+        threads = [threading.Thread(target=write, args=(n,))
+                   for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(bad, [])
+        cache = read_cache_file(self.cache_file, 1)
+        self.assertIsNotNone(cache)
+        self.assertEqual(cache['data'], data)
+        self.assertEqual(sorted(os.listdir(self.temp_dir)),
+                         ['a.csv', 'b.csv', 'cache'])
+
+
+class OutputManifestTestCase(unittest.TestCase):
+
+    """Test OutputManifest."""
+
+    def setUp(self):
+        self.temp_dir_td = tempfile.TemporaryDirectory()
+        self.temp_dir = self.temp_dir_td.name
+        self.out_dir = os.path.join(self.temp_dir, 'out')
+        self.manifest_file = os.path.join(self.temp_dir, 'manifest')
+        self.files = [os.path.join(self.out_dir, 'a'),
+                      os.path.join(self.out_dir, 'sub', 'b')]
+
+    def tearDown(self):
+        self.temp_dir_td.cleanup()
+
+    def manifest(self):
+        """Return an OutputManifest loaded from the manifest file."""
+        return OutputManifest(self.manifest_file, self.out_dir)
+
+    def write_externally(self, n, contents, times=None):
+        """
+        Write one of the files other than through an OutputManifest,
+        optionally setting its times.
+        """
+        with open(self.files[n], 'wb') as out_file:
+            out_file.write(contents)
+        if times is not None:
+            os.utime(self.files[n], ns=times)
+
+    def contents(self, n):
+        """Return the contents of one of the files."""
+        with open(self.files[n], 'rb') as in_file:
+            return in_file.read()
+
+    def write_initial(self):
+        """Write the files and save the manifest."""
+        manifest = self.manifest()
+        manifest.write_bytes(b'abc', self.files[0])
+        manifest.write_bytes(b'def', self.files[1])
+        self.assertEqual(manifest.changes(), [('a', 'created'),
+                                              ('sub/b', 'created')])
+        manifest.save()
+
+    def test_unchanged_not_read(self):
+        """Test that unchanged files are not read."""
+        self.write_initial()
+        # A change that keeps the size and modification time is not
+        # detected, showing that the existing file is not read.
+        st = os.stat(self.files[0])
+        self.write_externally(0, b'xyz', (st.st_atime_ns, st.st_mtime_ns))
+        manifest = self.manifest()
+        manifest.write_bytes(b'abc', self.files[0])
+        manifest.write_bytes(b'def', self.files[1])
+        self.assertEqual(self.contents(0), b'xyz')
+        self.assertEqual(manifest.changes(), [])
+
+    def test_external_changes(self):
+        """Test that files changed other than by the manifest are detected."""
+        self.write_initial()
+        # Same size, different modification time.
+        st = os.stat(self.files[0])
+        self.write_externally(0, b'xyz',
+                              (st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        # Different size, same modification time.
+        st = os.stat(self.files[1])
+        self.write_externally(1, b'defg', (st.st_atime_ns, st.st_mtime_ns))
+        manifest = self.manifest()
+        manifest.write_bytes(b'abc', self.files[0])
+        manifest.write_bytes(b'def', self.files[1])
+        self.assertEqual(self.contents(0), b'abc')
+        self.assertEqual(self.contents(1), b'def')
+        self.assertEqual(manifest.changes(), [('a', 'modified'),
+                                              ('sub/b', 'modified')])
+        # A file whose modification time changed, with the same
+        # contents, is read but not modified.
+        manifest.save()
+        st = os.stat(self.files[0])
+        os.utime(self.files[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        manifest = self.manifest()
+        manifest.write_bytes(b'abc', self.files[0])
+        self.assertEqual(manifest.changes(), [])
+
+    def test_updates(self):
+        """Test passing changes between manifests, as with --jobs."""
+        self.write_initial()
+        manifest = self.manifest()
+        # The manifest in a forked worker process starts as a copy of
+        # that in the main process, and its updates are pickled to be
+        # returned to the main process.
+        worker_manifest = copy.deepcopy(manifest)
+        worker_manifest.write_bytes(b'abc', self.files[0])
+        worker_manifest.write_bytes(b'ghi', self.files[1])
+        new_file = os.path.join(self.out_dir, 'c')
+        worker_manifest.write_bytes(b'jkl', new_file)
+        updates = pickle.loads(pickle.dumps(worker_manifest.take_updates()))
+        self.assertEqual(worker_manifest.take_updates(), {})
+        manifest.apply_updates(updates)
+        self.assertEqual(manifest.changes(), [('c', 'created'),
+                                              ('sub/b', 'modified')])
+        self.assertEqual(manifest.changed_files(), ['c', 'sub/b'])
+        manifest.save()
+        # The entries for the files written by the worker are saved,
+        # so those files are not read again.
+        st = os.stat(self.files[1])
+        self.write_externally(1, b'xyz', (st.st_atime_ns, st.st_mtime_ns))
+        manifest = self.manifest()
+        manifest.write_bytes(b'ghi', self.files[1])
+        manifest.write_bytes(b'jkl', new_file)
+        self.assertEqual(self.contents(1), b'xyz')
+        self.assertEqual(manifest.changes(), [])
+
+    def test_remove_file(self):
+        """Test recording removed files."""
+        self.write_initial()
+        manifest = self.manifest()
+        worker_manifest = copy.deepcopy(manifest)
+        worker_manifest.remove_file(self.files[1])
+        self.assertFalse(os.access(self.files[1], os.F_OK))
+        # Removing a file not present, and not in the manifest, is
+        # not recorded.
+        worker_manifest.remove_file(os.path.join(self.out_dir, 'c'))
+        # A file created and then removed is not listed.
+        new_file = os.path.join(self.out_dir, 'd')
+        worker_manifest.write_bytes(b'jkl', new_file)
+        worker_manifest.remove_file(new_file)
+        manifest.apply_updates(worker_manifest.take_updates())
+        self.assertEqual(manifest.changes(), [('sub/b', 'deleted')])
+        self.assertEqual(manifest.changed_files(), [])
+        # A file removed and then written again is modified.
+        manifest.write_bytes(b'def', self.files[1])
+        self.assertEqual(manifest.changes(), [('sub/b', 'modified')])
+        manifest.remove_file(self.files[1])
+        manifest.save()
+        manifest = self.manifest()
+        manifest.remove_file(self.files[1])
+        self.assertEqual(manifest.changes(), [])
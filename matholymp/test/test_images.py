@@ -0,0 +1,136 @@
+# Test matholymp image processing support.
+
+# Copyright 2014-2025 Joseph Samuel Myers.
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see
+# <https://www.gnu.org/licenses/>.
+
+# Additional permission under GNU GPL version 3 section 7:
+
+# If you modify this program, or any covered work, by linking or
+# combining it with the OpenSSL project's OpenSSL library (or a
+# modified version of that library), containing parts covered by the
+# terms of the OpenSSL or SSLeay licenses, the licensors of this
+# program grant you additional permission to convey the resulting
+# work.  Corresponding Source for a non-source form of such a
+# combination shall include the source code for the parts of OpenSSL
+# used as well as that of the covered work.
+
+"""
+Tests for matholymp.images.
+"""
+
+import io
+import os.path
+import tempfile
+import unittest
+
+from PIL import Image, ImageChops, ImageStat
+
+from matholymp.images import scale_image_file_to_widths
+
+__all__ = ['ScaleImageTestCase']
+
+
+class ScaleImageTestCase(unittest.TestCase):
+
+    """Test scale_image_file_to_widths."""
+
+    def setUp(self):
+        self.temp_dir_td = tempfile.TemporaryDirectory()
+        self.temp_dir = self.temp_dir_td.name
+
+    def tearDown(self):
+        self.temp_dir_td.cleanup()
+
+    def save_image(self, image, name):
+        """Save an image in the temporary directory, returning its name."""
+        file_name = os.path.join(self.temp_dir, name)
+        image.save(file_name)
+        return file_name
+
+    def gradient_image(self, size_xy):
+        """Return an RGB image with smoothly varying colours."""
+        red = Image.linear_gradient('L').resize(size_xy)
+        green = red.transpose(Image.ROTATE_90).resize(size_xy)
+        blue = Image.new('L', size_xy, 128)
+        return Image.merge('RGB', (red, green, blue))
+
+    def assert_scaled(self, file_name, widths, image_format):
+        """
+        Check the results of scale_image_file_to_widths for an image
+        file against scaling the fully decoded image, composited on a
+        white background, returning the scaled images.
+        """
+        with Image.open(file_name) as image:
+            full = image.convert('RGBA')
+        background = Image.new('RGBA', full.size, (255, 255, 255, 255))
+        full = Image.alpha_composite(background, full).convert('RGB')
+        results = scale_image_file_to_widths(file_name, widths, image_format)
+        self.assertEqual(len(results), len(widths))
+        images = []
+        for width, result in zip(widths, results):
+            scaled = Image.open(io.BytesIO(result))
+            self.assertEqual(scaled.format, image_format)
+            self.assertEqual(scaled.mode, 'RGB')
+            height = round(full.size[1] * width / full.size[0])
+            self.assertEqual(scaled.size, (width, height))
+            expected = full.resize(scaled.size, Image.LANCZOS)
+            diff = ImageStat.Stat(ImageChops.difference(scaled.convert('RGB'),
+                                                        expected))
+            for mean in diff.mean:
+                self.assertLess(mean, 4)
+            images.append(scaled)
+        return images
+
+    def test_png(self):
+        """Test scaling a PNG image, with alpha channel removed."""
+        image = self.gradient_image((300, 200)).convert('RGBA')
+        image.putalpha(Image.new('L', image.size, 255))
+        transparent = Image.new('RGBA', (300, 100), (0, 0, 0, 0))
+        image.paste(transparent, (0, 100))
+        file_name = self.save_image(image, 'image.png')
+        for image_format in ('PNG', 'JPEG'):
+            for scaled in self.assert_scaled(file_name, [150, 30],
+                                             image_format):
+                # The transparent half becomes white.
+                width, height = scaled.size
+                self.assertEqual(scaled.getpixel((width // 2,
+                                                  height * 7 // 8)),
+                                 (255, 255, 255))
+
+    def test_jpeg_draft(self):
+        """Test scaling a JPEG image decoded at reduced size."""
+        # The image size is not a multiple of the reduction in size
+        # when decoding, so the region of the reduced image to scale
+        # is not a whole number of pixels.
+        file_name = self.save_image(self.gradient_image((1203, 901)),
+                                    'image.jpg')
+        with Image.open(file_name) as image:
+            draft = image.draft(None, (300, 224))
+            self.assertIsNotNone(draft)
+            self.assertEqual(image.size, (301, 226))
+            box = draft[1]
+            self.assertNotEqual(box[2:], image.size)
+            expected = image.convert('RGB').resize((150, 112), Image.LANCZOS,
+                                                   box=box)
+        scaled = self.assert_scaled(file_name, [150, 100], 'PNG')
+        self.assertEqual(scaled[0].tobytes(), expected.tobytes())
+        self.assert_scaled(file_name, [150, 100], 'JPEG')
+
+    def test_jpeg_large_width(self):
+        """Test scaling a JPEG image to a width too large for draft."""
+        file_name = self.save_image(self.gradient_image((640, 480)),
+                                    'image.jpg')
+        self.assert_scaled(file_name, [400, 64], 'JPEG')
@@ -0,0 +1,170 @@
+# Test matholymp ProfilingDataSource.
+
+# Copyright 2014-2025 Joseph Samuel Myers.
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see
+# <https://www.gnu.org/licenses/>.
+
+# Additional permission under GNU GPL version 3 section 7:
+
+# If you modify this program, or any covered work, by linking or
+# combining it with the OpenSSL project's OpenSSL library (or a
+# modified version of that library), containing parts covered by the
+# terms of the OpenSSL or SSLeay licenses, the licensors of this
+# program grant you additional permission to convey the resulting
+# work.  Corresponding Source for a non-source form of such a
+# combination shall include the source code for the parts of OpenSSL
+# used as well as that of the covered work.
+
+"""
+Tests for matholymp.profilesource.
+"""
+
+import gc
+import os.path
+import tempfile
+import unittest
+import unittest.mock
+
+from matholymp.datasource import DataSource
+from matholymp.profilesource import ProfilingDataSource
+from matholymp.test.test_data import load_event_group
+
+__all__ = ['ProfilingDataSourceTestCase']
+
+
+class _TestDataSource(DataSource):
+
+    """A DataSource with some attributes of events and countries."""
+
+    def event_exists(self, event_id):
+        return event_id == 1
+
+    def event_get_attr(self, event_id, name):
+        if name == 'year':
+            return '2014'
+        raise KeyError(name)
+
+    def country_event_get_attr(self, country_id, event_id, name):
+        return 'Country %d' % country_id
+
+
+class ProfilingDataSourceTestCase(unittest.TestCase):
+
+    """Test ProfilingDataSource."""
+
+    def profile_calls(self, ds, calls):
+        """
+        Make calls to a ProfilingDataSource, given as tuples of the
+        time each takes, the method name and its arguments, returning
+        the results (or exceptions raised).
+        """
+        times = []
+        for call in calls:
+            times.extend([0.0, call[0]])
+        results = []
+        with unittest.mock.patch('time.perf_counter', side_effect=times):
+            for call in calls:
+                try:
+                    results.append(getattr(ds, call[1])(*call[2:]))
+                except KeyError as exc:
+                    results.append(exc)
+        return results
+
+    def report_lines(self, ds):
+        """Return the lines of a report, split into fields."""
+        return [line.split() for line in ds.report().splitlines()]
+
+    def test_report(self):
+        """Test counts, repeats, times and histograms in the report."""
+        ds = ProfilingDataSource(_TestDataSource())
+        results = self.profile_calls(
+            ds,
+            [(2e-7, 'event_get_attr', 1, 'year'),
+             (5e-5, 'event_get_attr', 1, 'year'),
+             (0.5, 'event_get_attr', 2, 'year'),
+             (2e-3, 'event_exists', 1),
+             (3e-3, 'event_exists', 2),
+             (0.25, 'event_get_attr', 1, 'host_city'),
+             (0.25, 'event_get_attr', 1, 'host_city')])
+        self.assertEqual(results[:5], ['2014', '2014', '2014', True, False])
+        self.assertIsInstance(results[5], KeyError)
+        self.assertIsInstance(results[6], KeyError)
+        self.assertEqual(
+            self.report_lines(ds),
+            [['Count', 'Repeats', 'Time', '<1us', '<10us', '<100us', '<1ms',
+              '<10ms', '<100ms', '>=100ms', 'Call'],
+             ['3', '1', '0.500050', '1', '0', '1', '0', '0', '0', '1',
+              'event_get_attr(year)'],
+             # Calls raising exceptions are recorded.
+             ['2', '1', '0.500000', '0', '0', '0', '0', '0', '0', '2',
+              'event_get_attr(host_city)'],
+             ['2', '0', '0.005000', '0', '0', '0', '0', '2', '0', '0',
+              'event_exists']])
+
+    def test_bulk_repeats(self):
+        """Test repeated calls with list arguments are counted."""
+        ds = ProfilingDataSource(_TestDataSource())
+        self.profile_calls(
+            ds,
+            [(1e-3, 'country_event_get_attrs', 1, [1, 2], ['name']),
+             (1e-3, 'country_event_get_attrs', 1, [1, 2], ['name']),
+             (1e-3, 'country_event_get_attrs', 1, [2, 1], ['name'])])
+        self.assertEqual(self.report_lines(ds)[1],
+                         ['3', '1', '0.003000', '0', '0', '0', '0', '3',
+                          '0', '0', 'country_event_get_attrs(name)'])
+
+    def test_report_file(self):
+        """Test the report appended to a file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report_file = os.path.join(temp_dir, 'report')
+            with open(report_file, 'w', encoding='utf-8') as out_file:
+                out_file.write('Earlier report\n')
+            ds = ProfilingDataSource(_TestDataSource(), report_file)
+            ds.event_exists(1)
+            report = ds.report()
+            del ds
+            gc.collect()
+            with open(report_file, 'r', encoding='utf-8') as in_file:
+                self.assertEqual(in_file.read(), 'Earlier report\n' + report)
+
+    def test_event_group(self):
+        """Test profiling the data accessed through an EventGroup."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report_file = os.path.join(temp_dir, 'report')
+            event_group = load_event_group('two-years',
+                                           profile_file=report_file)
+            self.assertIsInstance(event_group._ds, ProfilingDataSource)
+            for p in event_group.person_event_list:
+                p.given_name
+            for p in event_group.person_event_list:
+                p.given_name
+            # The attribute is missing from the data, so is looked up
+            # again each time.
+            for n in range(3):
+                self.assertRaises(KeyError, getattr, p, 'diet')
+            del event_group, p
+            gc.collect()
+            with open(report_file, 'r', encoding='utf-8') as in_file:
+                calls = {line.split()[-1]: line.split()[:2]
+                         for line in in_file.read().splitlines()[1:]}
+            # Cached values are only fetched once (in bulk for each
+            # event, for given_name).
+            self.assertEqual(calls['event_group_get_attr(_event_ids)'],
+                             ['1', '0'])
+            self.assertEqual(calls['person_event_get_attrs(primary_role,'
+                                   'other_roles,given_name,family_name)'],
+                             ['2', '0'])
+            self.assertEqual(calls['person_event_get_attr(diet)'],
+                             ['3', '2'])
@@ -0,0 +1,119 @@
+# Test matholymp statistics support.
+
+# Copyright 2014-2025 Joseph Samuel Myers.
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see
+# <https://www.gnu.org/licenses/>.
+
+# Additional permission under GNU GPL version 3 section 7:
+
+# If you modify this program, or any covered work, by linking or
+# combining it with the OpenSSL project's OpenSSL library (or a
+# modified version of that library), containing parts covered by the
+# terms of the OpenSSL or SSLeay licenses, the licensors of this
+# program grant you additional permission to convey the resulting
+# work.  Corresponding Source for a non-source form of such a
+# combination shall include the source code for the parts of OpenSSL
+# used as well as that of the covered work.
+
+"""
+Tests for matholymp.stats.
+"""
+
+import unittest
+
+from matholymp.stats import mean_std_dev, corr_coeff, \
+    MeanStdDevAccumulator, CorrCoeffAccumulator
+from matholymp.test.test_data import load_event_group
+
+__all__ = ['AccumulatorTestCase']
+
+
+class AccumulatorTestCase(unittest.TestCase):
+
+    """
+    Test the statistics accumulators against the functions computing
+    the same statistics for whole lists, using the scores from test
+    data for mo-static-generate.
+    """
+
+    def setUp(self):
+        self.columns = []
+        self.pairs = []
+        for case in ('two-years', 'future-partial', 'max-marks-vary'):
+            for e in load_event_group(case).event_list:
+                rows = [p.problem_scores for p in e.contestant_list]
+                totals = [p.total_score for p in e.contestant_list]
+                for n in range(e.num_problems):
+                    col = [row[n] for row in rows]
+                    self.columns.append(col)
+                    self.pairs.append(list(zip(col, totals)))
+                self.columns.append(totals)
+        # Unknown scores are ignored.
+        self.columns.extend([[None] + col for col in self.columns])
+        self.pairs.extend([[(None, 1), (1, None)] + pairs
+                           for pairs in self.pairs])
+
+    def test_mean_std_dev(self):
+        """Test MeanStdDevAccumulator.add against mean_std_dev."""
+        for col in self.columns:
+            acc = MeanStdDevAccumulator()
+            for x in col:
+                acc.add(x)
+            self.assertEqual(acc.result(), mean_std_dev(col))
+            self.assertEqual(MeanStdDevAccumulator(col).result(),
+                             mean_std_dev(col))
+
+    def test_mean_std_dev_remove_merge(self):
+        """Test MeanStdDevAccumulator.remove and merge."""
+        for col in self.columns:
+            half = len(col) // 2
+            acc = MeanStdDevAccumulator(col)
+            for x in col[half:]:
+                acc.remove(x)
+            self.assertEqual(acc.result(), mean_std_dev(col[:half]))
+            acc.merge(MeanStdDevAccumulator(col[half:]))
+            self.assertEqual(acc.result(), mean_std_dev(col))
+        self.assertRaises(ValueError, MeanStdDevAccumulator().remove, 1)
+
+    def test_mean_std_dev_add_sums(self):
+        """Test MeanStdDevAccumulator.add_sums."""
+        for col in self.columns:
+            known = [x for x in col if x is not None]
+            acc = MeanStdDevAccumulator()
+            acc.add_sums(len(known), sum(known), sum(x * x for x in known))
+            self.assertEqual(acc.result(), mean_std_dev(col))
+        self.assertIsNone(MeanStdDevAccumulator([None]).result())
+
+    def test_corr_coeff(self):
+        """Test CorrCoeffAccumulator.add against corr_coeff."""
+        for pairs in self.pairs:
+            acc = CorrCoeffAccumulator()
+            for x, y in pairs:
+                acc.add(x, y)
+            self.assertEqual(acc.result(), corr_coeff(pairs))
+            self.assertEqual(CorrCoeffAccumulator(pairs).result(),
+                             corr_coeff(pairs))
+
+    def test_corr_coeff_remove_merge(self):
+        """Test CorrCoeffAccumulator.remove and merge."""
+        for pairs in self.pairs:
+            half = len(pairs) // 2
+            acc = CorrCoeffAccumulator(pairs)
+            for x, y in pairs[half:]:
+                acc.remove(x, y)
+            self.assertEqual(acc.result(), corr_coeff(pairs[:half]))
+            acc.merge(CorrCoeffAccumulator(pairs[half:]))
+            self.assertEqual(acc.result(), corr_coeff(pairs))
+        self.assertIsNone(CorrCoeffAccumulator([(1, 2), (1, 3)]).result())
@@ -75,6 +75,21 @@ class MoScriptTestCase(unittest.TestCase):
             else:
                 arg_text = ''
             self.args = arg_text.split()
+            # If there is an update directory, its contents are copied
+            # over the output of a first run of the script, which is
+            # then run again (with the arguments in update-args, if
+            # present) to give the output to check.
+            update_dir = os.path.join(self.full_dir, 'update')
+            if os.access(update_dir, os.F_OK):
+                self.update_dir = update_dir
+                update_arg_file = os.path.join(self.full_dir, 'update-args')
+                if os.access(update_arg_file, os.F_OK):
+                    self.update_args = read_text_from_file(
+                        update_arg_file).split()
+                else:
+                    self.update_args = self.args
+            else:
+                self.update_dir = None
         super().__init__(method_name)
 
     def setUp(self):
@@ -86,14 +101,15 @@ class MoScriptTestCase(unittest.TestCase):
     def tearDown(self):
         self.temp_dir_td.cleanup()
 
-    def runTest(self):
+    def run_script(self, script_args, run_name):
         """
-        Run a script test.
+        Run the script being tested with the given arguments,
+        returning its exit status and output.
         """
         returncode = 0
         if self.coverage:
             cov_dir = os.path.dirname(self.script_path)
-            cov_file = '.coverage.%s.%s' % (self.script, self.dir)
+            cov_file = '.coverage.%s.%s%s' % (self.script, self.dir, run_name)
             env = dict(os.environ)
             env['COVERAGE_FILE'] = os.path.join(cov_dir, cov_file)
         else:
@@ -103,7 +119,7 @@ class MoScriptTestCase(unittest.TestCase):
             if self.coverage:
                 args.extend(['-m', 'coverage', 'run'])
             args.append(self.script_path)
-            args.extend(self.args)
+            args.extend(script_args)
             output = subprocess.run(args,
                                     cwd=self.out_dir,
                                     env=env,
@@ -113,6 +129,21 @@ class MoScriptTestCase(unittest.TestCase):
         except subprocess.CalledProcessError as e:
             returncode = e.returncode
             output = e.output
+        return returncode, output
+
+    def runTest(self):
+        """
+        Run a script test.
+        """
+        if self.update_dir is not None:
+            returncode, output = self.run_script(self.args, '.first')
+            self.assertFalse(output)
+            self.assertEqual(returncode, 0)
+            shutil.copytree(self.update_dir, self.out_dir,
+                            dirs_exist_ok=True)
+            returncode, output = self.run_script(self.update_args, '')
+        else:
+            returncode, output = self.run_script(self.args, '')
         if self.check_dir:
             self.assertFalse(output)
         self.assertEqual(returncode, 0)